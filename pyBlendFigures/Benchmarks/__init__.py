@@ -0,0 +1,4 @@
+from .gwas_generator import generate_summary_statistics
+from .stand_in_bpy import install_stand_in_bpy, StandInBpy
+from .gwas_benchmark import run_gwas_benchmarks
+from .import_time import import_time_report, run_import_benchmarks
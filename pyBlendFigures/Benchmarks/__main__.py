@@ -0,0 +1,27 @@
+from pyBlendFigures.Benchmarks.gwas_benchmark import run_gwas_benchmarks, BASELINE_PATH, BENCHMARK_FIGURES
+from pyBlendFigures.Benchmarks.import_time import run_import_benchmarks
+
+import argparse
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Manhattan and QQ pipelines on synthetic GWAS files")
+    parser.add_argument("write_directory", help="Directory for the synthetic files, figures, and report")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000], help="Rows of each synthetic file")
+    parser.add_argument("--formats", nargs="+", default=["txt", "gz"], choices=["txt", "gz"])
+    parser.add_argument("--figures", nargs="+", default=["Manhattan", "QQPlot"], choices=BENCHMARK_FIGURES)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Path to the stored baselines")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Fractional change reported as a regression")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--imports", action="store_true", help="Report the import time of the package and scripts "
+                                                               "rather than benchmarking the pipelines")
+    args = parser.parse_args()
+
+    if args.imports:
+        report = run_import_benchmarks(args.write_directory, None, args.baseline, args.update_baseline, args.tolerance)
+    else:
+        report = run_gwas_benchmarks(args.write_directory, args.rows, args.formats, args.figures, args.baseline,
+                                     args.update_baseline, args.tolerance, args.seed)
+    if any(case["regressions"] for case in report["cases"]):
+        raise SystemExit(1)
@@ -0,0 +1,222 @@
+from pyBlendFigures.Benchmarks.gwas_generator import generate_summary_statistics
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+import platform
+import shutil
+import sys
+import json
+import time
+import os
+
+BASELINE_PATH = Path(Path(__file__).parent, "baselines.json")
+
+CHROMOSOME_GROUPS = [list(range(1, 24, 2)), list(range(2, 24, 2))]
+GROUP_COLOURS = [(160, 80, 0), (0, 80, 160)]
+AXIS_COLOUR = (0.1, 0.1, 0.1, 1.0)
+
+# The qq_mode of each qq plot benchmark
+QQ_MODES = {"QQPlot": "exact", "QQPlotExternal": "external", "QQPlotStreaming": "streaming"}
+
+# Every figure that can be benchmarked
+BENCHMARK_FIGURES = ("Manhattan", "ManhattanRaster", *QQ_MODES)
+
+
+def run_gwas_benchmarks(write_directory, rows=(1000000,), formats=("txt", "gz"), figures=("Manhattan", "QQPlot"),
+                        baseline_path=BASELINE_PATH, update_baseline=False, tolerance=0.2, seed=0):
+    """
+    Benchmark the Manhattan and QQPlot scripts, and their create_manhattan_plot and create_qq_plot compositors, on
+    synthetic summary statistics. Where blender is not installed the scripts are run against the stand in bpy, so the
+    benchmark measures the data preparation of each script on a cpu only machine.
+
+    Each case is run in its own process so its peak resident memory is isolated, and reports the rows parsed per second,
+    the wall time of each stage recorded via job_span plus the composite stage, and the peak RSS. Cases are compared
+    against the stored baselines, with any that are slower or use more memory than the baseline by more than tolerance
+    reported as regressions.
+
+    :param write_directory: Directory to write the synthetic files, the figures, and the report to
+    :type write_directory: str | Path
+
+    :param rows: The number of rows of each synthetic file to benchmark, defaults to (1000000,)
+    :type rows: tuple[int] | list[int]
+
+    :param formats: The formats of the synthetic files, txt for plain text or gz for gzip compressed, defaults to both
+    :type formats: tuple[str] | list[str]
+
+    :param figures: The figures to benchmark, from Manhattan, ManhattanRaster for a manhattan plot whose point layers
+        are rasterised via create_manhattan_points, QQPlot, and QQPlotExternal or QQPlotStreaming for qq plots of the
+        external or streaming qq_mode, defaults to ("Manhattan", "QQPlot")
+    :type figures: tuple[str] | list[str]
+
+    :param baseline_path: Path to the stored baselines, defaults to the baselines.json of this package
+    :type baseline_path: str | Path
+
+    :param update_baseline: If the results of this run should be stored as the new baselines, defaults to False
+    :type update_baseline: bool
+
+    :param tolerance: The fraction throughput may fall, or peak memory rise, relative to the baseline before a case is
+        reported as a regression, defaults to 0.2
+    :type tolerance: float
+
+    :param seed: Seed of the synthetic files, defaults to 0
+    :type seed: int
+
+    :return: The report, also written to benchmark_report.json in the write directory
+    :rtype: dict
+    """
+    write_directory = Path(write_directory).absolute()
+    baselines = _load_baselines(baseline_path)
+
+    cases = []
+    for row_count in rows:
+        for file_format in formats:
+            summary_path = _synthetic_file(write_directory, row_count, file_format, seed)
+
+            for figure in figures:
+                case_name = f"{figure}|{row_count}|{file_format}"
+                case_directory = Path(write_directory, case_name.replace("|", "_"))
+                if case_directory.exists():
+                    shutil.rmtree(case_directory)
+                case_directory.mkdir(parents=True)
+
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+                    case = executor.submit(_run_case, figure, str(summary_path), str(case_directory)).result()
+
+                case.update({"case": case_name, "rows": row_count, "rows_per_second": row_count / case["seconds"]})
+                case["regressions"] = _compare(case, baselines.get(case_name), tolerance)
+                cases.append(case)
+                _print_case(case)
+
+    report = {"machine": _machine(), "tolerance": tolerance, "cases": cases}
+    with open(Path(write_directory, "benchmark_report.json"), "w") as file:
+        json.dump(report, file, indent=4)
+
+    if update_baseline:
+        baselines.update({case["case"]: {key: case[key] for key in ("seconds", "rows_per_second", "stages", "peak_rss")}
+                          for case in cases})
+        baselines["machine"] = report["machine"]
+        with open(baseline_path, "w") as file:
+            json.dump(baselines, file, indent=4)
+
+    return report
+
+
+def _synthetic_file(write_directory, rows, file_format, seed):
+    """Generate the synthetic summary statistics, reusing a previously generated file of the same rows and seed"""
+    data_directory = Path(write_directory, "Data")
+    data_directory.mkdir(parents=True, exist_ok=True)
+
+    summary_path = Path(data_directory, f"synthetic_{rows}_{seed}.txt{'.gz' if file_format == 'gz' else ''}")
+    if not summary_path.exists():
+        partial_path = summary_path.with_name(f"partial_{summary_path.name}")
+        generate_summary_statistics(partial_path, rows, seed)
+        os.replace(partial_path, summary_path)
+    return summary_path
+
+
+def _run_case(figure, summary_path, case_directory):
+    """Run a figure and its compositor within a fresh process, returning the seconds, stage times and peak RSS"""
+    from pyBlendFigures.Benchmarks.stand_in_bpy import install_stand_in_bpy
+    install_stand_in_bpy()
+
+    from pyBlendFigures.Supports import start_job_timer, set_summary_cache
+    from pyBlendFigures.FigureLogic import create_manhattan_plot, create_qq_plot
+
+    # Each case builds its own summary cache, so every case measures parsing the file rather than the cache
+    set_summary_cache(Path(case_directory, "SummaryCache"))
+
+    output_directory = Path(case_directory, "Output")
+    output_directory.mkdir()
+    timer = start_job_timer(figure)
+
+    start = time.perf_counter()
+    if figure == "Manhattan":
+        from pyBlendFigures.BlendFiles.Manhattan import Manhattan
+        Manhattan([case_directory, "Manhattan", summary_path, CHROMOSOME_GROUPS, "CHR", "SNP", "BP", "P", (12, 9, 55),
+                   40, 23.5, AXIS_COLOUR, 80, 0.2, 0.2, 8, (0, 0, 1, 1), 1920, 1080, None, 3, False, None])
+        with timer.span("composite"):
+            create_manhattan_plot("Manhattan", case_directory, GROUP_COLOURS, output_directory)
+
+    elif figure == "ManhattanRaster":
+        from pyBlendFigures.BlendFiles.Manhattan import Manhattan
+        from pyBlendFigures.FigureLogic import create_manhattan_points
+        with timer.span("raster"):
+            group_maxima = create_manhattan_points(
+                case_directory, "ManhattanRaster", summary_path, CHROMOSOME_GROUPS, "CHR", "BP", "P", (12, 9, 55), 40,
+                1920, 1080, 3, Path(case_directory, "SummaryCache"))
+        axis_height = max(y_max for y_max in group_maxima if y_max is not None)
+        Manhattan([case_directory, "ManhattanRaster", summary_path, CHROMOSOME_GROUPS, "CHR", "SNP", "BP", "P",
+                   (12, 9, 55), 40, 23.5, AXIS_COLOUR, 80, 0.2, 0.2, 8, (0, 0, 1, 1), 1920, 1080, None, 3, True,
+                   axis_height])
+        with timer.span("composite"):
+            create_manhattan_plot("ManhattanRaster", case_directory, GROUP_COLOURS, output_directory)
+
+    elif figure in QQ_MODES:
+        from pyBlendFigures.BlendFiles.QQPlot import QQPlot
+        QQPlot([case_directory, summary_path, 3, figure, True, None, 0.05, AXIS_COLOUR, (10, 10, 30), 25, 1080, 1080,
+                QQ_MODES[figure]])
+        with timer.span("composite"):
+            create_qq_plot(figure, case_directory, GROUP_COLOURS[0], output_directory)
+
+    else:
+        raise ValueError(f"No benchmark exists for {figure}, expected one of {list(BENCHMARK_FIGURES)}")
+
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "stages": timer.report()["totals"], "peak_rss": _peak_rss()}
+
+
+def _peak_rss():
+    """
+    Peak resident memory of this process in bytes, which macOS reports in bytes and linux in kilobytes, or None where
+    the resource module does not exist, such as windows
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _compare(case, baseline, tolerance):
+    """Isolate any measures of this case that have regressed beyond the tolerance of the baseline"""
+    if not baseline:
+        return []
+
+    regressions = []
+    if case["rows_per_second"] < baseline["rows_per_second"] * (1 - tolerance):
+        regressions.append(f"rows_per_second {case['rows_per_second']:.0f} < baseline "
+                           f"{baseline['rows_per_second']:.0f}")
+    # Peak memory is not measured on every platform, so is only compared when both runs measured it
+    if case["peak_rss"] and baseline.get("peak_rss") and case["peak_rss"] > baseline["peak_rss"] * (1 + tolerance):
+        regressions.append(f"peak_rss {case['peak_rss'] / 1024 ** 2:.0f}MB > baseline "
+                           f"{baseline['peak_rss'] / 1024 ** 2:.0f}MB")
+    for stage, seconds in case["stages"].items():
+        baseline_seconds = baseline["stages"].get(stage)
+        # Stages of a fraction of a second are too noisy to compare
+        if baseline_seconds and baseline_seconds > 0.1 and seconds > baseline_seconds * (1 + tolerance):
+            regressions.append(f"{stage} {seconds:.2f}s > baseline {baseline_seconds:.2f}s")
+    return regressions
+
+
+def _print_case(case):
+    stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in case["stages"].items())
+    peak_rss = "unmeasured" if case["peak_rss"] is None else f"{case['peak_rss'] / 1024 ** 2:.0f}MB"
+    print(f"{case['case']}: {case['rows_per_second']:,.0f} rows/s, {case['seconds']:.2f}s "
+          f"({stages}), peak RSS {peak_rss}")
+    for regression in case["regressions"]:
+        print(f"    REGRESSION: {regression}")
+
+
+def _load_baselines(baseline_path):
+    if not Path(baseline_path).exists():
+        return {}
+    with open(baseline_path, "r") as file:
+        return json.load(file)
+
+
+def _machine():
+    """Details of the machine, as baselines are only comparable on similar hardware"""
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count()}
@@ -0,0 +1,94 @@
+from pathlib import Path
+import numpy as np
+import gzip
+
+# Approximate lengths, in mega bases, of chromosomes 1 to 23 (X) so variants are spread as they are in real GWAS
+CHROMOSOME_LENGTHS = [249, 243, 198, 190, 182, 171, 159, 145, 138, 134, 135, 133, 114, 107, 102, 90, 83, 80, 59, 64,
+                      47, 51, 156]
+
+
+def generate_summary_statistics(write_path, rows, seed=0, loci=40, inflation=1.05, sort_rows=True,
+                                chunk_size=500000):
+    """
+    Write a synthetic GWAS summary statistics file of CHR SNP BP P columns, whitespace delimited with a header row as
+    the Manhattan and QQPlot scripts expect. If write_path ends in .gz the file is gzip compressed.
+
+    Variants are spread over chromosomes 1 to 23 in proportion to their length. P values are drawn from a uniform null
+    with slight genomic inflation, and a number of associated loci are added whose -log10 p values peak between 6 and
+    40 and fall away with distance from the lead variant, giving the towers and realistic tail of a real GWAS.
+
+    :param write_path: Path to write the file to, ending in .gz for a compressed file
+    :type write_path: str | Path
+
+    :param rows: Number of variants to write
+    :type rows: int
+
+    :param seed: Seed of the random generator, so the same file can be recreated, defaults to 0
+    :type seed: int
+
+    :param loci: Number of associated loci to add, defaults to 40
+    :type loci: int
+
+    :param inflation: Genomic inflation of the null p values, where 1 is no inflation, defaults to 1.05
+    :type inflation: float
+
+    :param sort_rows: If rows are written sorted by chromosome and base position, or otherwise shuffled, defaults to
+        True
+    :type sort_rows: bool
+
+    :param chunk_size: Number of rows to generate and write at a time, bounding the memory used, defaults to 500000
+    :type chunk_size: int
+
+    :return: Path to the written file
+    :rtype: Path
+    """
+    write_path = Path(write_path)
+    generator = np.random.default_rng(seed)
+
+    chromosomes, positions = _variant_positions(generator, rows)
+    lead_indexes = np.sort(generator.choice(rows, size=min(loci, rows), replace=False))
+    peaks = generator.uniform(6, 40, len(lead_indexes))
+
+    order = np.arange(rows) if sort_rows else generator.permutation(rows)
+
+    with (gzip.open(write_path, "wt", compresslevel=6) if write_path.suffix == ".gz" else
+          open(write_path, "w")) as file:
+        file.write("CHR SNP BP P\n")
+
+        for start in range(0, rows, chunk_size):
+            index = order[start:start + chunk_size]
+            p_values = _p_values(generator, index, chromosomes, positions, lead_indexes, peaks, inflation)
+
+            file.write("".join(f"{c} rs{i + 1} {b} {p:.6g}\n" for c, i, b, p in zip(
+                chromosomes[index].tolist(), index.tolist(), positions[index].tolist(), p_values.tolist())))
+
+    return write_path
+
+
+def _variant_positions(generator, rows):
+    """Spread the variants over the chromosomes by their length, with sorted base positions within each"""
+    lengths = np.array(CHROMOSOME_LENGTHS, dtype=np.float64)
+    counts = np.floor(lengths / lengths.sum() * rows).astype(np.int64)
+    counts[:rows - counts.sum()] += 1
+
+    chromosomes = np.repeat(np.arange(1, len(lengths) + 1, dtype=np.int8), counts)
+    positions = np.concatenate([np.sort(generator.integers(1, int(length * 1e6), count))
+                                for length, count in zip(lengths, counts)]).astype(np.int32)
+    return chromosomes, positions
+
+
+def _p_values(generator, index, chromosomes, positions, lead_indexes, peaks, inflation):
+    """
+    Null p values, deflated by the inflation factor, with each associated locus raising the -log10 p of variants within
+    500kb of its lead variant on the same chromosome
+    """
+    log_p = -np.log10(generator.uniform(0, 1, len(index))) * inflation
+
+    for lead, peak in zip(lead_indexes, peaks):
+        local = (chromosomes[index] == chromosomes[lead]) & (np.abs(positions[index] - positions[lead]) < 500000)
+        if local.any():
+            distance = np.abs(positions[index][local] - positions[lead]) / 500000
+            signal = peak * np.exp(-(distance * 6) ** 2) * generator.uniform(0.6, 1, local.sum())
+            log_p[local] = np.maximum(log_p[local], signal)
+
+    return np.clip(10 ** -log_p, 1e-300, 1)
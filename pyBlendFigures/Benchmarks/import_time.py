@@ -0,0 +1,125 @@
+from pathlib import Path
+import subprocess
+import json
+import sys
+
+# Host side modules, and the BlendFiles scripts that run within blender, whose import time is reported by default
+IMPORT_MODULES = ["pyBlendFigures", "pyBlendFigures.Controller", "pyBlendFigures.Supports",
+                  "pyBlendFigures.BlendFiles.Manhattan", "pyBlendFigures.BlendFiles.QQPlot",
+                  "pyBlendFigures.BlendFiles.ForestPlot", "pyBlendFigures.BlendFiles.PrismaPlot"]
+
+# Blender's own modules are replaced by empty placeholders, so the scripts can be imported without blender and only the
+# cost of what they import themselves is measured
+_PLACEHOLDERS = "import sys, types; sys.modules['bpy'] = types.ModuleType('bpy'); " \
+                "sys.modules['bpy_types'] = types.ModuleType('bpy_types'); "
+
+
+def import_time_report(module, repeat=3, top=10, python=sys.executable):
+    """
+    Measure the cost of importing a module, in the style of python -X importtime, within a fresh interpreter. The import
+    is repeated and the fastest run kept, to reduce noise from the file system cache.
+
+    :param module: The module to import, such as pyBlendFigures.BlendFiles.Manhattan
+    :type module: str
+
+    :param repeat: The number of fresh interpreters to import the module within, defaults to 3
+    :type repeat: int
+
+    :param top: The number of modules, by cumulative import time, to include in the report, defaults to 10
+    :type top: int
+
+    :param python: The python executable to measure with, defaults to the current one
+    :type python: str
+
+    :return: The report, with the total seconds and the most expensive modules imported
+    :rtype: dict
+    """
+    seconds, times = min([_import_times(module, python) for _ in range(repeat)], key=lambda run: run[0])
+
+    expensive = sorted(times, key=lambda name: times[name]["cumulative"], reverse=True)[:top]
+    return {"module": module, "seconds": seconds, "imported": len(times),
+            "modules": {name: times[name] for name in expensive}}
+
+
+def _import_times(module, python):
+    """
+    Import the module within a fresh interpreter, returning the seconds the import took and the seconds of each module
+    it imported, parsed from -X importtime. Interpreter start up is excluded by marking where the import begins.
+    """
+    code = f"{_PLACEHOLDERS}import time; start = time.perf_counter(); sys.stderr.write('MODULE START\\n'); " \
+           f"import {module}; print(time.perf_counter() - start)"
+    process = subprocess.run([python, "-X", "importtime", "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode != 0:
+        raise ImportError(f"Failed to import {module}:\n{process.stderr}")
+
+    lines = process.stderr.splitlines()
+    times = {}
+    for line in lines[lines.index("MODULE START") + 1:]:
+        if line.startswith("import time:"):
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            times[name.strip()] = {"self": int(self_us) / 1e6, "cumulative": int(cumulative_us) / 1e6}
+    return float(process.stdout.strip().splitlines()[-1]), times
+
+
+def run_import_benchmarks(write_directory, modules=None, baseline_path=None, update_baseline=False, tolerance=0.2,
+                          slack=0.02):
+    """
+    Report the import time of each module, comparing it against the stored baselines so that the startup cost of
+    figure jobs is kept low. A module has regressed if it takes longer than its baseline by both the fractional
+    tolerance and the absolute slack, as imports of a few milliseconds are noisy.
+
+    :param write_directory: Directory to write import_report.json to
+    :type write_directory: str | Path
+
+    :param modules: The modules to report, defaults to IMPORT_MODULES
+    :type modules: list[str] | None
+
+    :param baseline_path: Path to the stored baselines, defaults to the baselines.json of this package
+    :type baseline_path: str | Path | None
+
+    :param update_baseline: If the results of this run should be stored as the new baselines, defaults to False
+    :type update_baseline: bool
+
+    :param tolerance: Fraction the import time may rise relative to the baseline, defaults to 0.2
+    :type tolerance: float
+
+    :param slack: Seconds the import time may rise relative to the baseline, defaults to 0.02
+    :type slack: float
+
+    :return: The report of each module
+    :rtype: dict
+    """
+    baseline_path = baseline_path if baseline_path else Path(Path(__file__).parent, "baselines.json")
+    baselines = json.loads(Path(baseline_path).read_text()) if Path(baseline_path).exists() else {}
+
+    reports = []
+    for module in (modules if modules else IMPORT_MODULES):
+        report = import_time_report(module)
+
+        baseline = baselines.get(f"import|{module}")
+        report["regressions"] = []
+        if baseline and report["seconds"] > max(baseline["seconds"] * (1 + tolerance), baseline["seconds"] + slack):
+            report["regressions"].append(f"import {report['seconds']:.3f}s > baseline {baseline['seconds']:.3f}s")
+
+        reports.append(report)
+        _print_report(report)
+
+    Path(write_directory).mkdir(parents=True, exist_ok=True)
+    with open(Path(write_directory, "import_report.json"), "w") as file:
+        json.dump(reports, file, indent=4)
+
+    if update_baseline:
+        baselines.update({f"import|{report['module']}": {"seconds": report["seconds"]} for report in reports})
+        with open(baseline_path, "w") as file:
+            json.dump(baselines, file, indent=4)
+
+    return {"cases": reports}
+
+
+def _print_report(report):
+    print(f"{report['module']}: {report['seconds'] * 1000:.1f}ms, {report['imported']} modules")
+    for name, times in report["modules"].items():
+        print(f"    {times['cumulative'] * 1000:8.1f}ms {name}")
+    for regression in report["regressions"]:
+        print(f"    REGRESSION: {regression}")
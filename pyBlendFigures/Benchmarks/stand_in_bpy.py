@@ -0,0 +1,343 @@
+from pathlib import Path
+import numpy as np
+import types
+import sys
+
+
+class _Namespace:
+    """Holds any attribute set on it, creating a nested namespace for any attribute that has not been set"""
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = _Namespace()
+        setattr(self, name, value)
+        return value
+
+
+class _Socket:
+    def __init__(self):
+        self.default_value = None
+
+
+class _Node:
+    def __init__(self, node_type):
+        self.type = node_type
+        self.inputs = [_Socket() for _ in range(4)]
+        self.outputs = [_Socket() for _ in range(4)]
+        self.location = (0, 0)
+
+
+class _Nodes(list):
+    def new(self, type=None):
+        node = _Node(type)
+        self.append(node)
+        return node
+
+    def get(self, name):
+        for node in self:
+            if node.type == f"ShaderNode{name}":
+                return node
+        return None
+
+
+class _Material:
+    def __init__(self, name):
+        self.name = name
+        self.use_nodes = False
+        self.node_tree = _Namespace()
+        self.node_tree.nodes = _Nodes()
+        self.node_tree.links = _Namespace()
+        self.node_tree.links.new = lambda *args: None
+
+    @property
+    def colour(self):
+        """The colour of the emission node, if one was set"""
+        emission = self.node_tree.nodes.get("Emission")
+        return emission.inputs[0].default_value if emission else None
+
+
+class _MeshElements:
+    def __init__(self, **attributes):
+        """
+        The vertices, edges, loops, or polygons of a mesh, which are extended via add and then filled via foreach_set as
+        in blender. Each attribute is held as an array of name=(width, dtype), and may be read as an attribute.
+        """
+        self._values = {name: np.zeros((0, width), dtype) for name, (width, dtype) in attributes.items()}
+
+    def __len__(self):
+        return len(next(iter(self._values.values())))
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._values:
+            raise AttributeError(name)
+        values = self._values[name]
+        return values[:, 0] if values.shape[1] == 1 else values
+
+    def add(self, count):
+        for name, values in self._values.items():
+            self._values[name] = np.concatenate((values, np.zeros((count, values.shape[1]), values.dtype)))
+
+    def foreach_set(self, name, values):
+        """Set every element of the attribute from a flat sequence, which must match its length exactly"""
+        target = self._values[name]
+        values = np.asarray(values, dtype=target.dtype)
+        if values.size != target.size:
+            raise RuntimeError(f"foreach_set of {name} expected {target.size} values but was given {values.size}")
+        target[:] = values.reshape(target.shape)
+
+
+class Mesh:
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.materials = []
+        self.vertices = _MeshElements(co=(3, np.float32))
+        self.edges = _MeshElements(vertices=(2, np.int32))
+        self.loops = _MeshElements(vertex_index=(1, np.int32))
+        self.polygons = _MeshElements(loop_start=(1, np.int32), loop_total=(1, np.int32))
+
+    def from_pydata(self, vertices, edges, faces):
+        """Copy the vertices, edges, and faces into the mesh data, as blender copies them into its own mesh data"""
+        face_lengths = [len(face) for face in faces]
+        self.vertices.add(len(vertices))
+        self.edges.add(len(edges))
+        self.loops.add(sum(face_lengths))
+        self.polygons.add(len(faces))
+
+        self.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+        self.edges.foreach_set("vertices", [i for edge in edges for i in edge])
+        self.loops.foreach_set("vertex_index", [i for face in faces for i in face])
+        self.polygons.foreach_set("loop_start", np.cumsum([0] + face_lengths[:-1]) if faces else [])
+        self.polygons.foreach_set("loop_total", face_lengths)
+
+    def update(self, calc_edges=False, calc_edges_loose=False):
+        pass
+
+
+class TextCurve(_Namespace):
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.materials = []
+        self.body = ""
+
+
+class Camera(_Namespace):
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.type = "ORTHO"
+        self.ortho_scale = 5.0
+
+
+class _Object(_Namespace):
+    def __init__(self, name, data):
+        self._name = name
+        self.data = data
+        self.location = (0, 0, 0)
+        self.selected = False
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        """Renaming an object re-keys it within bpy.data.objects and the collections it is linked to"""
+        for holder in [StandInBpy.active.data.objects] + [c.objects for c in StandInBpy.active.data.collections]:
+            if holder.get(self._name) is self:
+                del holder[self._name]
+                holder[name] = self
+        self._name = name
+
+    def select_set(self, state):
+        self.selected = state
+
+
+class _Collection(dict):
+    """A named collection of blender data, such as bpy.data.objects, which iterates over its values like blender"""
+    def __init__(self, factory=None):
+        super().__init__()
+        self._factory = factory
+
+    def __iter__(self):
+        return iter(list(self.values()))
+
+    def new(self, name, *args):
+        # Blender de-duplicates names with a numeric suffix
+        unique, suffix = name, 1
+        while unique in self:
+            unique, suffix = f"{name}.{suffix:03d}", suffix + 1
+
+        item = self._factory(unique, *args)
+        self[unique] = item
+        return item
+
+    def remove(self, item):
+        self.pop(item.name, None)
+
+
+class _Objects(_Collection):
+    def new(self, name, data):
+        obj = super().new(name, data)
+        if data is not None:
+            data.users += 1
+        return obj
+
+    def remove(self, obj):
+        if obj.name in self:
+            super().remove(obj)
+            if obj.data is not None:
+                obj.data.users -= 1
+
+        for collection in StandInBpy.active.data.collections:
+            collection.objects.pop(obj.name, None)
+
+
+class _SceneCollection:
+    def __init__(self, name):
+        self.name = name
+        self.objects = _Collection()
+        self.objects.link = lambda obj: self.objects.__setitem__(obj.name, obj)
+
+
+class _Context(_Namespace):
+    """The context, where context.object is the active object of the view layer as it is in blender"""
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @object.setter
+    def object(self, obj):
+        self.view_layer.objects.active = obj
+
+
+class _Operators:
+    """Records each operator called, as bpy.ops.group.operator(**kwargs), dispatching those with side effects"""
+    def __init__(self, bpy_stand_in, group=None):
+        self._bpy = bpy_stand_in
+        self._group = group
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if self._group is None:
+            return _Operators(self._bpy, name)
+        return lambda *args, **kwargs: self._bpy.call_operator(f"{self._group}.{name}", kwargs)
+
+
+class StandInBpy:
+    """
+    A headless stand in for the bpy module, covering the parts of the api used by the BlendFiles scripts and
+    blendSupports. Meshes, text, and materials are held as plain python objects, renders splat the vertices of each mesh
+    through the orthographic camera into a transparent png so compositing can run on the output, and saved blend files
+    are written as empty files. Every operator called is recorded in operator_calls.
+    """
+    active = None
+
+    def __init__(self):
+        StandInBpy.active = self
+        self.operator_calls = []
+        self.renders = []
+        self.types = types.SimpleNamespace(Camera=Camera, TextCurve=TextCurve, Mesh=Mesh)
+        self.app = types.SimpleNamespace(version=(3, 6, 0))
+        self.ops = _Operators(self)
+        self.reset()
+
+    def reset(self):
+        """Reset the scene to that of Base.blend, a single collection holding the camera"""
+        self.data = _Namespace()
+        self.data.meshes = _Collection(Mesh)
+        self.data.curves = _Collection(TextCurve)
+        self.data.cameras = _Collection(Camera)
+        self.data.materials = _Collection(_Material)
+        self.data.objects = _Objects(_Object)
+        self.data.collections = _Collection(_SceneCollection)
+
+        collection = self.data.collections.new("Collection")
+        camera = self.data.objects.new("Camera", self.data.cameras.new("Camera"))
+        collection.objects.link(camera)
+
+        self.context = _Context()
+        self.context.object = None
+        self.context.scene.render.resolution_x = 1920
+        self.context.scene.render.resolution_y = 1080
+        self.context.scene.render.filepath = ""
+
+        view_3d = _Namespace()
+        view_3d.type = "VIEW_3D"
+        view_3d.spaces = [view_3d]
+        self.context.screen.areas = [view_3d]
+
+    def call_operator(self, operator, kwargs):
+        """Record the call of an operator, running those that change the scene or write files"""
+        self.operator_calls.append((operator, kwargs))
+
+        if operator == "object.text_add":
+            text = self.data.objects.new("Text", self.data.curves.new("Text"))
+            text.location = kwargs.get("location", (0, 0, 0))
+            self.data.collections["Collection"].objects.link(text)
+            self.context.object = text
+
+        elif operator in ("render.render", "render.opengl"):
+            self._render(self.context.scene.render.filepath)
+
+        elif operator == "wm.save_as_mainfile":
+            Path(kwargs["filepath"]).write_bytes(b"")
+
+        elif operator == "wm.open_mainfile":
+            self.reset()
+
+        return {"FINISHED"}
+
+    def _render(self, filepath):
+        """Splat the vertices of every mesh through the orthographic camera into a transparent BGRA png"""
+        import cv2
+
+        x_res, y_res = int(self.context.scene.render.resolution_x), int(self.context.scene.render.resolution_y)
+        image = np.zeros((y_res, x_res, 4), dtype=np.uint8)
+
+        camera = self.data.objects["Camera"]
+        camera_x, camera_y = camera.location[0], camera.location[1]
+        pixels_per_unit = max(x_res, y_res) / float(camera.data.ortho_scale)
+
+        for obj in self.data.collections["Collection"].objects:
+            if not isinstance(obj.data, Mesh) or len(obj.data.vertices) == 0:
+                continue
+
+            x = ((obj.data.vertices.co[:, 0] - camera_x) * pixels_per_unit + x_res / 2).astype(np.int64)
+            y = (y_res / 2 - (obj.data.vertices.co[:, 1] - camera_y) * pixels_per_unit).astype(np.int64)
+            visible = (x >= 0) & (x < x_res) & (y >= 0) & (y < y_res)
+
+            colour = obj.data.materials[0].colour if obj.data.materials else None
+            rgba = np.array(colour if colour is not None else (1, 1, 1, 1), dtype=np.float64)
+            image[y[visible], x[visible]] = (np.clip(rgba[[2, 1, 0, 3]], 0, 1) * 255).astype(np.uint8)
+
+        cv2.imwrite(str(filepath), image)
+        self.renders.append(str(filepath))
+
+
+def install_stand_in_bpy(force=False):
+    """
+    Install the stand in bpy, and the bpy_types module blendSupports imports, into sys.modules when blender's own bpy
+    cannot be imported, so the BlendFiles scripts can be imported and run from standard python.
+
+    :param force: Install the stand in even if bpy can be imported, defaults to False
+    :type force: bool
+
+    :return: The stand in, or None if the real bpy is available and force was not set
+    :rtype: StandInBpy | None
+    """
+    if not force:
+        if isinstance(sys.modules.get("bpy"), StandInBpy):
+            return sys.modules["bpy"]
+        try:
+            import bpy
+            return None
+        except ImportError:
+            pass
+
+    stand_in = StandInBpy()
+    sys.modules["bpy"] = stand_in
+    sys.modules["bpy_types"] = stand_in.types
+    return stand_in
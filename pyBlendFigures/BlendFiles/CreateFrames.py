@@ -1,3 +1,5 @@
+from pyBlendFigures.Supports import job_span
+
 from blendSupports.misc import tuple_convert
 
 from miscSupports import directory_iterator, chunk_list
@@ -16,7 +18,8 @@ class CreateFrames:
 
         self.data_path = Path(read_path)
 
-        self.data = CsvObject(self.data_path, set_columns=True)
+        with job_span("parse"):
+            self.data = CsvObject(self.data_path, set_columns=True)
         self.write_directory = write_path
 
         self.start_index = int(start_index)
@@ -37,15 +40,17 @@ class CreateFrames:
 
         for i in range(self.start_index, len(self.data.headers)):
 
-            for row in self.data.row_data:
-                self.change_colour(row[self.name_i], tuple_convert(row[i]))
+            with job_span("geometry"):
+                for row in self.data.row_data:
+                    self.change_colour(row[self.name_i], tuple_convert(row[i]))
 
             # Render the scene
-            bpy.context.scene.render.filepath = str(
-                Path(self.write_directory, f"{self.data.headers[i]}_{self.data_path.stem}.png").absolute())
-            bpy.context.scene.eevee.use_gtao = True
-            bpy.context.scene.render.film_transparent = True
-            bpy.ops.render.render(write_still=True)
+            with job_span("render"):
+                bpy.context.scene.render.filepath = str(
+                    Path(self.write_directory, f"{self.data.headers[i]}_{self.data_path.stem}.png").absolute())
+                bpy.context.scene.eevee.use_gtao = True
+                bpy.context.scene.render.film_transparent = True
+                bpy.ops.render.render(write_still=True)
 
     @staticmethod
     def change_colour(place, colour):
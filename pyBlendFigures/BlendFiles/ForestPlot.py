@@ -1,3 +1,6 @@
+from pyBlendFigures.Supports.blend_batch import run_job_batch
+from pyBlendFigures.Supports import job_span
+
 from blendSupports.Nodes.emission_node import create_emission_node
 from blendSupports.Meshs.mesh_ref import make_mesh
 from blendSupports.Meshs.text import make_text
@@ -33,19 +36,26 @@ class ForestPlot:
         self.axis_target = float(axis_position)
 
         # Isolate the row data and create normalised position data so we can construct the elements
-        self.line_rows, self.axis_position = self._position_values()
+        with job_span("parse"):
+            self.line_rows, self.axis_position = self._position_values()
 
-        # Create the lines of the forest plot, logging the total height and the bound values for the axis
+        # Create the lines of the forest plot, and their labels, logging the total height and the bound values for the
+        # axis
         self.height_max = 0
         self.bound_values = []
-        self._create_lines()
+        with job_span("geometry"):
+            self._create_lines()
 
         # Create the axis and the labels for it
-        self._create_axis()
+        with job_span("text"):
+            self._create_axis()
 
-        # Render the scene
-        render_scene(camera_position, write_directory, image_name, x_resolution=x_res, y_resolution=y_res,
-                     camera_scale=camera_scale)
+        # Render the scene, then save the blend file for manual manipulation later
+        with job_span("render"):
+            render_scene(camera_position, write_directory, image_name, x_resolution=x_res, y_resolution=y_res,
+                         camera_scale=camera_scale, save_file=False)
+        with job_span("save"):
+            bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/{image_name}.blend")
 
     def _create_lines(self):
 
@@ -228,4 +238,4 @@ class ForestLine:
 
 
 if __name__ == '__main__':
-    ForestPlot(sys.argv[len(sys.argv) - 1].split("__"))
+    run_job_batch(ForestPlot, sys.argv)
@@ -1,3 +1,5 @@
+from pyBlendFigures.Supports import job_span
+
 import bpy
 
 from miscSupports import load_json, deep_get, terminal_time
@@ -16,11 +18,13 @@ class HeatMap:
         self.border_width = 0.05
         self.iterator = 2 - self.border_width
 
-        self.data = load_json(args)
+        with job_span("parse"):
+            self.data = load_json(args)
         self.bg_material = self._make_material('Background', self.background_colour)
 
         self._load_materials()
-        [self.construct_grid(key) for key in self.data["Process"]]
+        with job_span("geometry"):
+            [self.construct_grid(key) for key in self.data["Process"]]
 
     # TODO Make this part of blendExternals
     @staticmethod
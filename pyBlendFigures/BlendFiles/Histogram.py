@@ -1,3 +1,5 @@
+from pyBlendFigures.Supports import job_span
+
 from blendSupports.Nodes.emission_node import create_emission_node
 
 from blendSupports.Meshs.mesh_ref import make_mesh
@@ -12,7 +14,8 @@ class Histogram:
         write_directory, file_path, name_index, isolate, y_scale, border_width, colour, border_colour, write_name = args
 
         self.write_directory = write_directory
-        self.csv_obj = CsvObject(file_path)
+        with job_span("parse"):
+            self.csv_obj = CsvObject(file_path)
         self.name_i = int(name_index)
         self.isolate = int(isolate)
         self.y_scale = float(y_scale)
@@ -29,11 +32,14 @@ class Histogram:
 
     def make_histogram(self):
         for i, row in enumerate(self.csv_obj.row_data):
-            self.make_bar(i, row)
-            self.make_name(i, row)
+            with job_span("geometry"):
+                self.make_bar(i, row)
+            with job_span("text"):
+                self.make_name(i, row)
 
         # Save the blend file for manual manipulation later
-        bpy.ops.wm.save_as_mainfile(filepath=f"{self.write_directory}/{self.write_name}.blend")
+        with job_span("save"):
+            bpy.ops.wm.save_as_mainfile(filepath=f"{self.write_directory}/{self.write_name}.blend")
 
     def make_bar(self, i, row):
         """Make the bar for the histogram"""
@@ -1,3 +1,7 @@
+from pyBlendFigures.Supports.blend_batch import run_job_batch
+from pyBlendFigures.Supports.bpy_image import render_pixels
+from pyBlendFigures.Supports import job_span, FrameStack
+
 # TODO FIx this import
 from blendSupports.misc import convert_colour
 from blendSupports.Nodes.emission_node import create_emission_node
@@ -48,9 +52,8 @@ def make_point(x, y, name, radius, point_colour):
     create_emission_node(obj, point_colour)
 
 
-def iter_heat_map_frames():
-    write_directory, points_path, days_length, date_index, point_radius, point_colour, camera_z = \
-        sys.argv[len(sys.argv) - 1].split("__")
+def iter_heat_map_frames(args):
+    write_directory, points_path, days_length, date_index, point_radius, point_colour, camera_z, frame_stack = args
 
     days_length = int(days_length)
     date_index = int(date_index)
@@ -58,7 +61,8 @@ def iter_heat_map_frames():
     point_colour = convert_colour(point_colour)
 
     # Load the ShapeObject and set the dates dimensions
-    points, start_date, end_date = set_dates(points_path, date_index)
+    with job_span("parse"):
+        points, start_date, end_date = set_dates(points_path, date_index)
     date_iter = start_date
 
     # Set the camera location
@@ -70,24 +74,49 @@ def iter_heat_map_frames():
     obj_camera = bpy.context.scene.camera
     obj_camera.data.clip_end = 1e+09
 
+    stack = FrameStack(frame_stack, "a") if frame_stack else None
+
+    try:
+        _render_frames(write_directory, points, date_iter, end_date, days_length, date_index, point_radius,
+                       point_colour, stack)
+    finally:
+        if stack is not None:
+            stack.close()
+
+
+def _render_frames(write_directory, points, date_iter, end_date, days_length, date_index, point_radius, point_colour,
+                   stack):
+    """
+    Render a frame for every days_length days, appending the rendered pixels of each to the stack in place of writing
+    its png if given
+    """
     while date_iter < end_date:
         print(date_iter)
 
         # If the point is between the current date and the current date + extra days make a point
-        for point, rec in zip(points.points, points.records):
-            day, month, year = rec[date_index].split("/")
-            current_date = datetime(int(year), int(month), int(day))
+        with job_span("geometry"):
+            for point, rec in zip(points.points, points.records):
+                day, month, year = rec[date_index].split("/")
+                current_date = datetime(int(year), int(month), int(day))
 
-            if date_iter <= current_date < date_iter + timedelta(days=days_length):
-                make_point(point.x, point.y, rec[date_index], point_radius, point_colour)
+                if date_iter <= current_date < date_iter + timedelta(days=days_length):
+                    make_point(point.x, point.y, rec[date_index], point_radius, point_colour)
 
         # Render the image of this date, then iterate the iterator forward by length of days_length
-        bpy.context.scene.render.filepath = str(
-            Path(write_directory, f"{date_iter.year}_{date_iter.month}_{date_iter.day}.png").absolute())
-        bpy.ops.render.render(write_still=True)
+        frame_label = f"{date_iter.year}_{date_iter.month}_{date_iter.day}"
+        if stack is not None:
+            with job_span("render"):
+                frame = render_pixels()
+            with job_span("save"):
+                stack.append(frame, frame_label)
+        else:
+            with job_span("render"):
+                bpy.context.scene.render.filepath = str(Path(write_directory, f"{frame_label}.png").absolute())
+                bpy.ops.render.render(write_still=True)
         date_iter += timedelta(days=days_length)
 
-        bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/Test.blend")
+        with job_span("save"):
+            bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/Test.blend")
 
         # Cleanup the collection
         collection = bpy.data.collections["Collection 3"]
@@ -107,7 +136,7 @@ def iter_heat_map_frames():
 
 
 if __name__ == '__main__':
-    iter_heat_map_frames()
+    run_job_batch(iter_heat_map_frames, sys.argv)
 
 
 
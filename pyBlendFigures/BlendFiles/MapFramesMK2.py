@@ -1,7 +1,8 @@
+from pyBlendFigures.Supports import job_span, get_backend
+
 from miscSupports import flatten, load_json
 from pathlib import Path
 import numpy as np
-import bpy
 import os
 
 
@@ -45,24 +46,6 @@ def _create_colour_dict(frame_dict, attr, date, colours):
                          i > 0]
 
 
-def _change_element_colour(name, colour):
-    # Isolate the current object
-    bpy.ops.object.select_all(action='DESELECT')
-    obj = bpy.context.scene.objects.get(name)
-    obj.select_set(True)
-
-    mat = obj.data.materials[0]
-    emission = mat.node_tree.nodes.get('Emission')
-    emission.inputs[0].default_value = colour
-    bpy.ops.object.select_all(action='DESELECT')
-
-
-def _change_text(name, text):
-    # Isolate the current object
-    obj = bpy.context.scene.objects.get(name)
-    obj.data.body = text
-
-
 def _make_directory(write_dir, attr):
     try:
         os.mkdir(Path(write_dir, attr))
@@ -71,8 +54,10 @@ def _make_directory(write_dir, attr):
 
 
 def main():
+    backend = get_backend()
     write_directory = r"I:\Work\Figures_and_tables\BIO-HGIS"
-    frame_dict = load_json(r"I:\Work\BIO-HGIS\Releases\Json\GBHD.txt")
+    with job_span("parse"):
+        frame_dict = load_json(r"I:\Work\BIO-HGIS\Releases\Json\GBHD.txt")
 
     attributes = sorted(list(set(flatten([[vv for vv in v.keys()] for v in frame_dict.values()]))))
     attributes = [attr for attr in attributes if attr != 'GID']
@@ -84,33 +69,27 @@ def main():
     dates = sorted(list(set(flatten(
         [flatten([v.keys() for k, v in value.items() if k != 'GID']) for value in frame_dict.values()]))))
 
-    obj = bpy.context.scene.objects.get('Districts')
-    obj.select_set(True)
-    place_dict = {colour.name: colour.node_tree.nodes.get('Emission') for colour in obj.data.materials}
-
     for attr in attributes:
         print(attr)
         _make_directory(write_directory, attr)
 
         for d in dates:
 
-            colour_dict, q_values = _create_colour_dict(frame_dict, attr, d, colours)
+            with job_span("parse"):
+                colour_dict, q_values = _create_colour_dict(frame_dict, attr, d, colours)
             if colour_dict:
-                bpy.ops.object.select_all(action='DESELECT')
-
-                for i, text in enumerate(q_values, 1):
-                    _change_element_colour(f"Q{i}", colours[i - 1])
-                    _change_element_colour(f"Q{i}T", colours[i - 1])
-                    _change_text(f"Q{i}T", text)
-
-                bpy.ops.object.select_all(action='DESELECT')
-                for place, colour in colour_dict.items():
-                    place_dict[place].inputs[0].default_value = colour
-
-                bpy.context.scene.render.filepath = str(Path(write_directory, attr, f"{d}.png").absolute())
-                bpy.context.scene.eevee.use_gtao = True
-                bpy.context.scene.render.film_transparent = True
-                bpy.ops.render.render(write_still=True)
+                with job_span("text"):
+                    for i, text in enumerate(q_values, 1):
+                        backend.set_colour(f"Q{i}", colours[i - 1])
+                        backend.set_colour(f"Q{i}T", colours[i - 1])
+                        backend.set_text(f"Q{i}T", text)
+
+                # Each place is a material of the Districts object
+                with job_span("geometry"):
+                    backend.set_material_colours("Districts", colour_dict)
+
+                with job_span("render"):
+                    backend.render_still(Path(write_directory, attr, f"{d}.png"))
 
 
 if __name__ == '__main__':
@@ -1,9 +1,14 @@
+from pyBlendFigures.Supports.blend_batch import run_job_batch
+from pyBlendFigures.Supports.bpy_mesh import fill_mesh
+from pyBlendFigures.Supports import job_span
+
 from blendSupports.Meshs.mesh_ref import make_mesh
 
 from shapely.geometry import MultiPolygon, Polygon
 from shapeObject import ShapeObject
 import sys
 import bpy
+import os
 
 
 class PolyMap:
@@ -11,12 +16,16 @@ class PolyMap:
 
         # Set attributes
         write_directory, shape_path, rec_index = args
-        self.shape_obj = ShapeObject(shape_path)
+        with job_span("parse"):
+            self.shape_obj = ShapeObject(shape_path)
         self.rec_index = int(rec_index)
 
-        # Create Map
-        self.make_shapefile_places()
-        bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/MapShp.blend")
+        # Create Map, saving to a partial file that is then renamed so MapShp.blend is never seen half written
+        with job_span("geometry"):
+            self.make_shapefile_places()
+        with job_span("save"):
+            bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/MapShp.partial.blend")
+            os.replace(f"{write_directory}/MapShp.partial.blend", f"{write_directory}/MapShp.blend")
 
     def make_shapefile_places(self):
         """
@@ -64,7 +73,7 @@ class PolyMap:
         obj, mesh = make_mesh(object_name)
         verts = self._isolate_coords(polygon.exterior.coords.xy)
 
-        mesh.from_pydata(verts, [], [[i for i in range(len(verts))]])
+        fill_mesh(mesh, verts, [], [range(len(verts))])
         bpy.ops.object.select_all(action='DESELECT')
 
         for i, hole in enumerate(polygon.interiors):
@@ -96,7 +105,7 @@ class PolyMap:
         # Create the hole mesh, if the mesh would be broken by the boolean leaving the array then remove the vert
         hole_coords = [(x, y, z) for x, y, z in self._isolate_coords(hole.xy, 200) if (x, y, 0) not in mesh_verts]
         hole_obj, hole_mesh = make_mesh(f"Hole_{hole_index}")
-        hole_mesh.from_pydata(hole_coords, [], [[i for i in range(len(hole_coords))]])
+        fill_mesh(hole_mesh, hole_coords, [], [range(len(hole_coords))])
 
         # Extrude the hole downwards so that we can create a boolean
         hole_obj.select_set(True)
@@ -135,4 +144,4 @@ class PolyMap:
 
 
 if __name__ == '__main__':
-    PolyMap(sys.argv[len(sys.argv) - 1].split("__"))
+    run_job_batch(PolyMap, sys.argv)
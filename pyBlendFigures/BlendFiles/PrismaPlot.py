@@ -1,11 +1,9 @@
-from blendSupports.Supports.collection_cleanup import collection_cleanup
-from blendSupports.Meshs.mesh_ref import make_mesh
-from blendSupports.Meshs.text import make_text
+from pyBlendFigures.Supports.blend_batch import run_job_batch
+from pyBlendFigures.Supports import job_span, get_backend
 
 from miscSupports import load_yaml, chunk_list, flatten, tuple_convert
 from pathlib import Path
 import sys
-import bpy
 
 
 # todo Docstrings
@@ -15,7 +13,11 @@ class PrismaPlot:
         write_directory, write_name, prisma_yaml, spacing, line_width, padding, bevel_segments, bevel_profile, \
             text_colour, box_colour, x_resolution, y_resolution, camera_scale, camera_position = args
 
-        self._args = load_yaml(prisma_yaml)
+        # Text and meshes are built via the backend, whilst the boxes around them are modelled within blender
+        self.backend = get_backend()
+
+        with job_span("parse"):
+            self._args = load_yaml(prisma_yaml)
 
         self.spacing = int(spacing)
         self.line_width = float(line_width)
@@ -30,34 +32,27 @@ class PrismaPlot:
         self.col_count = len(self.links["Columns"])
         self.row_count = len(self.links["Rows"])
 
-        self.widths, self.dimensions = self._set_dimensions()
+        with job_span("text"):
+            self.widths, self.dimensions = self._set_dimensions()
         self.box_names = []
 
         # Create the text and text boxes
-        self._create_text_boxes()
+        with job_span("text"):
+            self._create_text_boxes()
 
         # Create the center line and the links to the center line from the sides
-        self._create_center_line()
-        self._create_links()
-
-        # TODO Create a common renderer for all types
-        # Set the output resolution and camera scale
-        bpy.context.scene.render.resolution_x = int(x_resolution)
-        bpy.context.scene.render.resolution_y = int(y_resolution)
-
-        # Set the camera position and scale
-        camera = bpy.data.objects["Camera"]
-        camera.location = tuple_convert(camera_position)
-        camera.data.ortho_scale = float(camera_scale)
+        with job_span("geometry"):
+            self._create_center_line()
+            self._create_links()
 
-        # Render the scene
-        bpy.context.scene.render.filepath = str(Path(write_directory, f"{write_name}.png").absolute())
-        bpy.context.scene.eevee.use_gtao = True
-        bpy.context.scene.render.film_transparent = True
-        bpy.ops.render.render(write_still=True)
+        # Render the scene from the camera position and scale
+        with job_span("render"):
+            self.backend.render_still(Path(write_directory, f"{write_name}.png"), camera_position, camera_scale,
+                                      x_resolution, y_resolution)
 
         # Save the blend file for manual manipulation later
-        bpy.ops.wm.save_as_mainfile(filepath=f"{write_directory}/{write_name}.blend")
+        with job_span("save"):
+            self.backend.save(f"{write_directory}/{write_name}.blend")
 
     def _set_dimensions(self):
 
@@ -70,15 +65,15 @@ class PrismaPlot:
 
                 col_id, row_id = name.split("-")
                 if col_id == str(i):
-                    obj = make_text(name, 0, 0, position["Text"], 1, self.text_colour, align="CENTER")
-                    dimensions.append(obj.dimensions)
+                    obj = self.backend.make_text(name, 0, 0, position["Text"], 1, self.text_colour, align="CENTER")
 
-                    x, y, z = obj.dimensions
+                    x, y, z = self.backend.dimensions(obj)
+                    dimensions.append((x, y, z))
                     dimension_dict[name] = [x, y, z]
 
             widths[str(i)] = max([x for x, y, z in dimensions])
 
-        collection_cleanup("Collection")
+        self.backend.cleanup("Collection")
         return widths, dimension_dict
 
     def _create_text_boxes(self):
@@ -99,14 +94,17 @@ class PrismaPlot:
                     pass
 
     def _make_text_and_box(self, name, col_i, position, previous_height):
+        # The box modelling operators only exist within blender, so bpy is imported by the methods that need it
+        import bpy
+
         # Set the width, which is the x position, relative to other columns of this row
         width = sum([self.widths[str(i - 1)] for i in range(col_i + 1)])
         if col_i != 0:
             width += self.spacing
 
         # Create the text object and set its origin to geometry
-        obj = make_text(name, width, previous_height, position["Text"], 1, self.text_colour,
-                        align="CENTER")
+        obj = self.backend.make_text(name, width, previous_height, position["Text"], 1, self.text_colour,
+                                     align="CENTER")
         obj.select_set(True)
         bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
 
@@ -118,13 +116,14 @@ class PrismaPlot:
         self._make_bounding_box(x, y, x_d, y_d, name, obj)
 
     def _make_bounding_box(self, x, y, x_d, y_d, name, obj):
+        import bpy
+
         # Create the bounding box
         vert_list = [((x - x_d) - self.line_width, (y + y_d) + self.line_width, -0.1),
                      ((x - x_d) - self.line_width, (y - y_d) - self.line_width, -0.1),
                      ((x + x_d) + self.line_width, (y - y_d) - self.line_width, -0.1),
                      ((x + x_d) + self.line_width, (y + y_d) + self.line_width, -0.1)]
-        box_obj, mesh = make_mesh(f"{name}_box", self.box_colour)
-        mesh.from_pydata(vert_list, [], [[0, 1, 2, 3]])
+        box_obj = self.backend.make_mesh(f"{name}_box", vert_list, [], [[0, 1, 2, 3]], self.box_colour)
         self.box_names.append(box_obj.name)
 
         # Set the boxes origin to geometry
@@ -145,6 +144,7 @@ class PrismaPlot:
         box_obj.select_set(False)
 
     def _create_center_line(self):
+        import bpy
 
         # Isolate the center boxes for the center line
         center_line = [box for box in self.box_names if box.split("-")[0] == "0"]
@@ -172,12 +172,12 @@ class PrismaPlot:
 
         # Create the center line object, set the origin to the location of the temp object then delete it
         face_list = chunk_list([i for i in range(len(vert_list) * 4)], len(vert_list))
-        box_obj, mesh = make_mesh("TestJoin", self.box_colour)
-        mesh.from_pydata(flatten(vert_list), [], face_list)
+        box_obj = self.backend.make_mesh("TestJoin", flatten(vert_list), [], face_list, self.box_colour)
         box_obj.location = temp_obj.location
         bpy.ops.object.delete()
 
     def _create_links(self):
+        import bpy
 
         # Select the second column
         join_lines = [box for box in self.box_names if box.split("-")[0] == "1"]
@@ -196,9 +196,8 @@ class PrismaPlot:
                          (0, line_y - (self.line_width / 2), -self.line_width),
                          (line_x, line_y - (self.line_width / 2), -self.line_width),
                          (line_x, line_y + (self.line_width / 2), -self.line_width)]
-            box_obj, mesh = make_mesh(f"{obj.name}_link", self.box_colour)
-            mesh.from_pydata(vert_list, [], [[0, 1, 2, 3]])
+            self.backend.make_mesh(f"{obj.name}_link", vert_list, [], [[0, 1, 2, 3]], self.box_colour)
 
 
 if __name__ == '__main__':
-    PrismaPlot(sys.argv[len(sys.argv) - 1].split("__"))
+    run_job_batch(PrismaPlot, sys.argv)
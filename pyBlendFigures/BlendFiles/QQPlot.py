@@ -1,21 +1,22 @@
-from blendSupports.Renders.render import open_gl_render, render_scene
-from blendSupports.Meshs.graph_axis import make_graph_axis
-from blendSupports.Meshs.mesh_ref import make_mesh
-from blendSupports.Meshs.text import make_text
+from pyBlendFigures.Supports.blend_batch import run_job_batch
+from pyBlendFigures.Supports import job_span, get_backend, get_summary_cache, iter_summary_blocks, negative_log10, \
+    expected_neg_log10, QQSketch, external_qq_points, QQ_BLOCK_ROWS
 
-from miscSupports import open_setter, decode_line, terminal_time, FileOut, tuple_convert
+from miscSupports import terminal_time, FileOut, tuple_convert
 from pathlib import Path
 import numpy as np
 import math
 import sys
-import bpy
 
 
 class QQPlot:
     def __init__(self, args):
 
         write_directory, summary_file, p_value_index, write_name, log_transform, set_bounds, line_width, axis_colour, \
-            camera_position, camera_scale, x_res, y_res = args
+            camera_position, camera_scale, x_res, y_res, qq_mode = args
+
+        # Geometry is built via the backend, which is blender unless another has been set
+        self.backend = get_backend()
 
         # Camera setup
         self.camera_position = camera_position
@@ -23,99 +24,184 @@ class QQPlot:
         self.x_res = x_res
         self.y_res = y_res
 
-        # Setup the file for the process
+        # Setup the file for the process, which may be an array of p values prepared on the host via the job manifest
         self.write_directory = write_directory
-        self.summary_file = Path(summary_file)
-        self.zipped = self.summary_file.suffix == ".gz"
+        self.summary_file = summary_file if isinstance(summary_file, np.ndarray) else Path(summary_file)
         self.write_name = write_name
 
+        # Exact sorts every observed value, external sorts them out of core, whilst streaming summarises them via a
+        # QQSketch in constant memory
+        if qq_mode not in ("exact", "external", "streaming"):
+            raise ValueError(f"qq_mode takes exact, external or streaming but was given {qq_mode}")
+        self.qq_mode = qq_mode
+
         # Set the logger
         self.logger = FileOut(self.write_directory, f"{self.write_name}", "log", True)
-        self.logger.write(f"Starting {self.summary_file.stem}: {terminal_time()}\n")
+        self.logger.write(f"Starting {self.write_name}: {terminal_time()}\n")
 
         # Draw the QQ plot
         x_values, y_values = self._draw_qq(int(p_value_index), bool(log_transform))
 
         # Draw the Axis
-        self._axis(x_values, y_values, set_bounds, float(line_width), tuple_convert(axis_colour))
+        with job_span("geometry"):
+            x, y = self._axis(x_values, y_values, set_bounds, float(line_width), tuple_convert(axis_colour))
+
+        with job_span("text"):
+            self._label_axis(x, y, tuple_convert(axis_colour))
+
+        # Render the scene, then save the blend file for manual manipulation later
+        with job_span("render"):
+            self.backend.render(self.camera_position, self.write_directory, f"{self.write_name}__AXIS.png", self.x_res,
+                                self.y_res, self.camera_scale, "BLENDER_EEVEE")
+        with job_span("save"):
+            self.backend.save(f"{self.write_directory}/{self.write_name}__AXIS.png.blend")
+        self.logger.write(f"Written the AXIS out at {terminal_time()}")
 
     def _draw_qq(self, p_value_index, log_transform):
-        # Extract the sorted -log10 values for the y values
-        y_values = self._y_values_from_p(p_value_index, log_transform)
-
-        # Create the x values as a vector between -log(1) and -log(1/N) for N values
-        x_values = sorted([-math.log10(v) for v in np.linspace(1, 1 / len(y_values), len(y_values))])
+        # Extract the expected and observed -log10 values of each point
+        if self.qq_mode == "streaming":
+            with job_span("parse"):
+                sketch = self._sketch_y_values(p_value_index, log_transform)
+            with job_span("geometry"):
+                x_values, y_values = sketch.points()
+            self.logger.write(f"Sketched {sketch.total} values as {len(y_values)} points")
+
+        elif self.qq_mode == "external":
+            with job_span("parse"):
+                x_values, y_values = external_qq_points(
+                    self._iter_y_values(p_value_index, log_transform), self.write_directory,
+                    tuple_convert(self.camera_position), float(self.camera_scale), int(self.x_res), int(self.y_res))
+            self.logger.write(f"Merged the sorted values into {len(y_values)} points")
 
-        # Create the vertexes from the x and y, hold z as 0
-        vertexes = [(x, y, 0) for x, y in zip(x_values, y_values)]
-
-        # Make the points data
-        obj, mesh = make_mesh(f"QQ")
-        mesh.from_pydata(vertexes, [], [])
-
-        # Render the QQ points
-        open_gl_render(self.camera_position, self.write_directory, f"{self.write_name}__POINTS", self.x_res, self.y_res,
-                       camera_scale=self.camera_scale)
+        else:
+            with job_span("parse"):
+                y_values = self._y_values_from_p(p_value_index, log_transform)
+            x_values = expected_neg_log10(np.arange(len(y_values)), len(y_values))
+
+        with job_span("geometry"):
+            # Make the points data
+            self.backend.make_mesh("QQ", self.qq_vertexes(x_values, y_values))
+
+        # Render the QQ points, then save the blend file for manual manipulation later
+        with job_span("render"):
+            self.backend.render(self.camera_position, self.write_directory, f"{self.write_name}__POINTS", self.x_res,
+                                self.y_res, self.camera_scale, opengl=True)
+        with job_span("save"):
+            self.backend.save(f"{self.write_directory}/{self.write_name}__POINTS.blend")
         self.logger.write(f"Written QQ Points at {terminal_time()}")
 
         # Return the bounds for the axis
         return x_values, y_values
 
-    def _y_values_from_p(self, p_value_index, log_transform):
+    @staticmethod
+    def qq_vertexes(x_values, y_values):
         """
-        Create the y values from the -log 10 p values.
+        Create the vertexes of the points of each expected and observed value
+
+        :param x_values: The expected -log10 p values
+        :type x_values: numpy.ndarray
+
+        :param y_values: The observed -log10 p values
+        :type y_values: numpy.ndarray
+
+        :return: The (x, y, 0) vertexes
+        :rtype: numpy.ndarray
+        """
+        vertexes = np.zeros((len(y_values), 3), dtype=np.float32)
+        vertexes[:, 0] = x_values
+        vertexes[:, 1] = y_values
+        return vertexes
+
+    def _sketch_y_values(self, p_value_index, log_transform):
+        """
+        Stream the observed -log 10 p values into a QQSketch, whose bins cover the values visible within the render so
+        that memory is bounded by the resolution rather than the number of values
 
-        :param p_value_index: The index of the p value column in the summary stat file
+        :param p_value_index: The index of the p value column in the summary stat file, ignored if the summary file is
+            an array of p values
         :type p_value_index: int
 
         :param log_transform: If the p value is not in a -log 10 then it needs to be converted, otherwise this can be
             False
         :type log_transform: bool
 
-        :return: The sorted list of -log 10 p values
-        :rtype: list
+        :return: The sketch of the observed values
+        :rtype: QQSketch
         """
+        # The orthographic camera fits its scale to the larger dimension, so each pixel is the same size on both axis
+        pixel_size = float(self.camera_scale) / max(int(self.x_res), int(self.y_res))
+        camera_y = tuple_convert(self.camera_position)[1]
+        half_height = pixel_size * int(self.y_res) / 2
+
+        # Pad the visible range by a few pixels, so points that only partly overlap the render are still drawn
+        sketch = QQSketch(camera_y - half_height - 4 * pixel_size, camera_y + half_height + 4 * pixel_size, pixel_size)
+        for y_values in self._iter_y_values(p_value_index, log_transform):
+            sketch.update(y_values)
+        return sketch
+
+    def _iter_y_values(self, p_value_index, log_transform):
+        """Yield the observed -log 10 p values in blocks, from the summary cache if enabled or else parsing the file"""
+        if isinstance(self.summary_file, np.ndarray):
+            for start in range(0, len(self.summary_file), QQ_BLOCK_ROWS):
+                values = self.summary_file[start:start + QQ_BLOCK_ROWS]
+                yield negative_log10(values) if log_transform else values
+            return
+
+        cache = get_summary_cache(self.summary_file)
+        if cache:
+            values = cache.neg_log10(p_value_index) if log_transform else \
+                cache.columns([p_value_index], [np.float64])[0]
+            for start in range(0, len(values), QQ_BLOCK_ROWS):
+                yield values[start:start + QQ_BLOCK_ROWS]
+            return
+
+        for values, in iter_summary_blocks(self.summary_file, [p_value_index], [np.float64]):
+            yield negative_log10(values) if log_transform else values
 
-        log_v = []
-        with open_setter(self.summary_file)(self.summary_file) as file:
+    def _y_values_from_p(self, p_value_index, log_transform):
+        """
+        Create the y values from the -log 10 p values.
 
-            # Skip the header
-            file.readline()
+        :param p_value_index: The index of the p value column in the summary stat file, ignored if the summary file is
+            an array of p values
+        :type p_value_index: int
 
-            for index, line_byte in enumerate(file):
-                if index % 100000 == 0:
-                    self.logger.write(f"Processed {index} Lines")
+        :param log_transform: If the p value is not in a -log 10 then it needs to be converted, otherwise this can be
+            False
+        :type log_transform: bool
 
-                # Extract the p value
-                p_value = float(decode_line(line_byte, self.zipped)[p_value_index])
+        :return: The sorted -log 10 p values
+        :rtype: numpy.ndarray
+        """
+        if isinstance(self.summary_file, np.ndarray):
+            p_values = -np.log10(self.summary_file) if log_transform else np.asarray(self.summary_file)
+            return np.sort(p_values)
 
-                # Log transform the p value if required
-                if log_transform:
-                    p_value = -math.log10(p_value)
-                log_v.append(p_value)
+        # Memory map the sorted values from the summary cache, which is built on the first figure made from a file
+        cache = get_summary_cache(self.summary_file)
+        if cache:
+            return cache.sorted_column(p_value_index, log_transform)
 
-        # Sort the values from smallest to largest
-        return sorted(log_v)
+        # Otherwise parse the p values in blocks
+        p_values = np.concatenate([values for values, in iter_summary_blocks(
+            self.summary_file, [p_value_index], [np.float64])] or [np.empty(0)])
+        self.logger.write(f"Processed {len(p_values)} Lines")
+
+        # Log transform the p value if required, then sort the values from smallest to largest
+        return np.sort(-np.log10(p_values) if log_transform else p_values)
 
     def _axis(self, x_values, y_values, set_bounds, line_width, axis_colour):
 
         # Make the 45% line from the min of the max
-        end_point = min([max(y_values), max(x_values)])
-        line, line_mesh = make_mesh("Line", axis_colour)
-        line_mesh.from_pydata([(0, 0, 0), (end_point, end_point, 0)], [(0, 1)], [])
-
-        # Turn line to curve, add width equal to line_width
-        line.select_set(True)
-        bpy.ops.object.convert(target='CURVE')
-        bpy.context.object.data.bevel_resolution = 0
-        bpy.context.object.data.bevel_depth = line_width
+        end_point = min([float(np.max(y_values)), float(np.max(x_values))])
+        self.backend.make_line("Line", (0, 0, 0), (end_point, end_point, 0), line_width, axis_colour)
 
         # Create the bounds
-        x_bound = max(x_values)
-        y_bound = max(y_values)
+        x_bound = float(np.max(x_values))
+        y_bound = float(np.max(y_values))
 
         # define the Bound of the axis
-        if set_bounds != "None":
+        if set_bounds not in (None, "None"):
             x, y = tuple_convert(set_bounds)
             if (x_bound > x) or (y_bound > y):
                 x = max([x_bound, x])
@@ -125,34 +211,26 @@ class QQPlot:
             x, y = x_bound, y_bound
 
         # Make the graphs axis
-        make_graph_axis(axis_colour, x, y, line_width, 0.0)
+        self.backend.make_graph_axis(axis_colour, x, y, line_width, 0.0)
+        return x, y
+
+    def _label_axis(self, x, y, axis_colour):
+        """Label the theoretical x axis and the observed y axis"""
 
         # TODO see if we can generalise the axis for make graph axis to also include the annotation
         # Label the x axis
-        make_text("Theoretical -log10", math.floor(x) / 2, -1, "Theoretical -log10", 0.5, axis_colour, "CENTER")
+        self.backend.make_text("Theoretical -log10", math.floor(x) / 2, -1, "Theoretical -log10", 0.5, axis_colour,
+                               "CENTER")
         for i in range(math.floor(x)):
-            make_text(f"{i}", i + 0.5, -0.5, f"{i + 1}", 0.5, axis_colour, "CENTER")
-
-        # Label the y axis
-        make_text("Observed -log 10", -1, math.floor(y) / 2, "Observed -log 10", 0.5, axis_colour, "CENTER")
+            self.backend.make_text(f"{i}", i + 0.5, -0.5, f"{i + 1}", 0.5, axis_colour, "CENTER")
 
-        # Y axis needs to be rotated
-        obj = bpy.data.objects["Observed -log 10"]
-        obj.select_set(True)
-        bpy.ops.transform.rotate(value=1.5708, orient_axis='Z', orient_type='GLOBAL',
-                                 orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL',
-                                 constraint_axis=(False, False, True), mirror=True, use_proportional_edit=False,
-                                 proportional_edit_falloff='SMOOTH', proportional_size=1,
-                                 use_proportional_connected=False, use_proportional_projected=False)
+        # Label the y axis, which needs to be rotated
+        self.backend.make_text("Observed -log 10", -1, math.floor(y) / 2, "Observed -log 10", 0.5, axis_colour,
+                               "CENTER")
+        self.backend.rotate("Observed -log 10", 1.5708)
 
         for i in range(math.floor(y)):
-            make_text(f"log{i}", -0.5, i + 0.5, f"{i + 1}", 0.5, axis_colour, "CENTER")
-
-        # Render the scene
-        render_scene(self.camera_position, self.write_directory, f"{self.write_name}__AXIS.png", "BLENDER_EEVEE",
-                     self.x_res, self.y_res, camera_scale=self.camera_scale)
-        self.logger.write(f"Written the AXIS out at {terminal_time()}")
-
+            self.backend.make_text(f"log{i}", -0.5, i + 0.5, f"{i + 1}", 0.5, axis_colour, "CENTER")
 
 if __name__ == '__main__':
-    QQPlot(sys.argv[len(sys.argv) - 1].split("__"))
+    run_job_batch(QQPlot, sys.argv)
@@ -1,7 +1,11 @@
+from pyBlendFigures.Supports.bpy_mesh import fill_mesh
+from pyBlendFigures.Supports import job_span
+
 from blendSupports.Meshs.mesh_ref import make_mesh
 from blendSupports.Meshs.text import make_text
 
 from miscSupports import load_json, tuple_convert
+import numpy as np
 import math
 import bpy
 
@@ -11,7 +15,8 @@ class Scatter:
 
         load_path, label_threshold, name_index, x_index, y_index, ico_scale, text_scale, label_scale, text_colour = args
 
-        self.scatter_groups = load_json(load_path)
+        with job_span("parse"):
+            self.scatter_groups = load_json(load_path)
 
         self.label_threshold = float(label_threshold)
         self.name_index = int(name_index)
@@ -23,8 +28,10 @@ class Scatter:
         self._text_colour = tuple_convert(text_colour)
 
         self._y_max = []
-        self._make_point_groups()
-        self.make_y_axis()
+        with job_span("geometry"):
+            self._make_point_groups()
+        with job_span("text"):
+            self.make_y_axis()
 
     def _make_point_groups(self):
         [self.make_group(group, points) for group, points in self.scatter_groups.items()]
@@ -39,15 +46,17 @@ class Scatter:
         self.link_ico(obj)
 
     def make_vertex_holder(self, group, points):
-        vertexes = [(p[self.x_index], p[self.y_index], 0) for p in points]
-
         x_points = [p[self.x_index] for p in points]
+        y_points = [p[self.y_index] for p in points]
+
+        vertexes = np.zeros((len(points), 3), dtype=np.float32)
+        vertexes[:, 0] = x_points
+        vertexes[:, 1] = y_points
 
         obj, mesh = make_mesh(group)
-        mesh.from_pydata(vertexes, [], [])
+        fill_mesh(mesh, vertexes)
 
         if len(vertexes) > 0:
-            y_points = [p[self.y_index] for p in points]
             self._y_max.append(max(y_points))
             [self.label_points(points, x_points, i, y) for i, y in enumerate(y_points) if y > self.label_threshold]
             return obj, (min(x_points) + max(x_points)) / 2,
@@ -0,0 +1,8 @@
+from pyBlendFigures.Supports.blend_batch import run_timed_script
+
+import sys
+
+
+if __name__ == '__main__':
+    # Launched as blender --python TimedScript.py -- script manifest, so the script sees the manifest as its last arg
+    run_timed_script(sys.argv[sys.argv.index("--") + 1], sys.argv)
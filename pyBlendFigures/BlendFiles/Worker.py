@@ -0,0 +1,67 @@
+from pyBlendFigures.Supports.blend_batch import run_timed_script
+from pyBlendFigures.Supports import set_backend
+
+from multiprocessing.connection import Client
+import traceback
+import sys
+import bpy
+
+
+class Worker:
+    def __init__(self, args):
+        host, port, authkey = args
+
+        # The scene is reset to the file blender was launched with, so isolate it before any job can save over it
+        self.base_file = bpy.data.filepath
+        self.base_argv = list(sys.argv)
+
+        self.connection = Client((host, int(port)), authkey=bytes.fromhex(authkey))
+        self.serve()
+
+    def serve(self):
+        """
+        Receive jobs from the controller until it sends None, replying with the status of each job once it has been run
+
+        :return: Nothing, serve jobs then stop
+        :rtype: None
+        """
+        while True:
+            job = self.connection.recv()
+            if job is None:
+                break
+
+            self.connection.send(self.run_job(job["script"], job["args"]))
+        self.connection.close()
+
+    def run_job(self, script, args):
+        """
+        Reset the scene from the base file then run a BlendFiles script as if blender had been launched with it, timed
+        as a job via run_timed_script
+
+        :param script: Path to the BlendFiles script
+        :type script: str
+
+        :param args: Path to the job manifest the script would normally receive as the last command line argument
+        :type args: str
+
+        :return: A dict with the status of the job and, if it failed, the traceback
+        :rtype: dict
+        """
+        try:
+            bpy.ops.wm.open_mainfile(filepath=self.base_file)
+
+            # Opening the base file invalidates any blender objects the previous job's backend still references
+            set_backend(None)
+            sys.argv = self.base_argv + [args]
+            run_timed_script(script, sys.argv)
+            return {"status": "ok"}
+
+        except Exception:
+            return {"status": "error", "traceback": traceback.format_exc()}
+
+        finally:
+            sys.argv = self.base_argv
+
+
+if __name__ == '__main__':
+    Worker(sys.argv[sys.argv.index("--") + 1:])
@@ -1,20 +1,102 @@
-from pyBlendFigures.FigureLogic import *
-
-from miscSupports import validate_path, directory_iterator
+from pyBlendFigures.Controller.Scheduler import BlendScheduler, BlendJob, BlendJobError
+from pyBlendFigures.Controller.RenderCache import RenderCache
+from pyBlendFigures.Controller.WorkerPool import BlendWorkerPool
+from pyBlendFigures.Supports import write_job_manifest, summary_column_indexes, summary_index, SummaryCache, \
+    clear_summary_cache, index_plot_layers
+from pyBlendFigures import FigureLogic
+
+from miscSupports import validate_path
+from functools import partial
 from pathlib import Path
-import subprocess
+import numpy as np
+import threading
+import inspect
+import json
 import time
 import os
 
 
 class BlendFigure:
-    def __init__(self, blender_path, working_directory):
+    def __init__(self, blender_path, working_directory, workers=0, max_jobs=None, memory_per_job=2 * 1024 ** 3,
+                 cache_directory=None, cache_size=10 * 1024 ** 3, profile=False, trace_memory=False,
+                 summary_cache=None, summary_cache_size=10 * 1024 ** 3, summary_processes=None):
+        """
+        Controller for creating figures via blender
+
+        :param blender_path: Path to the blender executable
+        :type blender_path: str | Path
+
+        :param working_directory: Directory that figures, and their intermediary files, are written to
+        :type working_directory: str | Path
+
+        :param workers: If greater than zero, figures are run on a pool of this many long lived blender processes rather
+            than launching a new blender process per figure, defaults to 0
+        :type workers: int
+
+        :param max_jobs: The maximum number of blender jobs to run at once, with the rest queued. If None this is set
+            from the number of cores and the available memory, defaults to None
+        :type max_jobs: int | None
+
+        :param memory_per_job: Expected memory use of a single blender job in bytes, used to limit the number of jobs
+            run at once when max_jobs is None, defaults to 2GB
+        :type memory_per_job: int
+
+        :param cache_directory: If set, rendered files are cached here and figures whose script, arguments, and input
+            files are unchanged are restored from the cache rather than rendered, defaults to None
+        :type cache_directory: str | Path | None
+
+        :param cache_size: Size in bytes the cache may grow to before the least recently used entries are evicted,
+            defaults to 10GB
+        :type cache_size: int
+
+        :param profile: If each blender job should be profiled with cProfile, with the stats written alongside its timing
+            report in BlendJobs, defaults to False
+        :type profile: bool
+
+        :param trace_memory: If each blender job should trace its memory allocations with tracemalloc, defaults to False
+        :type trace_memory: bool
+
+        :param summary_cache: Where the parsed columns of gwas summary statistics are cached, so that the manhattan and
+            qq plots of a file only parse it once. True holds the cache alongside each file, a directory holds every
+            cache within it, and None disables caching, defaults to None
+        :type summary_cache: bool | str | Path | None
+
+        :param summary_cache_size: Size in bytes each summary cache directory may grow to before its least recently
+            used files are evicted, defaults to 10GB
+        :type summary_cache_size: int
+
+        :param summary_processes: Processes each job decompresses and parses bgzipped summary statistics with, where 1
+            parses them within the job, defaults to None for one per core
+        :type summary_processes: int | None
+        """
 
         self._blend_path = str(validate_path(blender_path).absolute())
         self._base_file = str(Path(Path(__file__).parent, "Base.blend").absolute())
         self._blend_scripts = Path(Path(__file__).parent.parent, "BlendFiles").absolute()
+        self._timed_script = str(Path(self._blend_scripts, "TimedScript.py"))
         self._working_dir = str(validate_path(working_directory).absolute())
 
+        # Worker pools are created on first use, one for background jobs and one for those that require a window
+        self._workers = workers
+        self._pools = {}
+        self._pool_lock = threading.Lock()
+
+        # Jobs are queued on the scheduler, so only a limited number of blender processes run at once
+        self._max_jobs = max_jobs
+        self._memory_per_job = memory_per_job
+        self._scheduler = BlendScheduler(max_jobs, memory_per_job)
+        self._host_scheduler = None
+
+        # Cache of rendered files, keyed on the script, its arguments and its input files
+        self._cache = RenderCache(cache_directory, cache_size) if cache_directory else None
+
+        # Options passed to each job, rather than to the figure it creates
+        self._summary_cache = summary_cache if summary_cache in (True, None) else str(Path(summary_cache).absolute())
+        self._summary_cache_size = summary_cache_size
+        self._job_options = {"profile": profile, "trace_memory": trace_memory, "summary_cache": self._summary_cache,
+                             "summary_cache_size": summary_cache_size,
+                             "summary_processes": summary_processes}
+
         # Todo: Potential make this information, along side the above and the colour data a separate class
         # TODO: Extract the camera and resolution options from plots as a common attribute
 
@@ -82,14 +164,36 @@ class BlendFigure:
         :param camera_position: Positions of camera in (x, y, z), defaults to (0, -1.5, 18)
         :type camera_position: (float, float, float)
 
-        :return: Nothing, process then finish
-        :rtype: None
+        :return: The handle to the blender job
+        :rtype: BlendJob
         """
 
-        subprocess.Popen([self._blend_path, "-b", self._base_file, "--python",
-                          str(Path(self._blend_scripts, "ForestPlot.py")), self._prepare_args(locals())])
+        return self._run_script("ForestPlot", self._prepare_args(locals()), output_names=[image_name])
 
-    def heat_map_raw_frames(self, points_path, days_length, date_index, point_radius, point_colour, camera_z=10):
+    def forest_plot_batch(self, csv_paths, image_names, height_iteration, coefficient_radius, value_title,
+                          variable_bound=1.0, ci_bound=0.1, rounder=3, text_colour="Black", axis_width=0.005,
+                          axis_label="X_Axis", axis_colour="Dark_Grey", y_scale=0.1, x_resolution=1080,
+                          y_resolution=1080, image_type="png", camera_scale=4, camera_position=(0, -1.5, 18),
+                          axis_position=0):
+        """
+        Will create a forest plot for each csv within a single blender session, cleaning up the scene between each plot
+        rather than launching blender for each plot. All other arguments are as forest_plot, and are shared by every
+        plot in the batch.
+
+        :param csv_paths: Paths to csv data containing four columns of phenotype, coefficient, lower bound, upper bound
+        :type csv_paths: list[str | Path]
+
+        :param image_names: Name of the output image of each csv, must be of equal length to csv_paths
+        :type image_names: list[str]
+
+        :return: The handle to the blender job
+        :rtype: BlendJob
+        """
+        return self._run_script("ForestPlot", self._prepare_batch_args(
+            self.forest_plot, locals(), csv_path=csv_paths, image_name=image_names), output_names=image_names)
+
+    def heat_map_raw_frames(self, points_path, days_length, date_index, point_radius, point_colour, camera_z=10,
+                            frame_stack=None):
         """
         This will generate the frames you need for the heat map
 
@@ -103,14 +207,21 @@ class BlendFigure:
         :param days_length:
         :param point_radius:
         :param point_colour:
-        :return:
+
+        :param frame_stack: Path of a FrameStack to append the frames to, labelled by their date, rather than writing
+            a png per frame into the working directory, defaults to None
+        :type frame_stack: str | Path | None
+
+        :return: The handle to the blender job
+        :rtype: BlendJob
         """
+        if frame_stack is not None:
+            frame_stack = str(Path(frame_stack).absolute())
 
-        subprocess.Popen([self._blend_path, "-b", self._base_file, "--python",
-                          str(Path(self._blend_scripts, "HeatMap.py")), self._prepare_args(locals())])
+        return self._run_script("IntensityMap", self._prepare_args(locals()))
 
     def heat_map_gradient_frames(self, point_colour, point_out_directory, gradient_out_directory, gradient_scalar=1.2,
-                                 gradient_divider=2):
+                                 gradient_divider=2, frame_stack=None):
         """
         Create the heat map frames from the raw's
 
@@ -129,17 +240,39 @@ class BlendFigure:
         :param gradient_divider: Divider of the current totals (after multiplication) on frame interation
         :type gradient_divider: float
 
+        :param frame_stack: Path of the FrameStack of raw frames from heat_map_raw_frames, in which case the point and
+            gradient frames are written to the FrameStack paths given as point_out_directory and gradient_out_directory
+            rather than as png's, defaults to None to read the png raw frames of the working directory
+        :type frame_stack: str | Path | None
+
         :return: Nothing, write the frames then stop
         :rtype: None
         """
-        create_heat_map_frames(self._working_dir, point_colour, point_out_directory, gradient_out_directory,
-                               gradient_scalar, gradient_divider)
+        FigureLogic.create_heat_map_frames(self._working_dir if frame_stack is None else frame_stack, point_colour,
+                                           point_out_directory, gradient_out_directory, gradient_scalar,
+                                           gradient_divider, frame_stack=frame_stack is not None)
+
+    @staticmethod
+    def frame_stack_pngs(frame_stack, output_directory):
+        """
+        Write each frame of a FrameStack, such as from heat_map_gradient_frames, as a png named by its label
+
+        :param frame_stack: Path to the FrameStack
+        :type frame_stack: str | Path
+
+        :param output_directory: Write directory for the frames
+        :type output_directory: str | Path
+
+        :return: Nothing, write the frames then stop
+        :rtype: None
+        """
+        FigureLogic.export_frame_stack(frame_stack, output_directory)
 
     def manhattan_points(self, write_name, gwas_output_path, chromosome_groups, chromosome_headers="CHR",
                          snp_header="SNP", base_position_header="BP", p_value_header="P", camera_position=(12, 9, 55),
                          camera_scale=40, x_axis_width=23.5, axis_colour="Dark_Grey", line_density=80, axis_width=0.2,
                          bound=0.2, significance=8, significance_colour=(0, 0, 1, 1), x_resolution=1920,
-                         y_resolution=1080):
+                         y_resolution=1080, decimate_below=None, point_size=3, rasterise_points=False):
         """
         This will create the points for a manhattan plot
 
@@ -148,7 +281,8 @@ class BlendFigure:
         This can take a while, check the file_name.log in the directory you assigned for details on the progress
 
         This cannot be done purely in the background via the -b subprocessor as opengl requires the window to be
-        initialised. As such this will create a blender instance window.
+        initialised. As such this will create a blender instance window, unless rasterise_points is set so that blender
+        only renders the axis.
 
         Source: https://blender.stackexchange.com/questions/2573/render-with-opengl-from-the-command-line
 
@@ -208,13 +342,116 @@ class BlendFigure:
         :param y_resolution: Y dimension of image output, defaults to 1080
         :type y_resolution: int
 
-        :return: Nothing, process file then stop
+        :param decimate_below: If set, points below this -log10 p value are decimated so only one point is drawn per
+            pixel of the render, which leaves the render unchanged whilst removing the majority of points of large
+            files. Every point at or above it is kept, defaults to None
+        :type decimate_below: float | None
+
+        :param point_size: Size in pixels each point is drawn at, used to decimate or rasterise points, defaults to 3
+        :type point_size: int
+
+        :param rasterise_points: If the point layer of each group should be drawn with numpy on the host rather than
+            rendered by blender, which is far faster for large files and runs blender in the background as only the
+            axis is left for it to render. Points are drawn without anti-aliasing, defaults to False
+        :type rasterise_points: bool
+
+        :return: The handle to the blender job
+        :rtype: BlendJob
+        """
+        args = self._prepare_args(locals())
+        if not rasterise_points:
+            return self._run_script("Manhattan", dict(args, axis_height=None), background=False,
+                                    output_names=[write_name])
+
+        points_job = self.host_job(
+            FigureLogic.create_manhattan_points, self._working_dir, write_name, args["gwas_output_path"],
+            chromosome_groups, chromosome_headers, base_position_header, p_value_header, camera_position, camera_scale,
+            x_resolution, y_resolution, point_size, self._summary_cache, self._summary_cache_size)
+
+        # The axis is rendered once the points are, at the height of the highest point, so blender never reads them
+        def manhattan_axis():
+            axis_height = max(y_max for y_max in points_job.result() if y_max is not None)
+            return self._run_script("Manhattan", dict(args, axis_height=axis_height), background=True,
+                                    output_names=[f"{write_name}__AXIS"])
+        return points_job.then(manhattan_axis)
+
+    @staticmethod
+    def index_summary_file(gwas_output_path, chromosome_headers="CHR"):
+        """
+        Index where each chromosome lies within gwas summary statistics, writing the index alongside the file as
+        file_name.chrindex. manhattan_points indexes the file on its first run, but large files re-plotted with
+        different groups can be indexed ahead of time so each job seeks straight to the chromosomes it needs. The index
+        is rebuilt automatically if the file changes.
+
+        :param gwas_output_path: Path to the gwas summary statistics, which may be gzipped or bgzipped
+        :type gwas_output_path: Path | str
+
+        :param chromosome_headers: The header name of the chromosome column, defaults to CHR
+        :type chromosome_headers: str
+
+        :return: The index, with the (start, end) offsets of each run of rows of each chromosome
+        :rtype: dict
+        """
+        chromosome_column = summary_column_indexes(gwas_output_path, [chromosome_headers])[0]
+        return summary_index(gwas_output_path, chromosome_column)
+
+    def cache_summary_file(self, gwas_output_path, chromosome_headers="CHR", base_position_header="BP",
+                           p_value_header="P"):
+        """
+        Parse gwas summary statistics into the summary cache ahead of time, so that manhattan_points and qq_plot memory
+        map the parsed columns rather than parsing the file. Otherwise the first figure made from a file caches it.
+
+        :param gwas_output_path: Path to the gwas summary statistics, which may be gzipped or bgzipped
+        :type gwas_output_path: Path | str
+
+        :param chromosome_headers: The header name of the chromosome column, defaults to CHR
+        :type chromosome_headers: str
+
+        :param base_position_header: The header name of the base position column, defaults to BP
+        :type base_position_header: str
+
+        :param p_value_header: The header name of the p value column, defaults to P
+        :type p_value_header: str
+
+        :return: The summary cache of the file
+        :rtype: SummaryCache
+
+        :raises ValueError: If the summary cache has been disabled
+        """
+        if self._summary_cache is None:
+            raise ValueError("The summary cache is disabled, set summary_cache to True or a directory to cache files")
+
+        chromosome_column, base_position_column, p_value_column = summary_column_indexes(
+            gwas_output_path, [chromosome_headers, base_position_header, p_value_header])
+
+        cache = SummaryCache(gwas_output_path, None if self._summary_cache is True else self._summary_cache,
+                             self._summary_cache_size)
+        cache.columns([chromosome_column, base_position_column], [np.int8, np.int32])
+        cache.sorted_column(p_value_column)
+        return cache
+
+    def clear_summary_cache(self, gwas_output_path=None):
+        """
+        Remove the cached columns of every summary file from the summary cache directory, or from the .summary_cache
+        directory alongside gwas_output_path if the cache is held alongside each file
+
+        :param gwas_output_path: Path to a summary file whose cache directory should be cleared, required if the cache is
+            held alongside each file, defaults to None
+        :type gwas_output_path: Path | str | None
+
+        :return: Nothing, clear the cache then stop
         :rtype: None
+
+        :raises ValueError: If the cache is held alongside each file and no gwas_output_path was given
         """
-        subprocess.Popen([self._blend_path, self._base_file, "--python",
-                          str(Path(self._blend_scripts, "Manhattan.py")), self._prepare_args(locals())])
+        if self._summary_cache is True or self._summary_cache is None:
+            if gwas_output_path is None:
+                raise ValueError("The summary cache is held alongside each file, so gwas_output_path is required")
+            clear_summary_cache(Path(Path(gwas_output_path).absolute().parent, ".summary_cache"))
+        else:
+            clear_summary_cache(self._summary_cache)
 
-    def manhattan_plot(self, colours, output_directory):
+    def manhattan_plot(self, colours, output_directory, processes=1):
         """
         This will take the images in the working directory from manhattan_points and compile them into the images
 
@@ -226,27 +463,33 @@ class BlendFigure:
             for missing AXIS files for the output images
         :type output_directory: str | Path
 
+        :param processes: Processes to compile the plots with, defaults to 1 to compile them within this process. None
+            uses one per core
+        :type processes: int | None
+
         :return: Nothing, compile images then stop
         :rtype: None
+
+        :raises CompositeError: Once every other plot is compiled, if any plot failed to compile, with the error of each
         """
 
-        # Isolate the unique image names
-        unique_names = list(set([file.split("__")[0] for file in directory_iterator(self._working_dir)
-                                 if (".log" not in file) and (".blend" not in file)]))
+        # Index the layers of every plot from a single listing of the working directory
+        plots = index_plot_layers(self._working_dir)
 
-        # For each plot, compile the images
-        for name in unique_names:
-            create_manhattan_plot(name, self._working_dir, colours, output_directory)
+        # Compile the images of each plot
+        FigureLogic.composite_plots("create_manhattan_plot", plots, self._working_dir, colours, output_directory,
+                                    processes)
 
     def qq_plot(self, summary_file, p_value_index, write_name, log_transform=True, set_bounds=None,
                 line_width=0.05, axis_colour="Dark_Grey", camera_position=(10, 10, 30), camera_scale=25,
-                x_resolution=1080, y_resolution=1080):
+                x_resolution=1080, y_resolution=1080, qq_mode="exact"):
 
         """
         Create a QQ plot from summary statistics file
 
-        :param summary_file: Path to the gwas summary statistics
-        :type summary_file: str | Path
+        :param summary_file: Path to the gwas summary statistics, or an array of p values that have already been
+            isolated, which will be handed to blender as a memory mapped .npy file
+        :type summary_file: str | Path | numpy.ndarray
 
         :param p_value_index: P value index of in the summary file
         :type p_value_index: int
@@ -279,26 +522,94 @@ class BlendFigure:
         :param y_resolution: Y dimension of image output, defaults to 1080
         :type y_resolution: int
 
-        :return: Nothing, process file then stop
-        :rtype: None
+        :param qq_mode: How the observed values are sorted. exact sorts every value in memory, external sorts them in
+            runs spilled to the working directory and merges them keeping a single point per pixel, whilst streaming
+            holds memory constant by keeping the largest values exactly and counting the rest within bins a fraction of
+            a pixel high. Each leaves the plot unchanged, defaults to exact
+        :type qq_mode: str
+
+        :return: The handle to the blender job
+        :rtype: BlendJob
         """
 
-        subprocess.Popen([self._blend_path, self._base_file, "--python",
-                          str(Path(self._blend_scripts, "QQPlot.py")), self._prepare_args(locals())])
+        return self._run_script("QQPlot", self._prepare_args(locals()), background=False,
+                                output_names=[write_name])
+
+    def qq_plot_batch(self, summary_files, p_value_index, write_names, log_transform=True, set_bounds=None,
+                      line_width=0.05, axis_colour="Dark_Grey", camera_position=(10, 10, 30), camera_scale=25,
+                      x_resolution=1080, y_resolution=1080, qq_mode="exact"):
+        """
+        Create a QQ plot for each summary file within a single blender session, cleaning up the scene between each plot
+        rather than launching blender for each plot. All other arguments are as qq_plot, and are shared by every plot in
+        the batch.
+
+        :param summary_files: Paths to the gwas summary statistics, or arrays of p values
+        :type summary_files: list[str | Path | numpy.ndarray]
+
+        :param write_names: Name of the files of each summary file, must be of equal length to summary_files
+        :type write_names: list[str]
+
+        :return: The handle to the blender job
+        :rtype: BlendJob
+        """
+        return self._run_script("QQPlot", self._prepare_batch_args(
+            self.qq_plot, locals(), summary_file=summary_files, write_name=write_names), background=False,
+            output_names=write_names)
+
+    def qq_make(self, point_colour, output_directory, processes=1):
+        """
+        This will take the images in the working directory from qq_plot and compile them into the images
+
+        :param point_colour: The 0-255 BGR colour of the points
+        :type point_colour: (int, int, int)
+
+        :param output_directory: Where you want to save the images
+        :type output_directory: str | Path
+
+        :param processes: Processes to compile the plots with, defaults to 1 to compile them within this process. None
+            uses one per core
+        :type processes: int | None
+
+        :return: Nothing, compile images then stop
+        :rtype: None
 
-    def qq_make(self, point_colour, output_directory):
-        # Isolate the unique image names
-        unique_names = list(set([file.split("__")[0] for file in directory_iterator(self._working_dir)
-                                 if (".log" not in file) and (".blend" not in file)]))
+        :raises CompositeError: Once every other plot is compiled, if any plot failed to compile, with the error of each
+        """
+        # Index the layers of every plot from a single listing of the working directory
+        plots = index_plot_layers(self._working_dir)
 
-        print(unique_names)
-        # For each plot, compile the images
-        for name in unique_names:
-            create_qq_plot(name, self._working_dir, point_colour, output_directory)
+        # Compile the images of each plot
+        FigureLogic.composite_plots("create_qq_plot", plots, self._working_dir, point_colour, output_directory,
+                                    processes)
 
         return
 
     def map_plot(self, shapefile, record_index, write_directory, data_path):
+        """
+        Create a map of the shapefile's polygons, saved as MapShp.blend in the working directory
+
+        Note
+        -----
+        The returned job only finishes once blender has exited and MapShp.blend has been atomically moved into place,
+        so further stages can be chained onto it via BlendJob.then and will start as soon as the map exists. Any
+        MapShp.blend from a previous run is removed before the job is submitted, so a job that fails to write the map
+        cannot be validated against a stale one.
+
+        :param shapefile: Path to the shapefile
+        :type shapefile: str | Path
+
+        :param record_index: Index of the record to name each place by
+        :type record_index: int
+
+        :param write_directory: Directory the frames will be written to, not yet used
+        :type write_directory: str | Path
+
+        :param data_path: Path to the data the frames will be coloured by, not yet used
+        :type data_path: str | Path
+
+        :return: The handle to the blender job, which raises BlendJobError if blender failed to create the map
+        :rtype: BlendJob
+        """
 
         # todo: Make this a seperate call method
 
@@ -306,16 +617,24 @@ class BlendFigure:
         map_args = {arg: value for arg, value in locals().items() if arg in args_map}
         args_data = {arg: value for arg, value in locals().items() if arg not in args_map}
 
-        subprocess.Popen([self._blend_path, self._base_file, "--python",
-                          str(Path(self._blend_scripts, "PolyMap.py")), self._prepare_args(map_args)])
+        # Remove the map of any previous run, so only a map written by this job passes _validate_map
+        try:
+            Path(self._working_dir, "MapShp.blend").unlink()
+        except FileNotFoundError:
+            pass
 
-        while not os.path.exists(Path(self._working_dir, "MapShp.blend")):
-            time.sleep(5)
+        map_job = self._run_script("PolyMap", self._prepare_args(map_args), background=False,
+                                   output_names=["MapShp"])
+        return map_job.then(self._validate_map)
 
-        print(f"Found {Path(self._working_dir, 'MapShp.blend')}")
+    def _validate_map(self):
+        """Validate that the map was written by the blender job, which may have exited without raising"""
+        map_file = Path(self._working_dir, "MapShp.blend")
+        if not map_file.exists():
+            raise BlendJobError("PolyMap", f"Blender exited without writing {map_file}")
 
-        # subprocess.Popen([self._blend_path, "-b", self._base_file, "--python",
-        #                   str(Path(self._blend_scripts, "ForestPlot.py")), self._prepare_args(locals())])
+        print(f"Found {map_file}")
+        return map_file
 
     def map_frame_animation(self):
         raise NotImplementedError("Sorry, not yet implemented")
@@ -325,35 +644,201 @@ class BlendFigure:
                     bevel_profile=0.5, text_colour="Black", box_colour="Black", x_resolution=1080, y_resolution=1920,
                     camera_scale=55, camera_position=(5, -15, 18)):
 
-        subprocess.Popen([self._blend_path, "-b", self._base_file, "--python",
-                          str(Path(self._blend_scripts, "PrismaPlot.py")), self._prepare_args(locals())])
+        return self._run_script("PrismaPlot", self._prepare_args(locals()), output_names=[write_name])
+
+    def _run_script(self, script_name, args, background=True, output_names=None):
+        """
+        Run one of the BlendFiles scripts, either on a new blender process or, if workers where requested, on the next
+        idle blender worker of the relevant pool.
+
+        If a render cache is set and the output names of the job are known, the job is restored from the cache when its
+        script, arguments, and input files are unchanged rather than run, and otherwise the outputs it writes are stored
+        once it has finished.
+
+        :param script_name: Name of the script within BlendFiles, without the .py extension
+        :type script_name: str
+
+        :param args: The prepared args from _prepare_args, or a list of them from _prepare_batch_args
+        :type args: dict | list[dict]
+
+        :param background: If blender should be run with -b, defaults to True
+        :type background: bool
+
+        :param output_names: The names the script writes its files under, used to cache them, defaults to None
+        :type output_names: list[str] | None
+
+        :return: The handle to the submitted job
+        :rtype: BlendJob
+        """
+        script = str(Path(self._blend_scripts, f"{script_name}.py"))
+
+        on_success = None
+        if self._cache and output_names:
+            key = self._cache.key(script, args)
+            if self._cache.restore(key, self._working_dir):
+                return BlendJob.completed(script_name)
+            on_success = partial(self._cache.store, key, self._working_dir, output_names, script_name, time.time())
+
+        args = str(write_job_manifest(Path(self._working_dir, "BlendJobs"), script_name, args, self._job_options))
+
+        # Scripts are run via run_timed_script, within a worker or TimedScript, so every job writes a timing report
+        if self._workers > 0:
+            return self._scheduler.submit(script_name, self._run_on_worker, background, script, args,
+                                          on_success=on_success)
+
+        elif background:
+            return self._scheduler.submit_process(
+                script_name, [self._blend_path, "-b", self._base_file, "--python", self._timed_script, "--", script,
+                              args], on_success)
+        else:
+            return self._scheduler.submit_process(
+                script_name, [self._blend_path, self._base_file, "--python", self._timed_script, "--", script, args],
+                on_success)
+
+    def _run_on_worker(self, background, script, args):
+        """Run the script on the relevant worker pool, within the scheduler so starting the pool does not block"""
+        self._worker_pool(background).run(script, args)
+
+    def host_job(self, function, *args):
+        """
+        Run a host side function, such as the compositors from FigureLogic, as a job so that it can be waited on or
+        awaited alongside blender jobs. Host jobs do not count towards the limit on concurrent blender jobs.
+
+        :param function: The function to run
+
+        :param args: Arguments to pass to the function
+
+        :return: The handle to the job
+        :rtype: BlendJob
+        """
+        if not self._host_scheduler:
+            self._host_scheduler = BlendScheduler(os.cpu_count())
+        return self._host_scheduler.submit(function.__name__, function, *args)
+
+    def _worker_pool(self, background):
+        """Isolate, creating it on first use, the worker pool for background or windowed jobs"""
+        with self._pool_lock:
+            if background not in self._pools:
+                self._pools[background] = BlendWorkerPool(self._blend_path, self._base_file, self._workers, background)
+            return self._pools[background]
+
+    def close(self):
+        """
+        Wait for any submitted jobs then shut down the blender workers, if any have been started
+
+        :return: Nothing, close the workers then stop
+        :rtype: None
+        """
+        self._scheduler.shutdown(wait=True)
+        self._scheduler = BlendScheduler(self._max_jobs, self._memory_per_job)
+
+        if self._host_scheduler:
+            self._host_scheduler.shutdown(wait=True)
+            self._host_scheduler = None
+
+        for pool in self._pools.values():
+            pool.close()
+        self._pools = {}
+
+    def invalidate_cache(self, script_name=None, output_name=None):
+        """
+        Remove cached renders so they are rendered again, either of a given script, of a given output name, or if
+        neither is set then every cached render
+
+        :param script_name: Name of the script within BlendFiles to invalidate, such as ForestPlot, defaults to None
+        :type script_name: str | None
+
+        :param output_name: Name of an output, such as the image_name of a forest plot, to invalidate, defaults to None
+        :type output_name: str | None
+
+        :return: The number of cached renders removed
+        :rtype: int
+        """
+        if not self._cache:
+            return 0
+        return self._cache.invalidate(script_name=script_name, output_name=output_name)
+
+    def timing_report(self):
+        """
+        Combine the timing reports that each finished job wrote to BlendJobs into the total seconds spent per script and
+        per span, such as parse, geometry, text, render, and save. The combined report is also written to
+        BlendJobs/timing_report.json.
+
+        :return: The combined report, keyed by script name
+        :rtype: dict
+        """
+        job_directory = Path(self._working_dir, "BlendJobs")
+
+        report = {}
+        for timing_path in sorted(job_directory.glob("*.timing.json")):
+            with open(timing_path, "r") as file:
+                timing = json.load(file)
+
+            script = report.setdefault(timing["job"], {"jobs": 0, "seconds": 0.0, "spans": {}, "peak_memory": 0})
+            script["jobs"] += 1
+            script["seconds"] += timing["seconds"]
+            script["peak_memory"] = max(script["peak_memory"], timing.get("peak_memory", 0))
+            for span, seconds in timing["totals"].items():
+                script["spans"][span] = script["spans"].get(span, 0.0) + seconds
+
+        if job_directory.exists():
+            with open(Path(job_directory, "timing_report.json"), "w") as file:
+                json.dump(report, file, indent=4)
+        return report
 
     def _prepare_args(self, local_args):
         """
-        When a subprocess is called we need to convert the list of arguments to strings so we can pass them via
-        subprocess.Popen. However, not all args can be directly convert to strings so this method will convert them when
-        required
+        When a script is called we need to normalise the arguments so they can be written to a typed job manifest.
+        Colours are converted to rgba and paths are validated and made absolute, whilst all other values keep their
+        type. Numpy arrays are kept as arrays, so they can be handed to blender as memory mapped .npy files.
 
         :param local_args: args of a given method from locals()
         :type local_args: dict
 
-        :return: A list of strings, where each string represents an argument. Self is replaced with working directory,
-            but otherwise the order is the same as submission
-        :rtype: list[str]
+        :return: A dict of argument name: value. Self is replaced with write_directory, but otherwise the order is the
+            same as submission
+        :rtype: dict
         """
 
-        args_list = [self._working_dir]
+        args_dict = {"write_directory": self._working_dir}
         for arg, value in local_args.items():
             if "colour" in arg:
-                args_list.append(str(self._set_colour(value)))
+                args_dict[arg] = self._set_colour(value)
             elif "path" in arg:
-                args_list.append(str(validate_path(value).absolute()))
+                args_dict[arg] = str(validate_path(value).absolute())
             elif arg == "self":
                 pass
             else:
-                args_list.append(str(value))
+                args_dict[arg] = value
+
+        return args_dict
+
+    def _prepare_batch_args(self, method, local_args, **item_args):
+        """
+        Prepare the args of each figure in a batch, in the order of the single figure method they are a batch of
+
+        :param method: The single figure method, such as forest_plot, whose arguments each figure of the batch takes
 
-        return "__".join(args_list)
+        :param local_args: args of the batch method from locals(), that are shared by each figure
+        :type local_args: dict
+
+        :param item_args: Lists of the arguments that differ per figure, keyed by the name of the argument in method
+        :type item_args: list
+
+        :return: A list of the prepared args for each figure
+        :rtype: list[dict]
+        """
+        lengths = set(len(values) for values in item_args.values())
+        if len(lengths) != 1:
+            raise IndexError(f"Each of {list(item_args.keys())} must be of equal length yet found lengths {lengths}")
+
+        batch = []
+        for index in range(lengths.pop()):
+            figure_args = {}
+            for arg in inspect.signature(method).parameters:
+                figure_args[arg] = item_args[arg][index] if arg in item_args else local_args[arg]
+            batch.append(self._prepare_args(figure_args))
+        return batch
 
     @staticmethod
     def _set_colour(colour):
@@ -0,0 +1,301 @@
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import threading
+import hashlib
+import shutil
+import json
+import time
+import os
+
+# The parts of the package a BlendFiles script may import, whose sources are part of the key of every job
+_SCRIPT_PACKAGES = ("BlendFiles", "Constructors", "FigureLogic", "Supports")
+
+
+class RenderCache:
+    def __init__(self, cache_directory, max_size=10 * 1024 ** 3, hash_contents=False, link=False):
+        """
+        A content addressed cache of the files written by blender jobs. Jobs are keyed on the version of their script
+        and the package modules it may import, their normalised arguments, and their input files, so a job whose key
+        already exists can be restored from the cache rather than run.
+
+        The index of the cache is locked via a lock file whilst it is read and rewritten, so a cache directory may be
+        shared by several processes, such as concurrent scripts rendering figures from the same inputs.
+
+        :param cache_directory: Directory to hold the cached files
+        :type cache_directory: str | Path
+
+        :param max_size: Size in bytes the cache may grow to before the least recently used entries are evicted,
+            defaults to 10GB
+        :type max_size: int
+
+        :param hash_contents: If True, input files are keyed on a hash of their contents rather than their size and
+            modification time, defaults to False
+        :type hash_contents: bool
+
+        :param link: If True, restored files are hard linked from the cache where possible rather than copied, defaults
+            to False
+        :type link: bool
+        """
+        self.cache_directory = Path(cache_directory).absolute()
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hash_contents = hash_contents
+        self.link = link
+
+        self._index_path = Path(self.cache_directory, "index.json")
+        self._lock_path = Path(self.cache_directory, "index.lock")
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """Total size in bytes of the cached files"""
+        return sum(entry["size"] for entry in self._load_index().values())
+
+    def key(self, script, args):
+        """
+        Create the key of a job from the contents of its script, the sources of the package modules the script may
+        import, its arguments, and its input files. Editing any module of BlendFiles, Constructors, FigureLogic, or
+        Supports therefore changes the key of every job, as it may change what a script renders.
+
+        :param script: Path to the BlendFiles script
+        :type script: str | Path
+
+        :param args: The prepared args from _prepare_args, or a list of them for a batch
+        :type args: dict | list[dict]
+
+        :return: The hex digest of the key
+        :rtype: str
+        """
+        key = hashlib.sha256()
+        key.update(Path(script).read_bytes())
+        key.update(_package_hash())
+
+        for figure_args in ([args] if isinstance(args, dict) else args):
+            for name, value in figure_args.items():
+                # The write directory does not change what is rendered, so it is excluded to share entries between them
+                if name != "write_directory":
+                    key.update(name.encode())
+                    key.update(self._fingerprint(value))
+        return key.hexdigest()
+
+    def _fingerprint(self, value):
+        """Fingerprint a value, using the size and modification time or contents for paths to existing files"""
+        if isinstance(value, np.ndarray):
+            return hashlib.sha256(np.ascontiguousarray(value).tobytes()).digest()
+
+        elif isinstance(value, (str, Path)) and os.path.isfile(value):
+            if self.hash_contents:
+                return _file_hash(value)
+            stat = os.stat(value)
+            return f"{Path(value).absolute()}|{stat.st_size}|{stat.st_mtime_ns}".encode()
+
+        else:
+            return json.dumps(value, default=str).encode()
+
+    def restore(self, key, write_directory):
+        """
+        Restore the files of a cached job into the write directory
+
+        :param key: Key of the job
+        :type key: str
+
+        :param write_directory: Directory to place the cached files in
+        :type write_directory: str | Path
+
+        :return: True if the job was cached and its files restored, otherwise False
+        :rtype: bool
+        """
+        with self._index_lock():
+            index = self._load_index()
+            if key not in index:
+                return False
+
+            for file in index[key]["files"]:
+                cached, target = Path(self.cache_directory, key, file), Path(write_directory, file)
+                if not cached.exists():
+                    # Entry has been damaged outside of the cache, so drop it and let the job be run again
+                    self._remove_entry(index, key)
+                    self._write_index(index)
+                    return False
+                self._place(cached, target)
+
+            index[key]["last_used"] = time.time()
+            self._write_index(index)
+            return True
+
+    def _place(self, cached, target):
+        """Link or copy a cached file to the target"""
+        if target.exists():
+            target.unlink()
+
+        if self.link:
+            try:
+                os.link(cached, target)
+                return
+            except OSError:
+                pass
+        shutil.copy2(cached, target)
+
+    def store(self, key, write_directory, output_names, script_name="", started=None):
+        """
+        Store the files a job wrote to the write directory, then evict the least recently used entries until the cache
+        is within its max size. Files are matched to the job via the output names, as name.extension or name__*, and if
+        started is given only files modified since the job started are stored, so that files left by an earlier run
+        under the same names, such as name__7.png of a run with more layers, are not cached as part of this job.
+
+        :param key: Key of the job
+        :type key: str
+
+        :param write_directory: Directory the job wrote its files to
+        :type write_directory: str | Path
+
+        :param output_names: The names the job wrote files under
+        :type output_names: list[str]
+
+        :param script_name: Name of the script of the job, so it can be invalidated by script
+        :type script_name: str
+
+        :param started: The time.time() the job was submitted at, defaults to None to store every matching file
+        :type started: float | None
+
+        :return: Nothing, store the files then stop
+        :rtype: None
+        """
+        files = [file for file in os.listdir(write_directory) if os.path.isfile(Path(write_directory, file)) and
+                 any(file.startswith(f"{name}.") or file.startswith(f"{name}__") for name in output_names)]
+
+        if started is not None:
+            # Floored to the second, as some file systems only hold modification times to the second
+            files = [file for file in files if Path(write_directory, file).stat().st_mtime >= int(started)]
+
+        with self._index_lock():
+            index = self._load_index()
+            if key in index:
+                self._remove_entry(index, key)
+
+            entry_directory = Path(self.cache_directory, key)
+            entry_directory.mkdir(parents=True, exist_ok=True)
+            for file in files:
+                shutil.copy2(Path(write_directory, file), Path(entry_directory, file))
+
+            index[key] = {"script": script_name, "outputs": list(output_names), "files": files,
+                          "size": sum(Path(entry_directory, file).stat().st_size for file in files),
+                          "last_used": time.time()}
+
+            self._evict(index)
+            self._write_index(index)
+
+    def _evict(self, index):
+        """Remove the least recently used entries until the cache is within max_size"""
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if total <= self.max_size:
+                break
+            total -= index[key]["size"]
+            self._remove_entry(index, key)
+
+    def invalidate(self, key=None, script_name=None, output_name=None):
+        """
+        Remove entries from the cache, so that the jobs they hold are run again. With no arguments, this clears the
+        whole cache.
+
+        :param key: Remove the entry of this key, defaults to None
+        :type key: str | None
+
+        :param script_name: Remove all entries of this script, defaults to None
+        :type script_name: str | None
+
+        :param output_name: Remove all entries that wrote files under this output name, defaults to None
+        :type output_name: str | None
+
+        :return: The number of entries removed
+        :rtype: int
+        """
+        with self._index_lock():
+            index = self._load_index()
+            clear_all = key is None and script_name is None and output_name is None
+
+            removed = [k for k, entry in index.items() if clear_all or k == key or entry["script"] == script_name or
+                       output_name in entry["outputs"]]
+            for k in removed:
+                self._remove_entry(index, k)
+
+            self._write_index(index)
+            return len(removed)
+
+    def _remove_entry(self, index, key):
+        """Remove an entry's files and its index"""
+        shutil.rmtree(Path(self.cache_directory, key), ignore_errors=True)
+        del index[key]
+
+    @contextmanager
+    def _index_lock(self):
+        """Hold the index against other threads of this process, and via the lock file against other processes"""
+        with self._lock, open(self._lock_path, "a+b") as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return {}
+        with open(self._index_path, "r") as file:
+            return json.load(file)
+
+    def _write_index(self, index):
+        """Write the index to a temporary file then rename it, so a crash cannot leave a partial index"""
+        temp_path = Path(self.cache_directory, f"index.{os.getpid()}.tmp")
+        with open(temp_path, "w") as file:
+            json.dump(index, file)
+        os.replace(temp_path, self._index_path)
+
+
+def _package_hash():
+    """Hash the path and contents of every module of the package a BlendFiles script may import"""
+    package_hash = hashlib.sha256()
+    package_directory = Path(__file__).parents[1]
+    for package in _SCRIPT_PACKAGES:
+        for module in sorted(Path(package_directory, package).rglob("*.py")):
+            package_hash.update(module.relative_to(package_directory).as_posix().encode())
+            package_hash.update(module.read_bytes())
+    return package_hash.digest()
+
+
+def _lock_file(file):
+    """Block until this process holds an exclusive lock of the file, via fcntl on posix and msvcrt on windows"""
+    if os.name == "nt":
+        import msvcrt
+        file.seek(0)
+        # msvcrt gives up after ten attempts a second apart, so is retried until the lock is held
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(file):
+    """Release the lock of a file held via _lock_file"""
+    if os.name == "nt":
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def _file_hash(path, block_size=1024 * 1024):
+    """Hash the contents of a file"""
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            file_hash.update(block)
+    return file_hash.digest()
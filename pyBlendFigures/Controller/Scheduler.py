@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+import subprocess
+import asyncio
+import os
+
+
+class BlendJobError(Exception):
+    """Raised when a job submitted to blender fails"""
+    def __init__(self, job_name, details):
+        super().__init__(f"{job_name} failed:\n{details}")
+
+
+class BlendJob:
+    def __init__(self, name, future=None):
+        """
+        A handle to a job submitted to the BlendScheduler. It can be waited on, queried for its result, or awaited from
+        asyncio code.
+
+        :param name: Name of the job, normally the BlendFiles script it runs
+        :type name: str
+
+        :param future: The future of the job, set by the scheduler on submission
+        :type future: concurrent.futures.Future | None
+        """
+        self.name = name
+        self.returncode = None
+        self.stderr = None
+        self._future = future
+
+    @classmethod
+    def completed(cls, name, result=None):
+        """Create a handle to a job that has already finished, such as one restored from the RenderCache"""
+        future = Future()
+        future.set_result(result)
+        job = cls(name, future)
+        job.returncode = 0
+        return job
+
+    def __repr__(self):
+        return f"BlendJob({self.name}, {'done' if self.done() else 'pending'})"
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def done(self):
+        """If the job has finished, successfully or otherwise"""
+        return self._future.done()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job has finished or timeout seconds have passed
+
+        :param timeout: Seconds to wait for, or None to wait indefinitely, defaults to None
+        :type timeout: float | None
+
+        :return: True if the job finished, False if the timeout was reached first
+        :rtype: bool
+        """
+        try:
+            self._future.exception(timeout)
+            return True
+        except FutureTimeoutError:
+            return False
+
+    def result(self, timeout=None):
+        """
+        Block until the job has finished and return its result, re-raising any error the job raised
+
+        :param timeout: Seconds to wait for, or None to wait indefinitely, defaults to None
+        :type timeout: float | None
+
+        :return: The result of the job, which is None for blender jobs
+
+        :raises BlendJobError: If the blender job failed
+        """
+        return self._future.result(timeout)
+
+    def add_done_callback(self, callback):
+        """Call callback with this job once it has finished"""
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def then(self, function, *args):
+        """
+        Chain a further stage onto this job, which is started the moment this job finishes successfully. If the stage
+        returns a BlendJob, such as from a BlendFigure method, the chained job finishes when that job does.
+
+        :param function: The next stage to run
+
+        :param args: Arguments to pass to the next stage
+
+        :return: A handle to the chained job, which raises the error of whichever stage failed
+        :rtype: BlendJob
+        """
+        chained = BlendJob(f"{self.name} -> {getattr(function, '__name__', 'stage')}", Future())
+
+        def _resolve(stage):
+            try:
+                chained._future.set_result(stage.result())
+            except Exception as e:
+                chained._future.set_exception(e)
+
+        def _start(previous):
+            try:
+                previous.result()
+                stage = function(*args)
+            except Exception as e:
+                chained._future.set_exception(e)
+                return
+
+            if isinstance(stage, BlendJob):
+                stage.add_done_callback(_resolve)
+            else:
+                chained._future.set_result(stage)
+
+        self.add_done_callback(_start)
+        return chained
+
+
+class BlendScheduler:
+    def __init__(self, max_jobs=None, memory_per_job=2 * 1024 ** 3):
+        """
+        Queue jobs so that only a limited number of blender processes run at once.
+
+        :param max_jobs: The number of jobs that may run at once, if None this is set to the number of cores bound by how
+            many jobs of memory_per_job fit in the available memory, defaults to None
+        :type max_jobs: int | None
+
+        :param memory_per_job: Expected memory use of a single blender job in bytes, defaults to 2GB
+        :type memory_per_job: int
+        """
+        self.max_jobs = max_jobs if max_jobs else self.job_limit(memory_per_job)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs)
+
+    @staticmethod
+    def job_limit(memory_per_job):
+        """
+        Set the number of concurrent jobs as the number of cores, bound by the available memory if it can be found
+
+        :param memory_per_job: Expected memory use of a single blender job in bytes
+        :type memory_per_job: int
+
+        :return: The number of jobs that can be run at once
+        :rtype: int
+        """
+        limit = os.cpu_count() or 1
+
+        available = _available_memory()
+        if available is not None:
+            limit = min(limit, available // memory_per_job)
+        return max(int(limit), 1)
+
+    def submit(self, name, function, *args, on_success=None):
+        """
+        Queue a function to be run once a job slot is free
+
+        :param name: Name of the job
+        :type name: str
+
+        :param function: The function to run
+
+        :param args: Arguments to pass to the function
+
+        :param on_success: Called within the job once the function has run successfully, before the job is marked as
+            done, defaults to None
+
+        :return: The handle to the queued job
+        :rtype: BlendJob
+        """
+        job = BlendJob(name)
+        job._future = self._executor.submit(self._run_function, function, args, on_success)
+        return job
+
+    @staticmethod
+    def _run_function(function, args, on_success):
+        """Run the function, then the on_success callback if it was set"""
+        result = function(*args)
+        if on_success:
+            on_success()
+        return result
+
+    def submit_process(self, name, command, on_success=None):
+        """
+        Queue a blender process to be run once a job slot is free, capturing its exit code and stderr on the handle
+
+        :param name: Name of the job
+        :type name: str
+
+        :param command: The command to run
+        :type command: list[str]
+
+        :param on_success: Called within the job once the process has exited successfully, before the job is marked as
+            done, defaults to None
+
+        :return: The handle to the queued job
+        :rtype: BlendJob
+        """
+        job = BlendJob(name)
+        job._future = self._executor.submit(self._run_process, job, command, on_success)
+        return job
+
+    @staticmethod
+    def _run_process(job, command, on_success):
+        """Run the command, raising a BlendJobError with the captured stderr if it exits with a non zero code"""
+        process = subprocess.run(command, stderr=subprocess.PIPE, universal_newlines=True)
+        job.returncode = process.returncode
+        job.stderr = process.stderr
+
+        if process.returncode != 0:
+            raise BlendJobError(job.name, f"Exited with code {process.returncode}\n{process.stderr}")
+
+        if on_success:
+            on_success()
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting jobs, optionally waiting for any queued jobs to finish
+
+        :param wait: If this should block until all queued jobs have finished, defaults to True
+        :type wait: bool
+
+        :return: Nothing, shutdown the scheduler then stop
+        :rtype: None
+        """
+        self._executor.shutdown(wait=wait)
+
+
+def _available_memory():
+    """Available memory in bytes, from /proc/meminfo where possible, or None if it cannot be determined"""
+    try:
+        with open("/proc/meminfo", "r") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+async def gather_jobs(*jobs):
+    """
+    Await multiple jobs from asyncio code, returning their results in the order they were given
+
+    :param jobs: The jobs to wait on
+    :type jobs: BlendJob
+
+    :return: The result of each job
+    :rtype: list
+    """
+    return list(await asyncio.gather(*[asyncio.wrap_future(job._future) for job in jobs]))
@@ -0,0 +1,246 @@
+from pyBlendFigures.Controller.Scheduler import BlendJobError
+
+from multiprocessing.connection import Connection, answer_challenge, deliver_challenge
+from multiprocessing import AuthenticationError
+from pathlib import Path
+import subprocess
+import threading
+import tempfile
+import secrets
+import socket
+import queue
+import time
+
+# Seconds between checks on a starting worker, and on the pool whilst waiting for an idle worker
+_POLL_INTERVAL = 0.5
+
+
+class BlendWorkerError(BlendJobError):
+    """Raised when a job fails within, or kills, a blender worker"""
+    def __init__(self, script, details):
+        super().__init__(f"Blender worker running {script}", details)
+
+
+class BlendWorkerPool:
+    def __init__(self, blender_path, base_file, workers=2, background=True, connect_timeout=120):
+        """
+        A pool of long lived blender processes that each load the base file once and then run BlendFiles scripts as
+        jobs sent over a local socket, resetting the scene from the base file between each job.
+
+        :param blender_path: Path to the blender executable
+        :type blender_path: str
+
+        :param base_file: The .blend file each worker is launched with and reset to between jobs
+        :type base_file: str
+
+        :param workers: The number of blender processes to keep alive, defaults to 2
+        :type workers: int
+
+        :param background: If the workers should be run with -b, scripts that need an opengl render require this to be
+            False, defaults to True
+        :type background: bool
+
+        :param connect_timeout: Seconds a worker may take to launch and connect back to the pool before it is killed and
+            BlendJobError raised, defaults to 120
+        :type connect_timeout: float
+
+        :raises BlendJobError: If a worker exits, or fails to connect within connect_timeout, whilst starting
+        """
+        self._blend_path = blender_path
+        self._base_file = base_file
+        self._background = background
+        self._connect_timeout = connect_timeout
+        self._worker_script = str(Path(Path(__file__).parent.parent, "BlendFiles", "Worker.py").absolute())
+
+        # Workers connect back to a socket owned by the pool, which times out its accepts so starting workers are polled
+        self._authkey = secrets.token_bytes(16)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("localhost", 0))
+        self._socket.listen()
+        self._socket.settimeout(_POLL_INTERVAL)
+
+        # Each idle worker is held as a (process, connection) pair, and is removed from the queue whilst running a job.
+        # The stderr of each worker is held in a temporary file, so it can be reported if the worker dies. Slots are the
+        # workers in the pool, idle or running, and only fall if a worker that died could not be replaced
+        self._processes = []
+        self._stderr = {}
+        self._slots = 0
+        self._idle = queue.Queue()
+
+        # Launches are serialised, so each accepted connection belongs to the worker just launched, whilst the lock
+        # guards the processes, stderr, and slots of the pool
+        self._spawn_lock = threading.Lock()
+        self._lock = threading.Lock()
+        try:
+            for _ in range(workers):
+                self._idle.put(self._spawn())
+                with self._lock:
+                    self._slots += 1
+        except BlendJobError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def size(self):
+        """The number of blender processes in this pool"""
+        with self._lock:
+            return len(self._processes)
+
+    def _spawn(self):
+        """Launch a blender worker and wait for it to connect back to this pool"""
+        host, port = self._socket.getsockname()
+        command = [self._blend_path, self._base_file, "--python", self._worker_script, "--", host, str(port),
+                   self._authkey.hex()]
+        if self._background:
+            command.insert(1, "-b")
+
+        with self._spawn_lock:
+            stderr = tempfile.TemporaryFile()
+            process = subprocess.Popen(command, stderr=stderr)
+            with self._lock:
+                self._processes.append(process)
+                self._stderr[process] = stderr
+
+            # Accepts time out, so a worker that dies or hangs whilst starting is reported rather than waited on forever
+            deadline = time.monotonic() + self._connect_timeout
+            while True:
+                try:
+                    client, _ = self._socket.accept()
+                    break
+                except socket.timeout:
+                    if process.poll() is None and time.monotonic() < deadline:
+                        continue
+
+                if process.poll() is None:
+                    process.kill()
+                    details = f"Worker did not connect within {self._connect_timeout} seconds"
+                else:
+                    details = f"Worker exited with code {process.returncode} whilst starting"
+                self._discard(process, details)
+
+            # Authenticate the worker as multiprocessing.connection.Listener would
+            client.setblocking(True)
+            connection = Connection(client.detach())
+            try:
+                deliver_challenge(connection, self._authkey)
+                answer_challenge(connection, self._authkey)
+            except (AuthenticationError, EOFError, OSError) as e:
+                connection.close()
+                process.kill()
+                self._discard(process, f"Worker failed to authenticate: {e}")
+
+            return process, connection
+
+    def _discard(self, process, details):
+        """Remove a worker that failed to start from the pool, raising its failure alongside its stderr"""
+        process.wait()
+        with self._lock:
+            details += self._worker_stderr(process)
+            self._remove(process)
+        raise BlendJobError("Blender worker", details)
+
+    def _worker_stderr(self, process, size=4096):
+        """The end of the stderr of a worker, to report alongside its failure, called whilst holding the lock"""
+        stderr = self._stderr[process]
+        stderr.seek(max(stderr.seek(0, 2) - size, 0))
+        error = stderr.read().decode(errors="replace").strip()
+        return f"\n{error}" if error else ""
+
+    def _remove(self, process):
+        """Remove a worker that has exited from the pool, called whilst holding the lock"""
+        self._processes.remove(process)
+        self._stderr.pop(process).close()
+
+    def _next_idle(self):
+        """Wait for the next idle worker, raising rather than waiting forever once every slot of the pool is lost"""
+        while True:
+            with self._lock:
+                if self._slots == 0:
+                    raise BlendJobError("Blender worker pool", "Every worker has died and none could be replaced")
+            try:
+                return self._idle.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def run(self, script, args):
+        """
+        Run a BlendFiles script on the next idle worker, blocking until it has finished
+
+        :param script: Path to the BlendFiles script
+        :type script: str | Path
+
+        :param args: Path to the job manifest the script would normally receive as the last command line argument
+        :type args: str
+
+        :return: Nothing, run the job then stop
+        :rtype: None
+
+        :raises BlendWorkerError: If the script raised within blender, or the worker died whilst running it
+
+        :raises BlendJobError: If every worker of the pool has died and could not be replaced
+        """
+        process, connection = self._next_idle()
+        try:
+            connection.send({"script": str(script), "args": args})
+            reply = connection.recv()
+
+        except (EOFError, OSError):
+            # The worker died mid job, so replace it before reporting the failure
+            connection.close()
+            code = process.wait()
+            with self._lock:
+                details = f"Worker exited with code {code}{self._worker_stderr(process)}"
+                self._remove(process)
+
+            try:
+                self._idle.put(self._spawn())
+            except BlendJobError as e:
+                # The slot is lost, so waiting callers raise once no worker remains rather than waiting forever
+                with self._lock:
+                    self._slots -= 1
+                details += f"\nThe worker could not be replaced: {e}"
+            raise BlendWorkerError(script, details)
+
+        self._idle.put((process, connection))
+        if reply["status"] != "ok":
+            raise BlendWorkerError(script, reply["traceback"])
+
+    def close(self):
+        """
+        Ask each worker to exit once it is idle then wait for every blender process to finish
+
+        :return: Nothing, shutdown the pool then stop
+        :rtype: None
+        """
+        # Slots lost whilst closing, to workers that died and could not be replaced, are no longer waited on
+        closed = 0
+        while True:
+            with self._lock:
+                if closed >= self._slots:
+                    break
+            try:
+                process, connection = self._idle.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            closed += 1
+            try:
+                connection.send(None)
+                connection.close()
+            except OSError:
+                pass
+
+        with self._lock:
+            for process in self._processes:
+                process.wait()
+                self._stderr.pop(process).close()
+
+            self._processes = []
+            self._slots = 0
+        self._socket.close()
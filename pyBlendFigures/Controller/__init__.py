@@ -1 +1,2 @@
 from .BlendFigure import BlendFigure
+from .Scheduler import BlendJob, BlendJobError, gather_jobs
@@ -1,3 +1,19 @@
-from .manhattan_plot import create_manhattan_plot
-from .heat_map import create_heat_map_frames
-from .qq_plot import create_qq_plot
+import importlib
+
+# The compositors import imageObjects, and so OpenCV, so each is only imported the first time it is used
+_COMPOSITORS = {"create_manhattan_plot": "manhattan_plot", "create_heat_map_frames": "heat_map",
+                "create_qq_plot": "qq_plot", "create_manhattan_points": "manhattan_points",
+                "composite_plots": "compositing", "CompositeError": "compositing",
+                "export_frame_stack": "frame_export"}
+
+__all__ = list(_COMPOSITORS)
+
+
+def __getattr__(name):
+    if name in _COMPOSITORS:
+        return getattr(importlib.import_module(f".{_COMPOSITORS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
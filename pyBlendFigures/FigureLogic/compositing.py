@@ -0,0 +1,116 @@
+from pyBlendFigures import FigureLogic
+
+from imageObjects.Support import load_image
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import os
+
+
+def composite_layers(plot_name, working_dir, axis, points, colours):
+    """
+    Composite the point layers of a plot and its axis in a single pass over each layer. Every pixel a point layer has
+    drawn, those of a non zero alpha, is tinted the colour of the layer at full opacity, and the axis is then drawn over
+    the points wherever the axis itself has been drawn, as the chain of ImageObject calls this replaces would. Each
+    layer is written into a single preallocated plot image, so only the loaded layer and a mask of its alpha are held
+    alongside it.
+
+    :param plot_name: Name of the plot, for logging
+    :type plot_name: str
+
+    :param working_dir: Directory holding the axis and point layers
+    :type working_dir: str | Path
+
+    :param axis: File name of the axis layer
+    :type axis: str
+
+    :param points: File name of each point layer
+    :type points: list[str]
+
+    :param colours: The bgr colour of each point layer
+    :type colours: list[tuple]
+
+    :return: The plot as a bgra image
+    :rtype: numpy.ndarray
+    """
+    axis_image = load_image(f"{working_dir}/{axis}", 4)
+    plot = np.zeros_like(axis_image)
+    mask = np.empty(axis_image.shape[:2], dtype=bool)
+
+    for point_img, colour in zip(points, colours):
+        print(f"Processing {plot_name} -> {point_img}: {colour}")
+        layer = load_image(f"{working_dir}/{point_img}", 4)
+        if layer.shape != axis_image.shape:
+            raise ValueError(f"{point_img} is of shape {layer.shape} yet {axis} is of shape {axis_image.shape}")
+
+        np.greater(layer[:, :, 3], 0, out=mask)
+        np.copyto(plot, np.array((*colour, 255), dtype=np.uint8), where=mask[:, :, None])
+
+    np.greater(axis_image[:, :, 3], 0, out=mask)
+    np.copyto(plot, axis_image, where=mask[:, :, None])
+    return plot
+
+
+class CompositeError(Exception):
+    """Raised once every plot of a batch has been composited, if any of them failed"""
+    def __init__(self, failures):
+        self.failures = failures
+        details = "\n".join(f"{plot_name}: {error}" for plot_name, error in failures.items())
+        super().__init__(f"Failed to composite {len(failures)} plots:\n{details}")
+
+
+def composite_plots(compositor, plots, working_dir, colours, output_directory, processes=1):
+    """
+    Composite every plot indexed within a working directory via a compositor, such as create_manhattan_plot, spread
+    over a pool of processes. A plot that fails, such as one missing its axis, does not stop the others, with the error
+    of each failed plot raised as a CompositeError once every other plot has been written.
+
+    :param compositor: Name of the compositor within FigureLogic, which takes the plot name, working directory, colours,
+        output directory, and layers of a plot
+    :type compositor: str
+
+    :param plots: The layers of each plot, by plot name, from index_plot_layers
+    :type plots: dict[str, PlotLayers]
+
+    :param working_dir: Directory holding the rendered layers
+    :type working_dir: str | Path
+
+    :param colours: The colour or colours handed to the compositor for every plot
+    :type colours: list | tuple
+
+    :param output_directory: Directory to write the plots to
+    :type output_directory: str | Path
+
+    :param processes: Processes to composite plots with, where 1 composites them within this process, defaults to 1.
+        None uses one per core
+    :type processes: int | None
+
+    :return: Nothing, composite the plots then stop
+    :rtype: None
+
+    :raises CompositeError: If any plot failed to composite
+    """
+    processes = min(os.cpu_count() if processes is None else processes, len(plots))
+
+    failures = {}
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {plot_name: pool.submit(_composite_plot, compositor, plot_name, working_dir, colours,
+                                              output_directory, layers) for plot_name, layers in plots.items()}
+            for plot_name, future in futures.items():
+                error = future.exception()
+                if error is not None:
+                    failures[plot_name] = f"{type(error).__name__}: {error}"
+    else:
+        for plot_name, layers in plots.items():
+            try:
+                _composite_plot(compositor, plot_name, working_dir, colours, output_directory, layers)
+            except Exception as error:
+                failures[plot_name] = f"{type(error).__name__}: {error}"
+
+    if failures:
+        raise CompositeError(failures)
+
+
+def _composite_plot(compositor, plot_name, working_dir, colours, output_directory, layers):
+    """Composite a single plot, resolving the compositor by name so it can be sent to a worker process"""
+    getattr(FigureLogic, compositor)(plot_name, working_dir, colours, output_directory, layers)
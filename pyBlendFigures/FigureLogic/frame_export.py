@@ -0,0 +1,27 @@
+from pyBlendFigures.Supports import FrameStack
+
+from imageObjects import ImageObject
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def export_frame_stack(stack_path, write_directory, writers=4):
+    """
+    Write each frame of a FrameStack as a png named by its label, for when the png frames themselves are needed once
+    every stage of an animation has been run over the stack
+
+    :param stack_path: Path to the frame stack
+    :type stack_path: str | Path
+
+    :param write_directory: Directory to write the png frames to
+    :type write_directory: str | Path
+
+    :param writers: Threads encoding and writing the frames, defaults to 4
+    :type writers: int
+
+    :return: Nothing, write the frames then stop
+    :rtype: None
+    """
+    with FrameStack(stack_path) as stack, ThreadPoolExecutor(writers) as pool:
+        # Consume the results, so an error writing any frame is raised
+        list(pool.map(lambda frame: ImageObject(frame[1]).write_to_file(write_directory, frame[0]), stack))
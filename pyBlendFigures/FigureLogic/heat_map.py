@@ -1,52 +1,174 @@
+from pyBlendFigures.Supports import FrameStack, is_frame_stack
+
 from imageObjects import ImageObject
 from imageObjects.Support import load_image
 from miscSupports import directory_iterator
 
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from functools import partial
 from pathlib import Path
+import numpy as np
+import threading
+import queue
+
+# Frames decoded ahead of the frame being composited by the reader thread
+_PREFETCH_DEPTH = 4
+
+
+def create_heat_map_frames(working_directory, point_colour, point_out, gradient_out, gradient_scalar, gradient_divider,
+                           writers=4, frame_stack=False):
+    """
+    Create the point and gradient frames of a heat map from the raw frames rendered into working_directory, in a single
+    pass over the frames. Upcoming frames are decoded and masked on the point colour by a reader thread, each masked
+    frame is written as the point frame and added into the gradient, and the frames are encoded by a pool of writers,
+    so reading, compositing and writing overlap.
+
+    The gradient is the recurrence (gradient * gradient_scalar + frame) / gradient_divider, starting from the first
+    frame, which is held in place as a float32 buffer rather than allocating an image per frame.
+
+    :param working_directory: Directory holding the raw frames, named as {year}_{month}_{day}.png, or a FrameStack of
+        the raw frames labelled as such
+    :type working_directory: str | Path
+
+    :param point_colour: BGR Colour of the points in the raw frames
+    :type point_colour: (int, int, int)
+
+    :param point_out: Write directory for the point frames, or the path of the FrameStack to write them to if
+        frame_stack
+    :type point_out: str | Path
+
+    :param gradient_out: Write directory for the gradient frames, or the path of the FrameStack to write them to if
+        frame_stack
+    :type gradient_out: str | Path
+
+    :param gradient_scalar: Multiplier of the gradient on each frame
+    :type gradient_scalar: float
 
+    :param gradient_divider: Divider of the gradient, after adding the frame, on each frame
+    :type gradient_divider: float
 
-def create_heat_map_frames(working_directory, point_colour, point_out, gradient_out, gradient_scalar, gradient_divider):
-    dates = {"".join([n.replace(".png", "").zfill(2) for n in name.split("_")]): name
-             for name in directory_iterator(working_directory)}
+    :param writers: Threads encoding and writing the png frames, defaults to 4
+    :type writers: int
+
+    :param frame_stack: If the frames should be written to a FrameStack rather than as a png per frame, defaults to
+        False. Frames within a stack are labelled by their index, as each png is named, so export_frame_stack writes
+        the same png's
+    :type frame_stack: bool
+
+    :return: Nothing, write the frames then stop
+    :rtype: None
+    """
+    raw_stack = FrameStack(working_directory) if is_frame_stack(working_directory) else None
+    if raw_stack is not None:
+        names = raw_stack.labels
+        loaders = [partial(_stack_frame, raw_stack, index) for index in range(len(names))]
+    else:
+        names = directory_iterator(working_directory)
+        loaders = [partial(load_image, str(Path(working_directory, name).absolute())) for name in names]
+    labels = [name.replace(".png", "") for name in names]
 
     # Format dates to be sorted
-    dates = {date: name for date, name in sorted(dates.items(), key=lambda kv: kv[0])}
+    dates = {"".join([n.zfill(2) for n in label.split("_")]): index for index, label in enumerate(labels)}
+    order = [index for date, index in sorted(dates.items(), key=lambda kv: kv[0])]
+    if not order:
+        return
 
-    # Create the bound to mask on, the isolate the first frame
-    base = _base_image(dates, working_directory)
+    # Create the bound to mask on
     bound_min = (max(point_colour[0]-5, 0), max(point_colour[1]-5, 0), max(point_colour[2]-5, 0))
-    base.mask_on_colour_range(bound_min, point_colour)
 
-    # Point frames
-    for index, (date, name) in enumerate(dates.items()):
-        if index % 10 == 0:
-            print(f"Frame {index}: {len(dates.items())}")
+    frames = _iter_masked_frames([loaders[index] for index in order], bound_min, point_colour)
+
+    stacks = (FrameStack(point_out, "w"), FrameStack(gradient_out, "w")) if frame_stack else None
+    try:
+        # The first frame is the base of the gradient
+        base = next(frames)
+        gradient = base.astype(np.float32)
+        rounded = np.empty_like(gradient)
+
+        with ThreadPoolExecutor(writers) as pool:
+            pending = deque()
+            for index, frame in enumerate(frames, start=1):
+                if index % 10 == 0:
+                    print(f"Frame {index}: {len(order)}")
+
+                np.multiply(gradient, gradient_scalar, out=gradient)
+                np.add(gradient, frame, out=gradient)
+                np.divide(gradient, gradient_divider, out=gradient)
+
+                # Frames are written as uint8, rounded and saturated as OpenCV would convert the gradient
+                np.rint(gradient, out=rounded)
+                np.clip(rounded, 0, 255, out=rounded)
+
+                if stacks:
+                    stacks[0].append(frame, index)
+                    stacks[1].append(rounded, index)
+                    continue
+
+                pending.append(pool.submit(_write_frames, point_out, gradient_out, index, frame,
+                                           rounded.astype(np.uint8)))
+
+                # Bound the frames held waiting to be written
+                while len(pending) > 2 * writers:
+                    pending.popleft().result()
+
+            for write in pending:
+                write.result()
+    finally:
+        frames.close()
+        if stacks:
+            [stack.close() for stack in stacks]
+        if raw_stack is not None:
+            raw_stack.close()
 
-        if index > 0:
-            current_date = ImageObject(load_image(str(Path(working_directory, name).absolute())))
-            current_date.mask_on_colour_range(bound_min, point_colour)
 
-            current_date.write_to_file(point_out, index)
+def _iter_masked_frames(loaders, bound_min, point_colour):
+    """Decode each frame and mask it on the point colour range on a reader thread, a few frames ahead of the caller"""
+    frames = queue.Queue(_PREFETCH_DEPTH)
+    stop = threading.Event()
 
-    # Gradient frames
-    for index, (date, name) in enumerate(dates.items()):
-        if index % 10 == 0:
-            print(f"Frame {index}: {len(dates.items())}")
+    def _put(item):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-        if index > 0:
-            difference = _create_difference(working_directory, name, bound_min, point_colour, base,
-                                            gradient_scalar, gradient_divider)
-            difference.write_to_file(gradient_out, index)
-            base = difference
+    def _read():
+        try:
+            for load_frame in loaders:
+                frame = ImageObject(load_frame())
+                frame.mask_on_colour_range(bound_min, point_colour)
+                if not _put(frame.image):
+                    return
+            _put(None)
+        except BaseException as e:
+            _put(e)
 
+    reader = threading.Thread(target=_read, name="heat_map_reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            frame = frames.get()
+            if isinstance(frame, BaseException):
+                raise frame
+            if frame is None:
+                return
+            yield frame
+    finally:
+        stop.set()
+        reader.join()
 
-def _base_image(dates_dict, read_directory):
-    for date, name in dates_dict.items():
-        return ImageObject(load_image(str(Path(read_directory, name).absolute())))
 
+def _stack_frame(stack, index):
+    """A raw frame of a frame stack, as the bgr channels a png frame would be loaded with"""
+    frame = stack[index]
+    return np.ascontiguousarray(frame[:, :, :3]) if frame.ndim == 3 and frame.shape[2] == 4 else frame
 
-def _create_difference(working_directory, name, bound_min, point_colour, base, gradient_scalar, gradient_divider):
-    current_date = ImageObject(load_image(str(Path(working_directory, name).absolute())))
-    current_date.mask_on_colour_range(bound_min, point_colour)
 
-    return ImageObject(((base.image * gradient_scalar) + current_date.image) / gradient_divider)
+def _write_frames(point_out, gradient_out, index, frame, gradient):
+    """Write the point and gradient frame of an index"""
+    ImageObject(frame).write_to_file(point_out, index)
+    ImageObject(gradient).write_to_file(gradient_out, index)
@@ -1,59 +1,49 @@
-from miscSupports import directory_iterator
-from imageObjects.Support import load_image
+from pyBlendFigures.FigureLogic.compositing import composite_layers
+from pyBlendFigures.Supports import plot_layers
+
 from imageObjects import ImageObject
 
 
-def create_manhattan_plot(plot_name, working_dir, colours, output_directory):
-    # Isolate the files related to this name
-    name_files = []
-    for file in directory_iterator(working_dir):
-        if (plot_name in file) and (".log" not in file) and (".blend" not in file):
-            name_files.append(file)
+def create_manhattan_plot(plot_name, working_dir, colours, output_directory, layers=None):
+    """
+    Composite the point layers and axis of a manhattan plot, rendered into working_dir, into a single image
 
-    # If we find the axis image then we can construct a plot
-    if sum([True if "AXIS" in file else False for file in name_files]) == 1:
+    :param plot_name: Name of the plot
+    :type plot_name: str
 
-        # Isolate the axis and the point image file names
-        axis = [file for file in name_files if "AXIS" in file][0]
-        points = [file for file in name_files if "AXIS" not in file]
-        assert len(points) == len(colours), f"Found {len(points)} but was only provided {len(colours)} colours"
+    :param working_dir: Directory holding the rendered layers
+    :type working_dir: str | Path
 
-        # Construct the plot
-        _construct_plot_image(working_dir, axis, points, colours, output_directory, plot_name)
-
-    else:
-        raise IndexError(f"Failed to find {plot_name}_AXIS.png")
+    :param colours: The bgr colour of each point layer, in the order of their groups
+    :type colours: list[(int, int, int)]
 
+    :param output_directory: Directory to write the plot to
+    :type output_directory: str | Path
 
-def _construct_plot_image(working_dir, axis, points, colours, output_directory, plot_name):
+    :param layers: The layers of this plot from index_plot_layers, or None to index working_dir, defaults to None
+    :type layers: PlotLayers | None
 
-    axis = ImageObject(load_image(f"{working_dir}/{axis}", 4))
-    blank = axis.blank_like(True)
+    :return: Nothing, write the plot then stop
+    :rtype: None
+    """
+    if layers is None:
+        layers = plot_layers(working_dir, plot_name)
 
-    for point_img, colour in zip(points, colours):
-        print(f"Processing {plot_name} -> {point_img}: {colour}")
-
-        # Load the point image
-        point_img = ImageObject(load_image(f"{working_dir}/{point_img}", 4))
+    # If we find the axis image then we can construct a plot
+    if layers.axis is not None:
+        assert len(layers.points) == len(colours), \
+            f"Found {len(layers.points)} but was only provided {len(colours)} colours"
 
-        # Create the overlay colour
-        overlay_colour = point_img.blank_like(True)
-        overlay_colour.change_bgra_to_bgr()
-        overlay_colour.change_a_colour((0, 0, 0), colour)
+        # Construct the plot
+        _construct_plot_image(working_dir, layers.axis, layers.points, colours, output_directory, plot_name)
 
-        # Set the point mask
-        point_mask = point_img.mask_alpha(True)
-        point_mask.change_bgra_to_bgr()
-        point_mask.change_to_mono()
+    else:
+        raise IndexError(f"Failed to find {plot_name}_AXIS.png")
 
-        # Mask the colour on the point mask then assign it the point masks alpha channel
-        overlay_colour.mask_on_image(point_mask)
-        overlay_colour.change_bgr_to_bgra()
-        overlay_colour.assign_alpha_channel(point_mask)
-        blank.overlay_additive(overlay_colour)
 
-    blank.overlay_additive(axis)
-    blank.write_to_file(output_directory, plot_name)
+def _construct_plot_image(working_dir, axis, points, colours, output_directory, plot_name):
+    plot = composite_layers(plot_name, working_dir, axis, points, colours)
+    ImageObject(plot).write_to_file(output_directory, plot_name)
 
 
 
@@ -0,0 +1,91 @@
+from pyBlendFigures.Supports import summary_column_indexes, manhattan_chromosomes, chromosome_vertexes, \
+    rasterise_points, SummaryCache, SUMMARY_CACHE_SIZE
+
+from miscSupports import flatten, tuple_convert
+from imageObjects import ImageObject
+import numpy as np
+
+
+def create_manhattan_points(write_directory, write_name, summary_path, chromosome_groups, chromosome_header,
+                            base_position_header, p_value_header, camera_position, camera_scale, x_resolution,
+                            y_resolution, point_size=3, summary_cache=None, summary_cache_size=SUMMARY_CACHE_SIZE):
+    """
+    Render the point layer of each group of chromosomes of a manhattan plot with numpy rather than blender, writing
+    {write_name}__{index}.png for each group into write_directory as the Manhattan blend script would, so that only the
+    axis needs to be rendered by blender. The max -log10 p value of each group is returned, so the height of the axis
+    can be handed to blender rather than it parsing the summary file again.
+
+    :param write_directory: Directory to write the point layers to
+    :type write_directory: str | Path
+
+    :param write_name: Name of the plot
+    :type write_name: str
+
+    :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+    :type summary_path: str | Path
+
+    :param chromosome_groups: The chromosomes of each group, where each group is rendered as a layer
+    :type chromosome_groups: list[list[int]]
+
+    :param chromosome_header: Chromosome header name
+    :type chromosome_header: str
+
+    :param base_position_header: Base position header name
+    :type base_position_header: str
+
+    :param p_value_header: P value header name
+    :type p_value_header: str
+
+    :param camera_position: Position of the camera
+    :type camera_position: (float, float, float) | str
+
+    :param camera_scale: Scale of the orthographic camera
+    :type camera_scale: float
+
+    :param x_resolution: X dimension of the render
+    :type x_resolution: int
+
+    :param y_resolution: Y dimension of the render
+    :type y_resolution: int
+
+    :param point_size: Size in pixels each point is drawn at, defaults to 3
+    :type point_size: int
+
+    :param summary_cache: True to use the summary cache alongside the summary file, a directory to hold it within, or
+        None to parse the summary file, defaults to None
+    :type summary_cache: bool | str | Path | None
+
+    :param summary_cache_size: Size in bytes the summary cache directory may grow to, defaults to SUMMARY_CACHE_SIZE
+    :type summary_cache_size: int
+
+    :return: The max -log10 p value of each group, or None for a group without any points, having written each point
+        layer to write_directory
+    :rtype: list[float | None]
+    """
+    chromosome_column, base_position_column, p_value_column = summary_column_indexes(
+        summary_path, [chromosome_header, base_position_header, p_value_header])
+
+    cache = None
+    if summary_cache is not None and summary_cache is not False:
+        cache = SummaryCache(summary_path, None if summary_cache is True else summary_cache, summary_cache_size)
+
+    chromosomes = manhattan_chromosomes(summary_path, chromosome_column, base_position_column, p_value_column,
+                                        set(flatten(chromosome_groups)), cache)
+
+    camera_position = tuple_convert(camera_position)
+    group_maxima = []
+    for index, chromosome_group in enumerate(chromosome_groups):
+        image = np.zeros((int(y_resolution), int(x_resolution), 4), dtype=np.uint8)
+
+        y_maxima = []
+        for chromosome in chromosome_group:
+            if chromosome in chromosomes and len(chromosomes[chromosome][1]) > 0:
+                vertexes, y_max = chromosome_vertexes(chromosome, *chromosomes[chromosome])
+                rasterise_points(vertexes, camera_position, float(camera_scale), int(x_resolution), int(y_resolution),
+                                 int(point_size), image=image)
+                y_maxima.append(y_max)
+
+        ImageObject(image).write_to_file(write_directory, f"{write_name}__{index}")
+        group_maxima.append(max(y_maxima) if y_maxima else None)
+
+    return group_maxima
@@ -0,0 +1,15 @@
+from .job_manifest import write_job_manifest, load_job_manifest, load_job_args, iter_job_args, job_options
+from .job_timing import JobTimer, start_job_timer, active_job_timer, job_span
+from .blend_backend import BlendBackend, RecordingBackend, get_backend, set_backend
+from .summary_stats import summary_headers, summary_column_indexes, iter_summary_blocks, partition_summary_columns, \
+    partition_by_chromosome, negative_log10, normalise_min_max, set_summary_processes
+from .summary_index import build_summary_index, load_summary_index, summary_index, summary_index_path
+from .summary_cache import SummaryCache, get_summary_cache, set_summary_cache, clear_summary_cache, \
+    SUMMARY_CACHE_SIZE
+from .point_decimation import screen_positions, decimate_points
+from .point_raster import rasterise_points
+from .manhattan_vertexes import manhattan_chromosomes, chromosome_vertexes
+from .qq_points import expected_neg_log10, QQSketch, spill_sorted_runs, iter_merged_runs, external_qq_points, \
+    QQ_BLOCK_ROWS, QQ_TAIL_SIZE
+from .plot_layers import PlotLayers, index_plot_layers, plot_layers
+from .frame_stack import FrameStack, FrameStackError, is_frame_stack
@@ -0,0 +1,200 @@
+from bisect import bisect_right
+import struct
+import zlib
+
+# The gzip magic, deflate method, and FEXTRA flag, followed by the BC subfield that holds the size of each bgzf block
+BGZF_MAGIC = b"\x1f\x8b\x08\x04"
+BGZF_HEADER_SIZE = 18
+
+
+def is_bgzf(path):
+    """
+    Check if a file is block gzipped, as written by bgzip, rather than gzipped as a single stream
+
+    :param path: Path to the file
+    :type path: str | Path
+
+    :return: True if the file is block gzipped, else False
+    :rtype: bool
+    """
+    with open(path, "rb") as file:
+        header = file.read(BGZF_HEADER_SIZE)
+    return len(header) == BGZF_HEADER_SIZE and header[:4] == BGZF_MAGIC and header[12:14] == b"BC"
+
+
+def _block_size(header):
+    """The total compressed size of the block starting with this header"""
+    return struct.unpack("<H", header[16:18])[0] + 1
+
+
+def iter_bgzf_blocks(path, start=0):
+    """
+    Decompress each block of a bgzf file in turn
+
+    :param path: Path to the bgzf file
+    :type path: str | Path
+
+    :param start: The compressed offset of the block to start from, defaults to the first block
+    :type start: int
+
+    :return: Yields the compressed offset and decompressed data of each block
+    :rtype: collections.Iterable[(int, bytes)]
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        offset = start
+        while True:
+            header = file.read(BGZF_HEADER_SIZE)
+            if len(header) < BGZF_HEADER_SIZE:
+                return
+
+            block_size = _block_size(header)
+            block = header + file.read(block_size - BGZF_HEADER_SIZE)
+            yield offset, zlib.decompress(block[BGZF_HEADER_SIZE:-8], -15)
+            offset += block_size
+
+
+def bgzf_block_table(path):
+    """
+    The compressed and uncompressed offset of the start of each block, read from the block headers and size trailers so
+    nothing is decompressed
+
+    :param path: Path to the bgzf file
+    :type path: str | Path
+
+    :return: A list of the compressed offsets, and a list of the uncompressed offsets, of each block
+    :rtype: (list[int], list[int])
+    """
+    compressed_offsets, uncompressed_offsets = _block_bounds(path)
+    return compressed_offsets[:-1], uncompressed_offsets[:-1]
+
+
+def _block_bounds(path):
+    """The compressed and uncompressed offset of the start of each block, followed by those of the end of the file"""
+    compressed_offsets, uncompressed_offsets = [], []
+    with open(path, "rb") as file:
+        compressed, uncompressed = 0, 0
+        while True:
+            compressed_offsets.append(compressed)
+            uncompressed_offsets.append(uncompressed)
+
+            header = file.read(BGZF_HEADER_SIZE)
+            if len(header) < BGZF_HEADER_SIZE:
+                return compressed_offsets, uncompressed_offsets
+
+            block_size = _block_size(header)
+            file.seek(compressed + block_size - 4)
+
+            compressed += block_size
+            uncompressed += struct.unpack("<I", file.read(4))[0]
+
+
+def bgzf_spans(path, ranges=None, span_size=1 << 20):
+    """
+    Split a bgzf file into spans of whole blocks, so each span can be read and decompressed independently of the others,
+    such as within a process pool. Each span holds blocks until it decompresses to at least span_size bytes, and the
+    spans of each range are returned in order.
+
+    :param path: Path to the bgzf file
+    :type path: str | Path
+
+    :param ranges: The (start, end) virtual offsets of each range to split, defaults to None for the whole file
+    :type ranges: list[(int, int)] | None
+
+    :param span_size: Decompressed bytes to gather per span, defaults to 1MB
+    :type span_size: int
+
+    :return: A list of spans for each range, where each span is the (compressed start, compressed end) of its blocks
+        and the (skip, length) of the range within the decompressed blocks, as read by read_bgzf_span
+    :rtype: list[list[(int, int, int, int)]]
+    """
+    compressed, uncompressed = _block_bounds(path)
+    if ranges is None:
+        ranges = [(None, None)]
+
+    range_spans = []
+    for start, end in ranges:
+        # Convert the virtual offsets to offsets into the decompressed file
+        start = 0 if start is None else _decompressed_offset(compressed, uncompressed, start)
+        end = uncompressed[-1] if end is None else _decompressed_offset(compressed, uncompressed, end)
+
+        spans = []
+        block = bisect_right(uncompressed, start) - 1
+        while block < len(compressed) - 1 and uncompressed[block] < end:
+            first = block
+            while block < len(compressed) - 1 and uncompressed[block] < end and \
+                    uncompressed[block] - uncompressed[first] < span_size:
+                block += 1
+
+            skip = max(start - uncompressed[first], 0)
+            length = min(end, uncompressed[block]) - uncompressed[first] - skip
+            spans.append((compressed[first], compressed[block], skip, length))
+        range_spans.append(spans)
+    return range_spans
+
+
+def _decompressed_offset(compressed, uncompressed, virtual_offset):
+    """Convert a virtual offset to an offset into the decompressed stream of a bgzf file"""
+    return uncompressed[bisect_right(compressed, virtual_offset >> 16) - 1] + (virtual_offset & 0xFFFF)
+
+
+def read_bgzf_span(path, compressed_start, compressed_end, skip=0, length=None):
+    """
+    Read and decompress the whole blocks between two compressed offsets, as split by bgzf_spans
+
+    :param path: Path to the bgzf file
+    :type path: str | Path
+
+    :param compressed_start: Compressed offset of the first block
+    :type compressed_start: int
+
+    :param compressed_end: Compressed offset of the end of the last block
+    :type compressed_end: int
+
+    :param skip: Decompressed bytes to skip from the start of the first block, defaults to 0
+    :type skip: int
+
+    :param length: Decompressed bytes to return after skip, defaults to None for all of them
+    :type length: int | None
+
+    :return: The decompressed data
+    :rtype: bytes
+    """
+    with open(path, "rb") as file:
+        file.seek(compressed_start)
+        raw = file.read(compressed_end - compressed_start)
+
+    blocks, position = [], 0
+    while position < len(raw):
+        block_size = _block_size(raw[position:position + BGZF_HEADER_SIZE])
+        blocks.append(zlib.decompress(raw[position + BGZF_HEADER_SIZE:position + block_size - 8], -15))
+        position += block_size
+
+    data = b"".join(blocks)
+    return data[skip:] if length is None else data[skip:skip + length]
+
+
+def read_bgzf_range(path, start, end):
+    """
+    Decompress the data between two virtual offsets, where a virtual offset is the compressed offset of a block shifted
+    left 16 bits plus the offset within the decompressed block
+
+    :param path: Path to the bgzf file
+    :type path: str | Path
+
+    :param start: Virtual offset to start from
+    :type start: int
+
+    :param end: Virtual offset to stop at, exclusive
+    :type end: int
+
+    :return: Yields the decompressed data of each block within the range
+    :rtype: collections.Iterable[bytes]
+    """
+    for compressed, data in iter_bgzf_blocks(path, start >> 16):
+        first = start & 0xFFFF if compressed == start >> 16 else 0
+        if compressed >= end >> 16:
+            if compressed == end >> 16:
+                yield data[first:end & 0xFFFF]
+            return
+        yield data[first:]
@@ -0,0 +1,284 @@
+import numpy as np
+import abc
+
+_active_backend = None
+
+
+class BlendBackend(abc.ABC):
+    """
+    The geometry and render operations the BlendFiles scripts make, so that the data preparation of a script is kept
+    apart from how its geometry is built. BpyBackend builds the geometry within blender, whilst RecordingBackend
+    captures it as plain data so scripts can be run, profiled, and tested in standard python.
+    """
+    @abc.abstractmethod
+    def make_mesh(self, name, vertices, edges=(), faces=(), colour=(0.25, 0.25, 0.25, 1.0)):
+        """
+        Make a mesh of the given vertices, edges, and faces
+
+        :param name: Name of the object
+        :type name: str
+
+        :param vertices: The (x, y, z) vertices of the mesh
+        :type vertices: list[tuple] | numpy.ndarray
+
+        :param edges: Pairs of vertex indexes to join by an edge, defaults to none
+        :type edges: list | tuple
+
+        :param faces: Lists of vertex indexes that make up each face, defaults to none
+        :type faces: list | tuple
+
+        :param colour: RGBA colour of the object, defaults to a shade of grey
+        :type colour: (float, float, float, float)
+
+        :return: A reference to the object
+        """
+
+    @abc.abstractmethod
+    def make_line(self, name, start, end, width, colour):
+        """Make a line between the start and end (x, y, z) positions as a curve of the given width"""
+
+    @abc.abstractmethod
+    def make_text(self, name, x, y, text, scale, colour, align="LEFT"):
+        """
+        Make a text object at x, y displaying text
+
+        :param name: Name of the object
+        :type name: str
+
+        :param x: X position
+        :type x: float
+
+        :param y: Y position
+        :type y: float
+
+        :param text: Text to display
+        :type text: str
+
+        :param scale: Scale of the text relative to all other elements
+        :type scale: float
+
+        :param colour: RGBA colour of the text
+        :type colour: (float, float, float, float)
+
+        :param align: Aligns the text, takes LEFT, RIGHT, and CENTER, defaults to LEFT
+        :type align: str
+
+        :return: A reference to the object
+        """
+
+    @abc.abstractmethod
+    def make_graph_axis(self, colour, x_end, y_end, width, bound):
+        """Make the x and y axis of a graph, see blendSupports make_graph_axis"""
+
+    @abc.abstractmethod
+    def make_dashed_line(self, name, colour, total_width, width_min, height, line_density):
+        """Make a horizontal dashed line, see blendSupports make_horizontal_dashed_line"""
+
+    @abc.abstractmethod
+    def rotate(self, name, angle):
+        """Rotate the named object by angle radians about the z axis"""
+
+    @abc.abstractmethod
+    def dimensions(self, obj):
+        """
+        The dimensions of an object
+
+        :param obj: A reference to the object, as returned by make_mesh or make_text
+
+        :return: The x, y, and z dimensions
+        :rtype: (float, float, float)
+        """
+
+    @abc.abstractmethod
+    def set_colour(self, name, colour):
+        """Set the colour of the first material of the named object"""
+
+    @abc.abstractmethod
+    def set_text(self, name, text):
+        """Set the text displayed by the named text object"""
+
+    @abc.abstractmethod
+    def set_material_colours(self, name, colours):
+        """Set the colour of each material of the named object from a dict of material name: colour"""
+
+    @abc.abstractmethod
+    def render(self, camera_position, write_directory, write_name, x_resolution, y_resolution, camera_scale,
+               engine="CYCLES", opengl=False):
+        """
+        Render the scene through the orthographic camera to write_directory/write_name.png
+
+        :param camera_position: Position of the camera
+        :type camera_position: (float, float, float)
+
+        :param write_directory: Directory to write the image to
+        :type write_directory: str | Path
+
+        :param write_name: Name of the image, without an extension
+        :type write_name: str
+
+        :param x_resolution: X dimension of the image
+        :type x_resolution: int
+
+        :param y_resolution: Y dimension of the image
+        :type y_resolution: int
+
+        :param camera_scale: Scale of the orthographic camera
+        :type camera_scale: float
+
+        :param engine: The engine to render with, CYCLES or BLENDER_EEVEE, defaults to CYCLES
+        :type engine: str
+
+        :param opengl: If the viewport should be rendered via opengl rather than the engine, defaults to False
+        :type opengl: bool
+
+        :return: Nothing, render the scene then stop
+        :rtype: None
+        """
+
+    @abc.abstractmethod
+    def render_still(self, file_path, camera_position=None, camera_scale=None, x_resolution=None, y_resolution=None):
+        """
+        Render the scene as it is set up within the blend file to file_path, optionally moving the camera and setting
+        the resolution first
+        """
+
+    @abc.abstractmethod
+    def save(self, file_path):
+        """Save the scene as a blend file, so it can be manipulated by hand later"""
+
+    @abc.abstractmethod
+    def cleanup(self, collection="Collection"):
+        """Remove every object, bar the camera, from the collection"""
+
+
+class RecordingBackend(BlendBackend):
+    def __init__(self, text_width=0.6, text_height=0.7):
+        """
+        A backend that builds nothing, but records each mesh, text object, render, and save as plain data. The objects
+        currently in the scene are held in scene, whilst meshes, texts, renders, and saves hold everything made over the
+        life of the backend.
+
+        :param text_width: Width of each character of text relative to its scale, used to estimate text dimensions,
+            defaults to 0.6
+        :type text_width: float
+
+        :param text_height: Height of text relative to its scale, used to estimate text dimensions, defaults to 0.7
+        :type text_height: float
+        """
+        self.text_width = text_width
+        self.text_height = text_height
+
+        self.scene = {}
+        self.meshes = []
+        self.texts = []
+        self.renders = []
+        self.saves = []
+        self.changes = []
+
+    def _add(self, record):
+        """Add the record to the scene, de-duplicating its name with a numeric suffix as blender does"""
+        name, suffix = record["name"], 1
+        while name in self.scene:
+            name, suffix = f"{record['name']}.{suffix:03d}", suffix + 1
+
+        record["name"] = name
+        self.scene[name] = record
+        return record
+
+    def make_mesh(self, name, vertices, edges=(), faces=(), colour=(0.25, 0.25, 0.25, 1.0)):
+        record = self._add({"type": "mesh", "name": name, "colour": colour, "edges": list(edges), "faces": list(faces),
+                            "vertices": np.asarray(vertices, dtype=np.float32).reshape(-1, 3)})
+        self.meshes.append(record)
+        return record
+
+    def make_line(self, name, start, end, width, colour):
+        record = self.make_mesh(name, [start, end], [(0, 1)], [], colour)
+        record.update({"type": "line", "width": width})
+        return record
+
+    def make_text(self, name, x, y, text, scale, colour, align="LEFT"):
+        record = self._add({"type": "text", "name": name, "location": (x, y, 0), "text": text, "scale": scale,
+                            "colour": colour, "align": align, "rotation": 0.0,
+                            "dimensions": (len(text) * self.text_width * scale, self.text_height * scale, 0.0)})
+        self.texts.append(record)
+        return record
+
+    def make_graph_axis(self, colour, x_end, y_end, width, bound):
+        return self._add({"type": "axis", "name": "Axis", "colour": colour, "x_end": x_end, "y_end": y_end,
+                          "width": width, "bound": bound})
+
+    def make_dashed_line(self, name, colour, total_width, width_min, height, line_density):
+        return self._add({"type": "dashed_line", "name": name, "colour": colour, "total_width": total_width,
+                          "width_min": width_min, "height": height, "line_density": line_density})
+
+    def rotate(self, name, angle):
+        self.scene[name]["rotation"] = self.scene[name].get("rotation", 0.0) + angle
+
+    def dimensions(self, obj):
+        if "dimensions" in obj:
+            return obj["dimensions"]
+        elif len(obj.get("vertices", [])) > 0:
+            return tuple((obj["vertices"].max(axis=0) - obj["vertices"].min(axis=0)).tolist())
+        return 0.0, 0.0, 0.0
+
+    def set_colour(self, name, colour):
+        self.changes.append({"name": name, "colour": colour})
+
+    def set_text(self, name, text):
+        self.changes.append({"name": name, "text": text})
+
+    def set_material_colours(self, name, colours):
+        self.changes.append({"name": name, "materials": dict(colours)})
+
+    def render(self, camera_position, write_directory, write_name, x_resolution, y_resolution, camera_scale,
+               engine="CYCLES", opengl=False):
+        self.renders.append({"path": f"{write_directory}/{write_name}.png", "camera_position": camera_position,
+                             "camera_scale": camera_scale, "resolution": (x_resolution, y_resolution),
+                             "engine": "OPENGL" if opengl else engine, **self._scene_summary()})
+
+    def render_still(self, file_path, camera_position=None, camera_scale=None, x_resolution=None, y_resolution=None):
+        self.renders.append({"path": str(file_path), "camera_position": camera_position, "camera_scale": camera_scale,
+                             "resolution": (x_resolution, y_resolution), "engine": None, **self._scene_summary()})
+
+    def _scene_summary(self):
+        """The objects within the scene, and how many vertices they hold, at the time of a render"""
+        return {"objects": list(self.scene), "vertex_count": sum(len(record.get("vertices", []))
+                                                                 for record in self.scene.values())}
+
+    def save(self, file_path):
+        self.saves.append(str(file_path))
+
+    def cleanup(self, collection="Collection"):
+        self.scene = {}
+
+
+def get_backend():
+    """
+    The backend the BlendFiles scripts build their geometry with, which is a BpyBackend unless another has been set via
+    set_backend
+
+    :return: The active backend
+    :rtype: BlendBackend
+    """
+    global _active_backend
+    if _active_backend is None:
+        # BpyBackend requires blender, so it is only imported if no other backend has been set
+        from pyBlendFigures.Supports.bpy_backend import BpyBackend
+        _active_backend = BpyBackend()
+    return _active_backend
+
+
+def set_backend(backend):
+    """
+    Set the backend the BlendFiles scripts build their geometry with, such as a RecordingBackend so scripts can be run
+    without blender
+
+    :param backend: The backend to use, or None to revert to the BpyBackend
+    :type backend: BlendBackend | None
+
+    :return: The previous backend
+    :rtype: BlendBackend | None
+    """
+    global _active_backend
+    previous, _active_backend = _active_backend, backend
+    return previous
@@ -0,0 +1,70 @@
+from pyBlendFigures.Supports.job_manifest import iter_job_args, job_options
+from pyBlendFigures.Supports.job_timing import start_job_timer, active_job_timer
+from pyBlendFigures.Supports.blend_backend import get_backend
+from pyBlendFigures.Supports.summary_cache import set_summary_cache, SUMMARY_CACHE_SIZE
+from pyBlendFigures.Supports.summary_stats import set_summary_processes
+
+from pathlib import Path
+import runpy
+
+
+def run_job_batch(figure, argv, collection="Collection"):
+    """
+    Run each job of a manifest within this blender session, cleaning up the collection between each figure. Materials,
+    fonts, and the camera are left in place so that each figure after the first reuses them rather than reloading them.
+
+    The spans each figure records via job_span are written to a json timing report next to the manifest, alongside
+    cProfile and tracemalloc results if the job's options requested them. Summary statistics are cached where the job's
+    options set, see set_summary_cache, and bgzip files are parsed with the processes they set, see
+    set_summary_processes.
+
+    :param figure: The figure class, or function, of a BlendFiles script that takes the list of job arguments
+
+    :param argv: The command line arguments, normally sys.argv
+    :type argv: list[str]
+
+    :param collection: The collection the figures are built in, defaults to Collection
+    :type collection: str
+
+    :return: Nothing, make each figure then stop
+    :rtype: None
+    """
+    options = job_options(argv)
+    timer = start_job_timer(figure.__name__, options.get("profile", False), options.get("trace_memory", False))
+    set_summary_cache(options.get("summary_cache", None), options.get("summary_cache_size", SUMMARY_CACHE_SIZE))
+    set_summary_processes(options.get("summary_processes", None))
+
+    try:
+        for index, args in enumerate(iter_job_args(argv)):
+            if index > 0:
+                get_backend().cleanup(collection)
+            figure(args)
+
+    finally:
+        if argv[-1].endswith(".json"):
+            timer.write_report(Path(argv[-1]).with_suffix(".timing.json"))
+
+
+def run_timed_script(script, argv):
+    """
+    Run a BlendFiles script as if blender had been launched with it, timing it as a job. Scripts that make their figures
+    via run_job_batch replace this timer with their own and write its report, whilst for any other script the spans it
+    records via job_span, and its total time, are written to a json timing report next to the manifest.
+
+    :param script: Path to the BlendFiles script
+    :type script: str | Path
+
+    :param argv: The command line arguments, normally sys.argv, the last of which is the manifest of the job
+    :type argv: list[str]
+
+    :return: Nothing, run the script then stop
+    :rtype: None
+    """
+    options = job_options(argv)
+    timer = start_job_timer(Path(script).stem, options.get("profile", False), options.get("trace_memory", False))
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+
+    finally:
+        if active_job_timer() is timer and argv[-1].endswith(".json"):
+            timer.write_report(Path(argv[-1]).with_suffix(".timing.json"))
@@ -0,0 +1,112 @@
+from pyBlendFigures.Supports.blend_backend import BlendBackend
+from pyBlendFigures.Supports.bpy_mesh import fill_mesh
+
+from blendSupports.Meshs.horizontal_dashed_line import make_horizontal_dashed_line
+from blendSupports.Supports.collection_cleanup import collection_cleanup
+from blendSupports.Renders.render import open_gl_render, render_scene
+from blendSupports.Meshs.graph_axis import make_graph_axis
+from blendSupports.Meshs.mesh_ref import make_mesh
+from blendSupports.Meshs.text import make_text
+
+from miscSupports import tuple_convert
+from pathlib import Path
+import bpy
+
+
+class BpyBackend(BlendBackend):
+    """Builds the geometry of the BlendFiles scripts within blender, via bpy and blendSupports"""
+    def __init__(self):
+        self._materials = {}
+
+    def make_mesh(self, name, vertices, edges=(), faces=(), colour=(0.25, 0.25, 0.25, 1.0)):
+        obj, mesh = make_mesh(name, colour)
+        fill_mesh(mesh, vertices, edges, faces)
+        return obj
+
+    def make_line(self, name, start, end, width, colour):
+        line = self.make_mesh(name, [start, end], [(0, 1)], [], colour)
+
+        # Turn line to curve, add width equal to width
+        line.select_set(True)
+        bpy.ops.object.convert(target='CURVE')
+        bpy.context.object.data.bevel_resolution = 0
+        bpy.context.object.data.bevel_depth = width
+        return line
+
+    def make_text(self, name, x, y, text, scale, colour, align="LEFT"):
+        return make_text(name, x, y, text, scale, colour, align)
+
+    def make_graph_axis(self, colour, x_end, y_end, width, bound):
+        make_graph_axis(colour, x_end, y_end, width, bound)
+
+    def make_dashed_line(self, name, colour, total_width, width_min, height, line_density):
+        make_horizontal_dashed_line(name, colour, total_width, width_min, height, line_density)
+
+    def rotate(self, name, angle):
+        obj = bpy.data.objects[name]
+        obj.select_set(True)
+        bpy.ops.transform.rotate(value=angle, orient_axis='Z', orient_type='GLOBAL',
+                                 orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL',
+                                 constraint_axis=(False, False, True), mirror=True, use_proportional_edit=False,
+                                 proportional_edit_falloff='SMOOTH', proportional_size=1,
+                                 use_proportional_connected=False, use_proportional_projected=False)
+
+    def dimensions(self, obj):
+        x, y, z = obj.dimensions
+        return x, y, z
+
+    def set_colour(self, name, colour):
+        # Isolate the current object
+        bpy.ops.object.select_all(action='DESELECT')
+        obj = bpy.context.scene.objects.get(name)
+        obj.select_set(True)
+
+        mat = obj.data.materials[0]
+        emission = mat.node_tree.nodes.get('Emission')
+        emission.inputs[0].default_value = colour
+        bpy.ops.object.select_all(action='DESELECT')
+
+    def set_text(self, name, text):
+        bpy.context.scene.objects.get(name).data.body = text
+
+    def set_material_colours(self, name, colours):
+        # Isolate the emission node of each material once, as objects such as maps may hold thousands of materials
+        if name not in self._materials:
+            obj = bpy.context.scene.objects.get(name)
+            self._materials[name] = {mat.name: mat.node_tree.nodes.get('Emission') for mat in obj.data.materials}
+
+        emissions = self._materials[name]
+        for material, colour in colours.items():
+            emissions[material].inputs[0].default_value = colour
+
+    def render(self, camera_position, write_directory, write_name, x_resolution, y_resolution, camera_scale,
+               engine="CYCLES", opengl=False):
+        if opengl:
+            open_gl_render(camera_position, write_directory, write_name, x_resolution, y_resolution,
+                           camera_scale=camera_scale, save_file=False)
+        else:
+            render_scene(camera_position, write_directory, write_name, engine, x_resolution, y_resolution,
+                         camera_scale=camera_scale, save_file=False)
+
+    def render_still(self, file_path, camera_position=None, camera_scale=None, x_resolution=None, y_resolution=None):
+        # Set the output resolution and camera scale if requested
+        if x_resolution and y_resolution:
+            bpy.context.scene.render.resolution_x = int(x_resolution)
+            bpy.context.scene.render.resolution_y = int(y_resolution)
+
+        camera = bpy.data.objects["Camera"]
+        if camera_position is not None:
+            camera.location = tuple_convert(camera_position)
+        if camera_scale is not None:
+            camera.data.ortho_scale = float(camera_scale)
+
+        bpy.context.scene.render.filepath = str(Path(file_path).absolute())
+        bpy.context.scene.eevee.use_gtao = True
+        bpy.context.scene.render.film_transparent = True
+        bpy.ops.render.render(write_still=True)
+
+    def save(self, file_path):
+        bpy.ops.wm.save_as_mainfile(filepath=str(file_path))
+
+    def cleanup(self, collection="Collection"):
+        collection_cleanup(collection)
@@ -0,0 +1,56 @@
+import numpy as np
+import bpy
+
+
+def render_pixels(scene=None):
+    """
+    Render the scene and return the rendered frame as a (height, width, 3) bgr uint8 array, as OpenCV would load the
+    png of the frame, so that a blender script can append the frames it renders to a FrameStack without writing and
+    reading back a file per frame.
+
+    The frame is read from the Viewer node of the compositor, which is added to the scene on first use. Blender holds
+    its pixels as premultiplied linear rgba floats from the bottom row up, so they are copied out via foreach_get, then
+    unpremultiplied and encoded to sRGB as they would be when saved as a png under the Standard view transform, then
+    flipped and reordered.
+
+    :param scene: The scene to render, defaults to the current scene
+    :type scene: bpy.types.Scene | None
+
+    :return: The pixels of the frame
+    :rtype: numpy.ndarray
+    """
+    scene = bpy.context.scene if scene is None else scene
+    _viewer_node(scene)
+    bpy.ops.render.render(scene=scene.name)
+
+    image = bpy.data.images["Viewer Node"]
+    width, height = image.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, 4)[::-1]
+
+    colour, alpha = pixels[:, :, 2::-1], pixels[:, :, 3:]
+    np.divide(colour, alpha, out=colour, where=alpha > 0)
+    return np.rint(_linear_to_srgb(np.clip(colour, 0, 1)) * 255).astype(np.uint8)
+
+
+def _viewer_node(scene):
+    """Isolate, adding it linked to the render layers if it does not exist, the Viewer node of the compositor"""
+    scene.use_nodes = True
+    tree = scene.node_tree
+
+    viewer = next((node for node in tree.nodes if node.type == "VIEWER"), None)
+    if viewer is None:
+        layers = next((node for node in tree.nodes if node.type == "R_LAYERS"), None)
+        if layers is None:
+            layers = tree.nodes.new("CompositorNodeRLayers")
+
+        viewer = tree.nodes.new("CompositorNodeViewer")
+        viewer.use_alpha = True
+        tree.links.new(layers.outputs["Image"], viewer.inputs["Image"])
+    return viewer
+
+
+def _linear_to_srgb(colour):
+    """Encode linear colour values within 0 to 1 with the sRGB transfer function"""
+    return np.where(colour <= 0.0031308, colour * 12.92, 1.055 * np.power(colour, 1 / 2.4) - 0.055)
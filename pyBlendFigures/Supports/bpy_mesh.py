@@ -0,0 +1,58 @@
+from itertools import chain
+import numpy as np
+import bpy
+
+
+def fill_mesh(mesh, vertices, edges=(), faces=()):
+    """
+    Fill an empty mesh with vertices, edges, and faces. This does what mesh.from_pydata does, but each element is added
+    in bulk and then set via foreach_set from a flat numpy array, so millions of points are copied into the mesh rather
+    than iterated over as python tuples.
+
+    :param mesh: The empty mesh to fill, such as from blendSupports make_mesh
+    :type mesh: bpy.types.Mesh
+
+    :param vertices: The (x, y, z) vertices, ideally as a float32 array so they are not copied before being set
+    :type vertices: numpy.ndarray | list[tuple]
+
+    :param edges: Pairs of vertex indexes to join by an edge, defaults to none
+    :type edges: numpy.ndarray | list | tuple
+
+    :param faces: The vertex indexes of each face, as a 2D array if every face has the same number of vertices or as a
+        list of lists otherwise, defaults to none
+    :type faces: numpy.ndarray | list | tuple
+
+    :return: The mesh
+    :rtype: bpy.types.Mesh
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+
+    edges = np.ascontiguousarray(edges, dtype=np.int32).reshape(-1, 2)
+    if len(edges):
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+
+    if len(faces):
+        # Faces are set as a loop per vertex of each face, with each polygon holding the start and length of its loops
+        if isinstance(faces, np.ndarray):
+            face_lengths = np.full(len(faces), faces.shape[1], dtype=np.int32)
+            loops = np.ascontiguousarray(faces, dtype=np.int32).ravel()
+        else:
+            face_lengths = np.fromiter(map(len, faces), dtype=np.int32, count=len(faces))
+            loops = np.fromiter(chain.from_iterable(faces), dtype=np.int32, count=int(face_lengths.sum()))
+
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set("vertex_index", loops)
+        mesh.polygons.add(len(face_lengths))
+        mesh.polygons.foreach_set("loop_start", np.concatenate(([0], np.cumsum(face_lengths[:-1]))).astype(np.int32))
+
+        # Blender 4 derives the length of each polygon from the start of the next
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set("loop_total", face_lengths)
+
+    # Calculate the edges of each face, and flag loose edges, as from_pydata does
+    if len(edges) or len(faces):
+        mesh.update(calc_edges=bool(len(faces)), calc_edges_loose=bool(len(edges)))
+    return mesh
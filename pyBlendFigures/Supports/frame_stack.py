@@ -0,0 +1,178 @@
+from pathlib import Path
+import numpy as np
+import struct
+import json
+
+FRAME_STACK_MAGIC = b"PBFSTACK"
+FRAME_STACK_VERSION = 1
+
+# The magic, version, and the offset and length of the header, padded so the frames start at a fixed offset
+_PRELUDE = struct.Struct("<8sIQQ")
+_FRAMES_OFFSET = 64
+
+
+class FrameStackError(Exception):
+    """Raised when a file is not a frame stack, or a frame does not match the stack"""
+    def __init__(self, path, details):
+        super().__init__(f"Frame stack {path}: {details}")
+
+
+class FrameStack:
+    def __init__(self, path, mode="r"):
+        """
+        A stack of uint8 animation frames of the same shape held in a single file, so that the frames written by one
+        stage of an animation can be memory mapped by the next rather than encoded and decoded as a png per frame.
+
+        The file holds a fixed size prelude, the frames back to back from a fixed offset, then a json header of the
+        frame shape and the label of each frame, such as its date. As the header follows the frames, frames are appended
+        by writing over the header, which is rewritten by flush or close. A stack is only complete once closed.
+
+        :param path: Path to the frame stack
+        :type path: str | Path
+
+        :param mode: r to read the stack, w to create a new stack, or a to append to a stack, creating it if it does not
+            exist, defaults to r
+        :type mode: str
+        """
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"mode takes r, w, or a but was given {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.shape = None
+        self.labels = []
+        self._frames = None
+
+        if mode == "w" or (mode == "a" and not self.path.exists()):
+            self._file = open(self.path, "w+b")
+            self.flush()
+        else:
+            self._file = open(self.path, "rb" if mode == "r" else "r+b")
+            self._read_header()
+
+    def __repr__(self):
+        return f"FrameStack({self.path}: {len(self)} frames of {self.shape})"
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def __iter__(self):
+        return zip(self.labels, self.frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def frame_bytes(self):
+        """Bytes of each frame"""
+        return int(np.prod(self.shape)) if self.shape is not None else 0
+
+    @property
+    def frames(self):
+        """
+        The frames as a memory mapped array of (frames, *shape), which is read only unless the stack was opened to
+        write to
+
+        :rtype: numpy.ndarray
+        """
+        if self._frames is None or len(self._frames) != len(self):
+            if len(self) == 0:
+                return np.empty((0,) + tuple(self.shape or ()), dtype=np.uint8)
+            self._frames = np.memmap(self.path, dtype=np.uint8, mode="r" if self.mode == "r" else "r+",
+                                     offset=_FRAMES_OFFSET, shape=(len(self),) + self.shape)
+        return self._frames
+
+    def append(self, frame, label=None):
+        """
+        Append a frame to the end of the stack. The first frame sets the shape of every frame of the stack.
+
+        :param frame: The frame, which is written as uint8
+        :type frame: numpy.ndarray
+
+        :param label: Label of the frame, such as its date, defaults to the index of the frame
+        :type label: str | None
+
+        :return: Nothing, append the frame then stop
+        :rtype: None
+        """
+        if self.mode == "r":
+            raise FrameStackError(self.path, "was opened to read, so frames cannot be appended")
+
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.shape is None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise FrameStackError(self.path, f"holds frames of shape {self.shape} yet was given {frame.shape}")
+
+        self._file.seek(_FRAMES_OFFSET + len(self) * self.frame_bytes)
+        self._file.write(memoryview(frame).cast("B"))
+        self.labels.append(str(len(self)) if label is None else str(label))
+
+    def flush(self):
+        """
+        Write the header after the frames, so the stack can be read with every frame appended so far
+
+        :return: Nothing, write the header then stop
+        :rtype: None
+        """
+        header = json.dumps({"shape": self.shape, "labels": self.labels}).encode()
+        header_offset = _FRAMES_OFFSET + len(self) * self.frame_bytes
+
+        self._file.seek(header_offset)
+        self._file.write(header)
+        self._file.truncate()
+
+        self._file.seek(0)
+        self._file.write(_PRELUDE.pack(FRAME_STACK_MAGIC, FRAME_STACK_VERSION, header_offset, len(header)).ljust(
+            _FRAMES_OFFSET, b"\0"))
+        self._file.flush()
+
+    def close(self):
+        """
+        Write the header if the stack was opened to write to, then close the file. Frames from the frames memory map
+        remain readable after closing.
+
+        :return: Nothing, close the stack then stop
+        :rtype: None
+        """
+        if self._file.closed:
+            return
+        if self.mode != "r":
+            self.flush()
+        self._file.close()
+
+    def _read_header(self):
+        """Read the shape and labels of the frames"""
+        magic, version, header_offset, header_length = _PRELUDE.unpack(self._file.read(_PRELUDE.size))
+        if magic != FRAME_STACK_MAGIC:
+            raise FrameStackError(self.path, "is not a frame stack")
+        if version != FRAME_STACK_VERSION:
+            raise FrameStackError(self.path, f"is of version {version} yet version {FRAME_STACK_VERSION} was expected")
+
+        self._file.seek(header_offset)
+        header = json.loads(self._file.read(header_length))
+        self.shape = tuple(header["shape"]) if header["shape"] is not None else None
+        self.labels = header["labels"]
+
+
+def is_frame_stack(path):
+    """
+    If a path is a frame stack rather than, for example, a directory of png frames
+
+    :param path: The path
+    :type path: str | Path
+
+    :return: True if the path is a file starting with the frame stack magic, False otherwise
+    :rtype: bool
+    """
+    path = Path(path)
+    if not path.is_file():
+        return False
+    with open(path, "rb") as file:
+        return file.read(len(FRAME_STACK_MAGIC)) == FRAME_STACK_MAGIC
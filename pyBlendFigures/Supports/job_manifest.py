@@ -0,0 +1,161 @@
+from pathlib import Path
+import numpy as np
+import json
+import uuid
+
+MANIFEST_VERSION = 1
+
+
+def write_job_manifest(job_directory, script_name, args, options=None):
+    """
+    Write the arguments of a job to a typed json manifest that a BlendFiles script can load via load_job_args.
+
+    Numeric arrays are not written into the json, but saved as .npy files alongside it so that blender can memory map
+    them rather than parse them. If a list of argument dicts is given, a batch manifest is written, with each entry run
+    in turn within the same blender session via iter_job_args.
+
+    :param job_directory: Directory to write the manifest, and any arrays, to
+    :type job_directory: str | Path
+
+    :param script_name: Name of the BlendFiles script this job is for
+    :type script_name: str
+
+    :param args: The arguments of the job, in the order the script expects them, or a list of these for a batch
+    :type args: dict | list[dict]
+
+    :param options: Options of the job itself rather than the figure, such as if it should be profiled, defaults to None
+    :type options: dict | None
+
+    :return: Path to the manifest
+    :rtype: Path
+    """
+    Path(job_directory).mkdir(parents=True, exist_ok=True)
+    job_id = f"{script_name}_{uuid.uuid4().hex}"
+
+    manifest = {"version": MANIFEST_VERSION, "script": script_name, "options": options if options else {}}
+    if isinstance(args, dict):
+        manifest["args"] = _encode_args(job_directory, job_id, args)
+    else:
+        manifest["batch"] = [_encode_args(job_directory, f"{job_id}_{i}", item) for i, item in enumerate(args)]
+
+    manifest_path = Path(job_directory, f"{job_id}.json").absolute()
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, default=_encode_value)
+    return manifest_path
+
+
+def _encode_args(job_directory, job_id, args):
+    """Encode the args as a list of name-value pairs, saving any arrays to .npy files"""
+    encoded = []
+    for name, value in args.items():
+        if isinstance(value, np.ndarray):
+            array_path = Path(job_directory, f"{job_id}_{name}.npy").absolute()
+            np.save(array_path, value)
+            value = {"npy": str(array_path)}
+        encoded.append({"name": name, "value": value})
+    return encoded
+
+
+def _encode_value(value):
+    """Encode values json cannot natively handle, such as paths and numpy scalars"""
+    if isinstance(value, Path):
+        return str(value.absolute())
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        raise TypeError(f"Cannot write {type(value)} for {value} to a job manifest")
+
+
+def load_job_manifest(manifest_path):
+    """
+    Load a job manifest, memory mapping any arrays it references
+
+    :param manifest_path: Path to the manifest
+    :type manifest_path: str | Path
+
+    :return: The manifest, with args as a dict of name: value in the order the script expects them, or for batch
+        manifests batch as a list of these dicts
+    :rtype: dict
+    """
+    with open(manifest_path, "r") as file:
+        manifest = json.load(file)
+
+    if manifest["version"] != MANIFEST_VERSION:
+        raise ValueError(f"Job manifest version {manifest['version']} is not supported, expected {MANIFEST_VERSION}")
+
+    if "batch" in manifest:
+        manifest["batch"] = [_decode_args(args) for args in manifest["batch"]]
+    else:
+        manifest["args"] = _decode_args(manifest["args"])
+    return manifest
+
+
+def _decode_args(encoded):
+    """Decode a list of name-value pairs back into a dict of name: value"""
+    return {arg["name"]: _decode_value(arg["value"]) for arg in encoded}
+
+
+def _decode_value(value):
+    """Arrays are stored as a dict of {'npy': path} so they can be memory mapped"""
+    if isinstance(value, dict) and "npy" in value:
+        return np.load(value["npy"], mmap_mode="r")
+    else:
+        return value
+
+
+def load_job_args(argv):
+    """
+    Load the arguments of a job from the last command line argument, which is the path to a job manifest.
+
+    For scripts launched by hand, a "__" delimited string of arguments is also accepted, in which case each argument is
+    left as a string.
+
+    :param argv: The command line arguments, normally sys.argv
+    :type argv: list[str]
+
+    :return: The arguments of the job in the order the script expects them
+    :rtype: list
+    """
+    if not argv[-1].endswith(".json"):
+        return argv[-1].split("__")
+
+    manifest = load_job_manifest(argv[-1])
+    if "batch" in manifest:
+        raise ValueError(f"{argv[-1]} is a batch manifest, which should be loaded via iter_job_args")
+    return list(manifest["args"].values())
+
+
+def iter_job_args(argv):
+    """
+    Iterate through the arguments of each job in a batch manifest, or of the single job in a standard manifest or "__"
+    delimited string
+
+    :param argv: The command line arguments, normally sys.argv
+    :type argv: list[str]
+
+    :return: A generator of the arguments of each job, in the order the script expects them
+    :rtype: collections.Iterable[list]
+    """
+    if argv[-1].endswith(".json"):
+        manifest = load_job_manifest(argv[-1])
+        for args in manifest.get("batch", [manifest.get("args")]):
+            yield list(args.values())
+    else:
+        yield argv[-1].split("__")
+
+
+def job_options(argv):
+    """
+    Load the options of a job, such as if it should be profiled, from its manifest
+
+    :param argv: The command line arguments, normally sys.argv
+    :type argv: list[str]
+
+    :return: The options of the job, which are empty for jobs launched via a "__" delimited string
+    :rtype: dict
+    """
+    if not argv[-1].endswith(".json"):
+        return {}
+
+    with open(argv[-1], "r") as file:
+        return json.load(file).get("options", {})
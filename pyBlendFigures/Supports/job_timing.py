@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+from pathlib import Path
+import tracemalloc
+import cProfile
+import pstats
+import json
+import time
+import io
+
+
+class JobTimer:
+    def __init__(self, job_name, profile=False, trace_memory=False):
+        """
+        Records timed spans of a job, such as parse, geometry, text, render and save, with optional cProfile and
+        tracemalloc capture across the whole job.
+
+        :param job_name: Name of the job, normally the BlendFiles script
+        :type job_name: str
+
+        :param profile: If the job should be profiled with cProfile, defaults to False
+        :type profile: bool
+
+        :param trace_memory: If memory allocations should be traced with tracemalloc, defaults to False
+        :type trace_memory: bool
+        """
+        self.job_name = job_name
+        self.spans = []
+        self.start = time.time()
+        self.end = None
+
+        self._profiler = cProfile.Profile() if profile else None
+        self._trace_memory = trace_memory
+
+        if self._trace_memory:
+            tracemalloc.start()
+        if self._profiler:
+            self._profiler.enable()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Time the body of a with statement as a span of this job
+
+        :param name: Name of the span, spans of the same name are totaled in the report
+        :type name: str
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = {"name": name, "seconds": time.perf_counter() - start}
+            if self._trace_memory:
+                span["traced_memory"], span["peak_memory"] = tracemalloc.get_traced_memory()
+            self.spans.append(span)
+
+    def stop(self):
+        """Stop timing, profiling and tracing this job"""
+        self.end = time.time()
+
+        if self._profiler:
+            self._profiler.disable()
+
+    def report(self, profile_path=None, top=25):
+        """
+        Create the report of this job
+
+        :param profile_path: If set, and the job was profiled, the raw cProfile stats are dumped to this path
+        :type profile_path: str | Path | None
+
+        :param top: The number of entries of the profile and memory trace to include in the report, defaults to 25
+        :type top: int
+
+        :return: The report, with each span and the total seconds per span name
+        :rtype: dict
+        """
+        if self.end is None:
+            self.stop()
+
+        totals = {}
+        for span in self.spans:
+            totals[span["name"]] = totals.get(span["name"], 0) + span["seconds"]
+
+        report = {"job": self.job_name, "start": self.start, "seconds": self.end - self.start, "spans": self.spans,
+                  "totals": totals}
+
+        if self._profiler:
+            if profile_path:
+                self._profiler.dump_stats(str(profile_path))
+                report["profile_path"] = str(profile_path)
+
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            report["profile"] = stream.getvalue()
+
+        if self._trace_memory and tracemalloc.is_tracing():
+            report["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            report["memory"] = [str(stat) for stat in tracemalloc.take_snapshot().statistics("lineno")[:top]]
+            tracemalloc.stop()
+
+        return report
+
+    def write_report(self, report_path, top=25):
+        """
+        Write the report of this job as json, alongside the cProfile stats if the job was profiled
+
+        :param report_path: Path to write the report to
+        :type report_path: str | Path
+
+        :param top: The number of entries of the profile and memory trace to include in the report, defaults to 25
+        :type top: int
+
+        :return: The report
+        :rtype: dict
+        """
+        report_path = Path(report_path)
+        report = self.report(report_path.with_suffix(".prof"), top)
+        with open(report_path, "w") as file:
+            json.dump(report, file, indent=4)
+        return report
+
+
+_active_timer = JobTimer("Unnamed")
+
+
+def start_job_timer(job_name, profile=False, trace_memory=False):
+    """
+    Start the timer that job_span records to, replacing and stopping any previous timer
+
+    :param job_name: Name of the job, normally the BlendFiles script
+    :type job_name: str
+
+    :param profile: If the job should be profiled with cProfile, defaults to False
+    :type profile: bool
+
+    :param trace_memory: If memory allocations should be traced with tracemalloc, defaults to False
+    :type trace_memory: bool
+
+    :return: The timer
+    :rtype: JobTimer
+    """
+    global _active_timer
+    # Only one profiler may be enabled at a time, so the timer being replaced is stopped first
+    if _active_timer.end is None:
+        _active_timer.stop()
+    _active_timer = JobTimer(job_name, profile, trace_memory)
+    return _active_timer
+
+
+def active_job_timer():
+    """
+    The timer job_span currently records to
+
+    :rtype: JobTimer
+    """
+    return _active_timer
+
+
+def job_span(name):
+    """
+    Time the body of a with statement as a span of the current job, for example:
+
+        with job_span("parse"):
+            ...
+
+    :param name: Name of the span, such as parse, geometry, text, render or save
+    :type name: str
+    """
+    return _active_timer.span(name)
@@ -0,0 +1,84 @@
+from pyBlendFigures.Supports.summary_stats import partition_summary_columns, partition_by_chromosome, \
+    negative_log10, normalise_min_max
+from pyBlendFigures.Supports.summary_index import summary_index
+
+import numpy as np
+
+
+def manhattan_chromosomes(summary_path, chromosome_column, base_position_column, p_value_column, chromosomes,
+                          cache=None):
+    """
+    Partition the base position and -log10 p value of each row by the chromosome it belongs to. These are memory
+    mapped from the summary cache if one is given and holds the file. Otherwise the file is parsed in blocks, reading
+    only the rows of the requested chromosomes via its index, unless every chromosome of the file is requested and a
+    cache is given, in which case the file is parsed into the cache so later figures memory map it. The file does not
+    need to be sorted by chromosome.
+
+    :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+    :type summary_path: str | Path
+
+    :param chromosome_column: Index of the chromosome column
+    :type chromosome_column: int
+
+    :param base_position_column: Index of the base position column
+    :type base_position_column: int
+
+    :param p_value_column: Index of the p value column
+    :type p_value_column: int
+
+    :param chromosomes: The chromosomes to isolate, rows of all other chromosomes are skipped
+    :type chromosomes: set[int]
+
+    :param cache: The summary cache of the file, defaults to None to parse the file
+    :type cache: pyBlendFigures.Supports.summary_cache.SummaryCache | None
+
+    :return: A dict of chromosome: (base positions, -log10 p values) for each requested chromosome in the file
+    :rtype: dict[int, (numpy.ndarray, numpy.ndarray)]
+    """
+    columns, dtypes = [chromosome_column, base_position_column, p_value_column], [np.int8, np.int32, np.float64]
+    if cache and cache.has_columns(columns, dtypes):
+        return _cached_chromosomes(cache, columns, chromosomes)
+
+    # A file only holding some of the requested chromosomes can be read via its index, whilst one that is read whole is
+    # parsed into the cache for later figures
+    index = summary_index(summary_path, chromosome_column)
+    if cache and (index["chromosomes"] is None or not set(index["chromosomes"]) - set(chromosomes)):
+        return _cached_chromosomes(cache, columns, chromosomes)
+
+    partitions = partition_summary_columns(summary_path, chromosome_column, [base_position_column, p_value_column],
+                                           [np.int32, np.float64], chromosomes, index=index)
+    return {chromosome: (base_positions, negative_log10(p_values))
+            for chromosome, (base_positions, p_values) in partitions.items()}
+
+
+def _cached_chromosomes(cache, columns, chromosomes):
+    """Partition the cached columns by chromosome, caching the columns first if required"""
+    chromosome_values, base_positions, _ = cache.columns(columns, [np.int8, np.int32, np.float64])
+    return partition_by_chromosome(chromosome_values, [base_positions, cache.neg_log10(columns[2])], chromosomes)
+
+
+def chromosome_vertexes(chromosome, base_positions, log_p_values):
+    """
+    Create the vertexes of a chromosome, where x is the base position bound between 0 and 1 and offset by the
+    chromosome, and y is the -log10 p value
+
+    :param chromosome: The chromosome
+    :type chromosome: int
+
+    :param base_positions: The base positions of this chromosome
+    :type base_positions: numpy.ndarray
+
+    :param log_p_values: The -log10 p values of this chromosome
+    :type log_p_values: numpy.ndarray
+
+    :return: The (x, y, 0) vertexes, and the max of y for the axis
+    :rtype: (numpy.ndarray, float)
+    """
+    vertexes = np.zeros((len(log_p_values), 3), dtype=np.float64)
+
+    # Bound the base pair positions between 0 and 1, offset by the chromosome
+    vertexes[:, 0] = normalise_min_max(base_positions) + (chromosome - 1)
+
+    # Plot the -log base 10 p values, returning the max to the axis so we can create it
+    vertexes[:, 1] = log_p_values
+    return vertexes, float(vertexes[:, 1].max())
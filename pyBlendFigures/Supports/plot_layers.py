@@ -0,0 +1,94 @@
+import os
+
+
+class PlotLayers:
+    def __init__(self, name):
+        """
+        The rendered layers of a single plot within a working directory, which the blend scripts write as
+        {name}__AXIS.png for the axis and {name}__{group}.png for each layer of points.
+
+        :param name: Name of the plot
+        :type name: str
+        """
+        self.name = name
+        self.axis = None
+        self._points = {}
+
+    def __repr__(self):
+        return f"PlotLayers({self.name}: axis {self.axis}, points {self.points})"
+
+    def add(self, group, file):
+        """
+        Add a layer of this plot
+
+        :param group: The group of the layer, AXIS for the axis
+        :type group: str
+
+        :param file: File name of the layer
+        :type file: str
+
+        :return: Nothing, add the layer then stop
+        :rtype: None
+        """
+        if group == "AXIS":
+            self.axis = file
+        else:
+            self._points[group] = file
+
+    @property
+    def points(self):
+        """
+        The file names of the point layers, ordered by group so numbered groups are in the order of their colours
+
+        :rtype: list[str]
+        """
+        return [self._points[group] for group in sorted(self._points, key=_group_order)]
+
+
+def _group_order(group):
+    """Order numbered groups numerically, so group 10 follows group 9, ahead of any named groups"""
+    return (0, int(group), "") if group.isdigit() else (1, 0, group)
+
+
+def index_plot_layers(directory):
+    """
+    Index the rendered layers of every plot within a directory from a single listing of it. Each png named as
+    {name}__{group} is assigned to the plot of that exact name, so a plot whose name is the prefix of another does not
+    take on its layers, whilst any other file, such as logs, blend files, or composited plots, is ignored.
+
+    :param directory: The working directory the blend scripts rendered into
+    :type directory: str | Path
+
+    :return: The layers of each plot, by plot name
+    :rtype: dict[str, PlotLayers]
+    """
+    plots = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(".png") or "__" not in entry.name:
+                continue
+
+            # The axis of a qq plot is written as {name}__AXIS.png.png, so the group is up to the first suffix
+            name, _, group = entry.name.rpartition("__")
+            group = group.split(".")[0]
+            if name not in plots:
+                plots[name] = PlotLayers(name)
+            plots[name].add(group, entry.name)
+
+    return plots
+
+
+def plot_layers(directory, plot_name):
+    """
+    The rendered layers of a single plot within a directory
+
+    :param directory: The working directory the blend scripts rendered into
+    :type directory: str | Path
+
+    :param plot_name: Name of the plot
+    :type plot_name: str
+
+    :return: The layers of the plot, which has no layers if none were found
+    :rtype: PlotLayers
+    """
+    return index_plot_layers(directory).get(plot_name, PlotLayers(plot_name))
@@ -0,0 +1,113 @@
+import numpy as np
+
+# Distance in pixels from the edge of a cell within which points are always kept, as renderers may round them either way
+BOUNDARY_TOLERANCE = 1e-3
+
+
+def screen_positions(vertices, camera_position, camera_scale, x_resolution, y_resolution, dtype=np.float64):
+    """
+    Project vertices through an orthographic camera looking down the z axis into pixel positions, where (0, 0) is the
+    top left corner of the image. As blender fits the orthographic scale to the larger dimension of the image, each
+    unit of the scene spans max(x_resolution, y_resolution) / camera_scale pixels.
+
+    :param vertices: The (x, y, z) vertices
+    :type vertices: numpy.ndarray
+
+    :param camera_position: Position of the camera
+    :type camera_position: (float, float, float)
+
+    :param camera_scale: Scale of the orthographic camera
+    :type camera_scale: float
+
+    :param x_resolution: X dimension of the image
+    :type x_resolution: int
+
+    :param y_resolution: Y dimension of the image
+    :type y_resolution: int
+
+    :param dtype: Precision to project the vertices in, defaults to np.float64
+    :type dtype: numpy.dtype
+
+    :return: The x and y pixel position of each vertex, as floats so sub pixel positions are retained
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    vertices = np.asarray(vertices, dtype=dtype).reshape(-1, 3)
+    pixels_per_unit = dtype(max(x_resolution, y_resolution) / float(camera_scale))
+
+    x = (vertices[:, 0] - dtype(camera_position[0])) * pixels_per_unit + dtype(x_resolution / 2)
+    y = dtype(y_resolution / 2) - (vertices[:, 1] - dtype(camera_position[1])) * pixels_per_unit
+    return x, y
+
+
+def decimate_points(vertices, camera_position, camera_scale, x_resolution, y_resolution, threshold, point_size=3):
+    """
+    Remove points that could not change the rendered image. Every point at or above the threshold on the y axis, such
+    as a -log10 p value, is kept. Points below it are binned into a grid of screen pixels and only a single point
+    within each occupied pixel is kept, alongside culling points that lie entirely outside of the image.
+
+    Points are drawn as squares of point_size pixels, covering each pixel whose centre is within the square. Which
+    pixels a point covers only changes as its position crosses a pixel boundary for odd sizes, or the centre of a pixel
+    for even sizes, so the grid is aligned to match and every point within a cell covers exactly the same pixels.
+
+    :param vertices: The (x, y, z) vertices
+    :type vertices: numpy.ndarray
+
+    :param camera_position: Position of the camera
+    :type camera_position: (float, float, float)
+
+    :param camera_scale: Scale of the orthographic camera
+    :type camera_scale: float
+
+    :param x_resolution: X dimension of the image
+    :type x_resolution: int
+
+    :param y_resolution: Y dimension of the image
+    :type y_resolution: int
+
+    :param threshold: Points at or above this y value are always kept
+    :type threshold: float
+
+    :param point_size: Size in pixels each point is drawn at, defaults to 3
+    :type point_size: int
+
+    :return: The kept vertices, in their original order
+    :rtype: numpy.ndarray
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    below_threshold = vertices[:, 1] < threshold
+    below = np.flatnonzero(below_threshold)
+    if len(below) == 0:
+        return vertices
+
+    # Blender holds vertices in single precision, so points are binned on where they will be drawn rather than where
+    # they were submitted
+    x, y = screen_positions(vertices[below].astype(np.float32), camera_position, camera_scale, x_resolution,
+                            y_resolution)
+
+    # Cull the points that cannot cover any pixel of the image
+    margin = point_size / 2
+    visible = (x > -margin) & (x < x_resolution + margin) & (y > -margin) & (y < y_resolution + margin)
+    below, x, y = below[visible], x[visible], y[visible]
+
+    # Bin the remaining points into pixel cells, shifted so the cells of the margin are positive
+    offset = 0.5 if point_size % 2 == 0 else 0.0
+    shift = int(np.ceil(margin)) + 1
+    x, y = x + offset, y + offset
+    columns = np.floor(x).astype(np.int64) + shift
+    rows = np.floor(y).astype(np.int64) + shift
+
+    # Points within BOUNDARY_TOLERANCE of the edge of a cell may be drawn within the neighbouring cell, depending on the
+    # rounding of the renderer, so these are always kept, and one of the remaining points of each cell is kept
+    boundary = (np.abs(x - np.round(x)) < BOUNDARY_TOLERANCE) | (np.abs(y - np.round(y)) < BOUNDARY_TOLERANCE)
+    interior = np.flatnonzero(~boundary)
+
+    # Each point claims its cell, so each occupied cell is left holding a single point
+    stride = x_resolution + 2 * shift + 1
+    owners = np.full(stride * (y_resolution + 2 * shift + 1), -1, dtype=np.int64)
+    owners[rows[interior] * stride + columns[interior]] = interior
+    owners = owners[owners >= 0]
+
+    kept = ~below_threshold
+    kept[below[owners]] = True
+    kept[below[boundary]] = True
+    return vertices[kept]
@@ -0,0 +1,67 @@
+from pyBlendFigures.Supports.point_decimation import screen_positions
+
+import numpy as np
+
+
+def rasterise_points(vertices, camera_position, camera_scale, x_resolution, y_resolution, point_size=3,
+                     colour=(0.25, 0.25, 0.25, 1.0), image=None):
+    """
+    Draw vertices as points into a BGRA image, as blender's opengl render draws the vertices of a mesh, so point layers
+    can be rendered without blender. Vertices are projected through the orthographic camera via screen_positions, and
+    each is drawn as a square of point_size pixels covering each pixel whose centre lies within it.
+
+    :param vertices: The (x, y, z) vertices
+    :type vertices: numpy.ndarray
+
+    :param camera_position: Position of the camera
+    :type camera_position: (float, float, float)
+
+    :param camera_scale: Scale of the orthographic camera
+    :type camera_scale: float
+
+    :param x_resolution: X dimension of the image
+    :type x_resolution: int
+
+    :param y_resolution: Y dimension of the image
+    :type y_resolution: int
+
+    :param point_size: Size in pixels each point is drawn at, defaults to 3
+    :type point_size: int
+
+    :param colour: RGBA colour of the points, bound between 0 and 1, defaults to the grey of blendSupports meshes
+    :type colour: (float, float, float, float)
+
+    :param image: A BGRA image to draw the points onto, defaults to a new transparent image
+    :type image: numpy.ndarray | None
+
+    :return: The image
+    :rtype: numpy.ndarray
+    """
+    if image is None:
+        image = np.zeros((y_resolution, x_resolution, 4), dtype=np.uint8)
+
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    if len(vertices) == 0:
+        return image
+
+    # The top left pixel each point covers, which may lie up to point_size - 1 pixels outside of the image. Vertices are
+    # projected in single precision as blender projects them, so points on the edge of a pixel are drawn within it
+    x, y = screen_positions(vertices, camera_position, camera_scale, x_resolution, y_resolution, np.float32)
+    left = np.floor(x - point_size / 2 + 0.5).astype(np.int64)
+    top = np.floor(y - point_size / 2 + 0.5).astype(np.int64)
+
+    # Mark the corner of each point within a padded grid, so each point is drawn once however many share a pixel
+    pad = point_size - 1
+    inside = (left >= -pad) & (left < x_resolution) & (top >= -pad) & (top < y_resolution)
+    corners = np.zeros((y_resolution + pad, x_resolution + pad), dtype=bool)
+    corners[top[inside] + pad, left[inside] + pad] = True
+
+    # Then extend each corner into a square of point_size pixels
+    covered = np.zeros((y_resolution, x_resolution), dtype=bool)
+    for row in range(point_size):
+        for column in range(point_size):
+            covered |= corners[pad - row:pad - row + y_resolution, pad - column:pad - column + x_resolution]
+
+    bgra = np.clip(np.asarray(colour, dtype=np.float64)[[2, 1, 0, 3]], 0, 1)
+    image[covered] = np.round(bgra * 255).astype(np.uint8)
+    return image
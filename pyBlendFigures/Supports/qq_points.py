@@ -0,0 +1,271 @@
+from pyBlendFigures.Supports.point_decimation import decimate_points
+
+from pathlib import Path
+import numpy as np
+import tempfile
+import math
+
+# Bins of a QQSketch, and the spacing of the points drawn across each bin, per pixel of the render
+QQ_SKETCH_OVERSAMPLE = 4
+
+# The number of largest observed values a QQSketch holds exactly
+QQ_TAIL_SIZE = 100000
+
+# Observed values streamed into a QQSketch at a time
+QQ_BLOCK_ROWS = 1 << 20
+
+# Observed values sorted in memory at a time by external_qq_points, before each sorted run is spilled to disk
+QQ_RUN_ROWS = 1 << 22
+
+# Values read from each sorted run at a time whilst the runs are merged
+QQ_MERGE_ROWS = 1 << 16
+
+
+def expected_neg_log10(ranks, total):
+    """
+    The expected -log10 p value of each rank of the sorted observed values, for ranks from 0 to total - 1. As the
+    expected p values are evenly spaced between 1 and 1 / total, the rank i of the sorted -log10 values expects
+    -log10(1 - i / total), so the expected values of any ranks can be created without creating those of every rank.
+
+    :param ranks: The ranks of the sorted observed values, from smallest to largest
+    :type ranks: numpy.ndarray
+
+    :param total: The number of observed values
+    :type total: int
+
+    :return: The expected -log10 p value of each rank
+    :rtype: numpy.ndarray
+    """
+    return -np.log10(1 - np.asarray(ranks, dtype=np.float64) / total)
+
+
+class QQSketch:
+    def __init__(self, y_min, y_max, pixel_size, tail_size=QQ_TAIL_SIZE):
+        """
+        A streaming summary of the observed values of a QQ plot, which holds its memory constant regardless of how many
+        values are added. The largest tail_size values are held exactly, whilst every other value is counted within a
+        bin QQ_SKETCH_OVERSAMPLE bins to a pixel between y_min and y_max, the visible range of the render. As the
+        counts are exact, the rank of each bin is exact, and each value is placed within a fraction of a pixel of
+        where it would be drawn.
+
+        :param y_min: The smallest observed value visible within the render
+        :type y_min: float
+
+        :param y_max: The largest observed value visible within the render
+        :type y_max: float
+
+        :param pixel_size: The size of a pixel of the render, in the units of the plot
+        :type pixel_size: float
+
+        :param tail_size: The number of largest values to hold exactly, which is raised if required so that the points
+            drawn across a bin are never further apart than the values they stand in for, defaults to QQ_TAIL_SIZE
+        :type tail_size: int
+        """
+        self.y_min = float(y_min)
+        self.bin_width = pixel_size / QQ_SKETCH_OVERSAMPLE
+
+        # Consecutive ranks expect values 1 / (ln(10) * (total - rank)) apart, so every rank outside of the tail expects
+        # a value within a bin width of the next
+        self.tail_size = max(int(tail_size), math.ceil(1 / (math.log(10) * self.bin_width)))
+
+        # Bin 0 counts the values below y_min, and the final bin those above y_max
+        self.counts = np.zeros(math.ceil((y_max - y_min) / self.bin_width) + 2, dtype=np.int64)
+        self.tail = np.empty(0, dtype=np.float64)
+        self.total = 0
+
+    def update(self, values):
+        """
+        Add a block of observed values to the sketch
+
+        :param values: The observed -log10 p values
+        :type values: numpy.ndarray
+
+        :return: Nothing, add the values then stop
+        :rtype: None
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.total += len(values)
+
+        bins = np.clip(np.floor((values - self.y_min) / self.bin_width) + 1, 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins.astype(np.int64), minlength=len(self.counts))
+
+        # Keep the largest values of the block and the current tail
+        if len(values) > self.tail_size:
+            values = np.partition(values, len(values) - self.tail_size)[-self.tail_size:]
+        tail = np.concatenate((self.tail, values))
+        if len(tail) > self.tail_size:
+            tail = np.partition(tail, len(tail) - self.tail_size)[-self.tail_size:]
+        self.tail = tail
+
+    def points(self):
+        """
+        The expected and observed values of the points of the QQ plot. The tail is returned exactly, whilst the values
+        within each visible bin are returned as points spread evenly between the expected values of the first and last
+        rank of the bin, at the centre of the bin, so the line they draw matches that of the values they stand in for.
+
+        :return: The expected and observed value of each point, from smallest to largest
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        tail = np.sort(self.tail)
+        bulk = self.total - len(tail)
+
+        # The rank of the first and last value of each bin, bar those values held in the tail
+        ends = np.minimum(np.cumsum(self.counts), bulk)
+        starts = np.minimum(ends, np.cumsum(self.counts) - self.counts)
+        visible = np.flatnonzero(ends > starts)
+        visible = visible[(visible > 0) & (visible < len(self.counts) - 1)]
+
+        first = expected_neg_log10(starts[visible], self.total)
+        last = expected_neg_log10(ends[visible] - 1, self.total)
+
+        # Spread points across each bin no further apart than a bin width
+        point_counts = np.ceil((last - first) / self.bin_width).astype(np.int64) + 1
+        bins = np.repeat(np.arange(len(visible)), point_counts)
+        steps = np.arange(len(bins)) - np.repeat(np.cumsum(point_counts) - point_counts, point_counts)
+        fractions = steps / np.maximum(point_counts - 1, 1)[bins]
+
+        x_values = np.concatenate((first[bins] + (last - first)[bins] * fractions,
+                                   expected_neg_log10(np.arange(bulk, self.total), self.total)))
+        y_values = np.concatenate((self.y_min + (visible[bins] - 0.5) * self.bin_width, tail))
+        return x_values, y_values
+
+
+def spill_sorted_runs(blocks, directory, run_rows=QQ_RUN_ROWS, dtype=np.float32):
+    """
+    Gather blocks of values into runs of run_rows values, sorting each run and spilling it to a .npy file so only a
+    single run is held in memory at a time. Values are held as float32 by default, as blender holds vertices.
+
+    :param blocks: The blocks of values, such as the observed -log10 p values of a summary file
+    :type blocks: collections.Iterable[numpy.ndarray]
+
+    :param directory: Directory to write the runs to
+    :type directory: str | Path
+
+    :param run_rows: Values per run, defaults to QQ_RUN_ROWS
+    :type run_rows: int
+
+    :param dtype: The dtype the values are held as, defaults to float32
+    :type dtype: numpy.dtype | type
+
+    :return: The path of each sorted run, and the total number of values
+    :rtype: (list[Path], int)
+    """
+    paths, total = [], 0
+    run, filled = np.empty(run_rows, dtype=dtype), 0
+
+    for values in blocks:
+        values = np.asarray(values, dtype=dtype)
+        values = values[~np.isnan(values)]
+        total += len(values)
+
+        while len(values):
+            taken = min(run_rows - filled, len(values))
+            run[filled:filled + taken] = values[:taken]
+            filled, values = filled + taken, values[taken:]
+
+            if filled == run_rows:
+                paths.append(_spill_run(run, directory, len(paths)))
+                filled = 0
+
+    if filled:
+        paths.append(_spill_run(run[:filled], directory, len(paths)))
+    return paths, total
+
+
+def _spill_run(run, directory, index):
+    """Sort the run in place and write it to directory"""
+    run.sort()
+    path = Path(directory, f"run_{index}.npy")
+    np.save(path, run)
+    return path
+
+
+def iter_merged_runs(paths, merge_rows=QQ_MERGE_ROWS):
+    """
+    Merge sorted runs, memory mapping each and reading merge_rows values of each at a time. Every value up to the
+    smallest of the last values read from each run can be returned, as no value later within any run can be smaller.
+
+    :param paths: The paths of the sorted runs, from spill_sorted_runs
+    :type paths: list[Path]
+
+    :param merge_rows: Values to read from each run at a time, defaults to QQ_MERGE_ROWS
+    :type merge_rows: int
+
+    :return: Yields blocks of the merged values, from smallest to largest
+    :rtype: collections.Iterable[numpy.ndarray]
+    """
+    runs = [np.load(path, mmap_mode="r") for path in paths]
+    positions = [0] * len(runs)
+
+    while True:
+        windows = {i: run[positions[i]:positions[i] + merge_rows] for i, run in enumerate(runs)
+                   if positions[i] < len(run)}
+        if not windows:
+            return
+
+        cutoff = min(window[-1] for window in windows.values())
+        merged = []
+        for i, window in windows.items():
+            taken = np.searchsorted(window, cutoff, side="right")
+            merged.append(window[:taken])
+            positions[i] += taken
+        yield np.sort(np.concatenate(merged))
+
+
+def external_qq_points(blocks, directory, camera_position, camera_scale, x_resolution, y_resolution,
+                       run_rows=QQ_RUN_ROWS, merge_rows=QQ_MERGE_ROWS):
+    """
+    The expected and observed values of the points of an exact QQ plot, sorted out of core so memory is bounded by the
+    size of a run rather than the number of values. Sorted runs are spilled to a temporary directory within directory
+    and merged, and as the values are merged in order only a single point within each pixel of the render is kept, via
+    decimate_points. The largest point is always kept, so the bounds of the axis are those of every value.
+
+    :param blocks: The blocks of observed -log10 p values
+    :type blocks: collections.Iterable[numpy.ndarray]
+
+    :param directory: Directory to spill the sorted runs to, which are removed once merged
+    :type directory: str | Path
+
+    :param camera_position: Position of the camera
+    :type camera_position: (float, float, float)
+
+    :param camera_scale: Scale of the orthographic camera
+    :type camera_scale: float
+
+    :param x_resolution: X dimension of the render
+    :type x_resolution: int
+
+    :param y_resolution: Y dimension of the render
+    :type y_resolution: int
+
+    :param run_rows: Values sorted in memory per run, defaults to QQ_RUN_ROWS
+    :type run_rows: int
+
+    :param merge_rows: Values read from each run at a time whilst merging, defaults to QQ_MERGE_ROWS
+    :type merge_rows: int
+
+    :return: The expected and observed value of each point, from smallest to largest
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    x_values, y_values = [], []
+    with tempfile.TemporaryDirectory(prefix=".qq_runs_", dir=directory) as run_directory:
+        paths, total = spill_sorted_runs(blocks, run_directory, run_rows)
+
+        rank, last = 0, None
+        for values in iter_merged_runs(paths, merge_rows):
+            vertices = np.zeros((len(values), 3), dtype=np.float64)
+            vertices[:, 0] = expected_neg_log10(np.arange(rank, rank + len(values)), total)
+            vertices[:, 1] = values
+            rank += len(values)
+
+            kept = decimate_points(vertices, camera_position, camera_scale, x_resolution, y_resolution, np.inf)
+            x_values.append(kept[:, 0])
+            y_values.append(kept[:, 1])
+            last = vertices[-1]
+
+    if last is None:
+        return np.empty(0), np.empty(0)
+
+    # Append the largest point, which may lie outside of the render, so the axis is bound by it
+    return np.append(np.concatenate(x_values), last[0]), np.append(np.concatenate(y_values), last[1])
@@ -0,0 +1,339 @@
+from pyBlendFigures.Supports.summary_stats import SUMMARY_BLOCK_SIZE, iter_summary_blocks
+from pyBlendFigures.Supports.qq_points import spill_sorted_runs, iter_merged_runs
+
+from pathlib import Path
+import numpy as np
+import tempfile
+import hashlib
+import shutil
+import json
+import uuid
+import os
+
+# Size in bytes each cache directory may grow to before the least recently used entries are evicted
+SUMMARY_CACHE_SIZE = 10 * 1024 ** 3
+
+# Where summary caches are held, True for a .summary_cache directory alongside each summary file, or None if disabled,
+# which it is unless enabled via set_summary_cache
+_cache_directory = None
+_cache_size = SUMMARY_CACHE_SIZE
+
+# Rows transformed at a time when deriving one cached column from another
+_ROW_CHUNK = 1 << 20
+
+
+class SummaryCache:
+    def __init__(self, summary_path, cache_directory=None, max_size=SUMMARY_CACHE_SIZE):
+        """
+        A cache of the parsed columns of a summary statistics file, held as .npy files so that each figure made from the
+        same file memory maps the columns rather than parsing the text. Entries are keyed on a hash of the contents of
+        the file, so copies of a file share an entry and an edited file is parsed afresh. Once the entries of the cache
+        directory exceed max_size, the least recently used are evicted, whilst clear removes every entry.
+
+        :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+        :type summary_path: str | Path
+
+        :param cache_directory: Directory to hold the cache, defaults to a .summary_cache directory alongside the
+            summary file, or the temporary directory if that cannot be written to
+        :type cache_directory: str | Path | None
+
+        :param max_size: Size in bytes the entries of the cache directory may grow to before the least recently used are
+            evicted, defaults to SUMMARY_CACHE_SIZE
+        :type max_size: int
+        """
+        self.summary_path = Path(summary_path).absolute()
+        self.max_size = max_size
+
+        if cache_directory is None:
+            cache_directory = Path(self.summary_path.parent, ".summary_cache")
+            try:
+                cache_directory.mkdir(exist_ok=True)
+            except OSError:
+                cache_directory = Path(tempfile.gettempdir(), "pyBlendFigures_summary_cache")
+
+        self.cache_directory = Path(cache_directory)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.entry_directory = Path(self.cache_directory, self._source_hash())
+        self.entry_directory.mkdir(exist_ok=True)
+
+        # The modification time of an entry marks when it was last used, for eviction
+        os.utime(self.entry_directory)
+
+    def _source_hash(self):
+        """
+        Hash the contents of the summary file. As hashing a large file takes a while, the hash is stored against the
+        path, size, and modification time of the file so it is only computed once per version of the file.
+        """
+        stat = self.summary_path.stat()
+        stamp = f"{self.summary_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        sources_path = Path(self.cache_directory, "sources.json")
+        sources = json.loads(sources_path.read_text()) if sources_path.exists() else {}
+        if stamp not in sources:
+            file_hash = hashlib.sha256()
+            with open(self.summary_path, "rb") as file:
+                for block in iter(lambda: file.read(SUMMARY_BLOCK_SIZE), b""):
+                    file_hash.update(block)
+
+            # Re-read the sources before writing, as other jobs may be caching other files within this directory, and
+            # drop the stamps of earlier versions of this file along with those of any evicted entry
+            sources = json.loads(sources_path.read_text()) if sources_path.exists() else {}
+            sources = {source: entry for source, entry in sources.items() if Path(self.cache_directory, entry).exists()
+                       and source.rsplit("|", 2)[0] != str(self.summary_path)}
+            sources[stamp] = file_hash.hexdigest()
+            _atomic_write(sources_path, json.dumps(sources, indent=4).encode())
+        return sources[stamp]
+
+    def _path(self, name):
+        return Path(self.entry_directory, f"{name}.npy")
+
+    @property
+    def size(self):
+        """Total size in bytes of the entries of the cache directory"""
+        return sum(size for _, size in self._entries())
+
+    def _entries(self):
+        """The directory and size of each entry, from least to most recently used"""
+        entries = [entry for entry in self.cache_directory.iterdir() if entry.is_dir()]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        return [(entry, sum(file.stat().st_size for file in entry.iterdir() if file.is_file())) for entry in entries]
+
+    def _evict(self):
+        """Remove the least recently used entries, bar that of this file, until the cache is within max_size"""
+        entries = self._entries()
+        total = sum(size for _, size in entries)
+        for entry, size in entries:
+            if total <= self.max_size:
+                break
+            if entry != self.entry_directory:
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+
+    def has_columns(self, columns, dtypes):
+        """
+        If the requested columns are already cached, so can be memory mapped without parsing the summary file
+
+        :param columns: The index of each column
+        :type columns: list[int]
+
+        :param dtypes: The numpy dtype of each column
+        :type dtypes: list
+
+        :return: True if every column is cached, otherwise False
+        :rtype: bool
+        """
+        return all(self._path(name).exists() for name in self._column_names(columns, dtypes))
+
+    @staticmethod
+    def _column_names(columns, dtypes):
+        return [f"column_{column}_{np.dtype(dtype).name}" for column, dtype in zip(columns, dtypes)]
+
+    def clear(self):
+        """
+        Remove every entry of the cache directory, along with the hashes of the summary files they were cached from
+
+        :return: Nothing, clear the cache then stop
+        :rtype: None
+        """
+        clear_summary_cache(self.cache_directory)
+        self.entry_directory.mkdir(parents=True, exist_ok=True)
+
+    def columns(self, columns, dtypes, block_size=SUMMARY_BLOCK_SIZE):
+        """
+        Memory map the requested columns, parsing any that are not yet cached in a single pass of the summary file
+
+        :param columns: The index of each column
+        :type columns: list[int]
+
+        :param dtypes: The numpy dtype of each column, such as np.int8 for chromosomes or np.float64 for p values
+        :type dtypes: list
+
+        :param block_size: Bytes to read per block if the file is parsed, defaults to SUMMARY_BLOCK_SIZE
+        :type block_size: int
+
+        :return: A read only memory mapped array of each column
+        :rtype: tuple[numpy.memmap]
+        """
+        names = self._column_names(columns, dtypes)
+        missing = [i for i, name in enumerate(names) if not self._path(name).exists()]
+
+        if missing:
+            writers = [_NpyWriter(self._path(names[i]), dtypes[i]) for i in missing]
+            try:
+                for values in iter_summary_blocks(self.summary_path, [columns[i] for i in missing],
+                                                  [dtypes[i] for i in missing], block_size):
+                    for writer, value in zip(writers, values):
+                        writer.write(value)
+            except BaseException:
+                for writer in writers:
+                    writer.discard()
+                raise
+
+            for writer in writers:
+                writer.close()
+            self._evict()
+
+        return tuple(np.load(self._path(name), mmap_mode="r") for name in names)
+
+    def neg_log10(self, p_column, block_size=SUMMARY_BLOCK_SIZE):
+        """
+        Memory map the -log10 of the p value column, in the order of the rows of the summary file
+
+        :param p_column: Index of the p value column
+        :type p_column: int
+
+        :param block_size: Bytes to read per block if the file is parsed, defaults to SUMMARY_BLOCK_SIZE
+        :type block_size: int
+
+        :return: A read only memory mapped array of the -log10 p values
+        :rtype: numpy.memmap
+        """
+        path = self._path(f"neg_log10_{p_column}")
+        if not path.exists():
+            p_values = self.columns([p_column], [np.float64], block_size)[0]
+
+            # Transform the values in chunks, so the whole column is never held in memory
+            writer = _NpyWriter(path, np.float64)
+            for start in range(0, len(p_values), _ROW_CHUNK):
+                writer.write(-np.log10(p_values[start:start + _ROW_CHUNK]))
+            writer.close()
+            self._evict()
+
+        return np.load(path, mmap_mode="r")
+
+    def sorted_column(self, column, log_transform=True, block_size=SUMMARY_BLOCK_SIZE):
+        """
+        Memory map a column sorted from smallest to largest, such as the observed -log10 p values of a QQ plot. The
+        column is sorted out of core, in runs that are spilled to the cache and merged, so it is never held in memory.
+        As with np.sort, any nan values are placed last.
+
+        :param column: Index of the column
+        :type column: int
+
+        :param log_transform: If the column holds p values that should be sorted as -log10 p values, defaults to True
+        :type log_transform: bool
+
+        :param block_size: Bytes to read per block if the file is parsed, defaults to SUMMARY_BLOCK_SIZE
+        :type block_size: int
+
+        :return: A read only memory mapped array of the sorted values
+        :rtype: numpy.memmap
+        """
+        path = self._path(f"sorted_{'neg_log10' if log_transform else 'column'}_{column}")
+        if not path.exists():
+            values = self.neg_log10(column, block_size) if log_transform else \
+                self.columns([column], [np.float64], block_size)[0]
+
+            writer = _NpyWriter(path, np.float64)
+            with tempfile.TemporaryDirectory(prefix=".sorted_runs_", dir=self.entry_directory) as run_directory:
+                blocks = (values[start:start + _ROW_CHUNK] for start in range(0, len(values), _ROW_CHUNK))
+                paths, total = spill_sorted_runs(blocks, run_directory, _ROW_CHUNK * 4, np.float64)
+                for merged in iter_merged_runs(paths):
+                    writer.write(merged)
+            writer.write(np.full(len(values) - total, np.nan))
+            writer.close()
+            self._evict()
+
+        return np.load(path, mmap_mode="r")
+
+
+class _NpyWriter:
+    def __init__(self, path, dtype):
+        """
+        Stream a one dimensional array of unknown length to a .npy file, writing to a temporary file that replaces path
+        on close so that other jobs never load a partially written column
+        """
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+
+        self._temp_path = Path(self.path.parent, f".{self.path.name}.{uuid.uuid4().hex}")
+        self._file = open(self._temp_path, "wb")
+        self._header_size = self._write_header()
+
+    def _write_header(self):
+        """Write the npy header for the current length, which is padded to the same size for any length"""
+        np.lib.format.write_array_header_1_0(self._file, {"descr": np.lib.format.dtype_to_descr(self.dtype),
+                                                          "fortran_order": False, "shape": (self.length,)})
+        return self._file.tell()
+
+    def write(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._file.write(values.tobytes())
+        self.length += len(values)
+
+    def close(self):
+        self._file.seek(0)
+        if self._write_header() != self._header_size:
+            raise ValueError(f"The npy header of {self.path} changed size when written with a length of {self.length}")
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        self._temp_path.unlink()
+
+
+def _atomic_write(path, contents):
+    """Write contents to a temporary file, then replace path with it, so readers never see a partially written file"""
+    temp_path = Path(path.parent, f".{path.name}.{uuid.uuid4().hex}")
+    temp_path.write_bytes(contents)
+    os.replace(temp_path, path)
+
+
+def clear_summary_cache(cache_directory):
+    """
+    Remove every entry of a summary cache directory, along with the hashes of the summary files they were cached from
+
+    :param cache_directory: The cache directory, such as a .summary_cache directory alongside a summary file
+    :type cache_directory: str | Path
+
+    :return: Nothing, clear the cache then stop
+    :rtype: None
+    """
+    cache_directory = Path(cache_directory)
+    if not cache_directory.exists():
+        return
+
+    for entry in cache_directory.iterdir():
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+    try:
+        Path(cache_directory, "sources.json").unlink()
+    except FileNotFoundError:
+        pass
+
+
+def get_summary_cache(summary_path):
+    """
+    The summary cache of a summary file, held where set_summary_cache has set, which is disabled unless set
+
+    :param summary_path: Path to the summary file
+    :type summary_path: str | Path
+
+    :return: The summary cache, or None if caching has been disabled
+    :rtype: SummaryCache | None
+    """
+    if _cache_directory is None or _cache_directory is False:
+        return None
+    return SummaryCache(summary_path, None if _cache_directory is True else _cache_directory, _cache_size)
+
+
+def set_summary_cache(cache_directory, max_size=SUMMARY_CACHE_SIZE):
+    """
+    Set where summary caches are held
+
+    :param cache_directory: True to hold the cache alongside each summary file, a directory to hold every cache within,
+        or None to disable caching so that summary files are parsed each time
+    :type cache_directory: bool | str | Path | None
+
+    :param max_size: Size in bytes each cache directory may grow to before the least recently used entries are evicted,
+        defaults to SUMMARY_CACHE_SIZE
+    :type max_size: int
+
+    :return: The previous cache directory
+    :rtype: bool | str | Path | None
+    """
+    global _cache_directory, _cache_size
+    previous, _cache_directory, _cache_size = _cache_directory, cache_directory, max_size
+    return previous
@@ -0,0 +1,180 @@
+from pyBlendFigures.Supports.summary_stats import SUMMARY_BLOCK_SIZE, iter_row_blocks, iter_summary_reads, open_summary
+from pyBlendFigures.Supports.bgzf import is_bgzf, bgzf_block_table
+
+from contextlib import closing
+from bisect import bisect_right
+from pathlib import Path
+import numpy as np
+import json
+
+# Files whose chromosomes are split into more runs than this are too fragmented for an index to be worth seeking with
+MAX_INDEX_RUNS = 100000
+
+
+def summary_index_path(summary_path):
+    """The path of the sidecar index of a summary file, which is held alongside it"""
+    return Path(f"{summary_path}.chrindex")
+
+
+def _source_stamp(summary_path):
+    """The size and modification time of the summary file, which invalidate its index when either changes"""
+    stat = Path(summary_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_summary_index(summary_path, chromosome_column, index_path=None, block_size=SUMMARY_BLOCK_SIZE,
+                        max_runs=MAX_INDEX_RUNS):
+    """
+    Build an index of where the rows of each chromosome lie within a summary file, and write it alongside the file, so
+    later reads can seek straight to the chromosomes they need.
+
+    Each chromosome holds the (start, end) of each run of contiguous rows, which is a single run if the file is sorted.
+    Offsets are into the decompressed file for plain and gzipped files, and virtual offsets for bgzip files, which hold
+    the compressed offset of a block in the upper 48 bits and the offset within the block in the lower 16.
+
+    :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+    :type summary_path: str | Path
+
+    :param chromosome_column: Index of the chromosome column
+    :type chromosome_column: int
+
+    :param index_path: Path to write the index to, defaults to summary_index_path
+    :type index_path: str | Path | None
+
+    :param block_size: Bytes to read per block, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :param max_runs: If the chromosomes are split into more runs than this the file is not indexed, and chromosomes is
+        None so that the whole file is read, defaults to MAX_INDEX_RUNS
+    :type max_runs: int
+
+    :return: The index
+    :rtype: dict
+    """
+    summary_path = Path(summary_path)
+    file_format = "plain"
+    if summary_path.suffix == ".gz":
+        file_format = "bgzf" if is_bgzf(summary_path) else "gzip"
+
+    index = {"source": _source_stamp(summary_path), "format": file_format, "chromosome_column": chromosome_column,
+             "chromosomes": _chromosome_runs(summary_path, chromosome_column, block_size, max_runs)}
+
+    if file_format == "bgzf" and index["chromosomes"] is not None:
+        compressed, uncompressed = bgzf_block_table(summary_path)
+        index["chromosomes"] = {chromosome: [(_virtual_offset(compressed, uncompressed, start),
+                                              _virtual_offset(compressed, uncompressed, end)) for start, end in runs]
+                                for chromosome, runs in index["chromosomes"].items()}
+
+    # The index is only an optimisation, so a summary file within a read only directory is still read in full
+    try:
+        with open(index_path if index_path else summary_index_path(summary_path), "w") as file:
+            json.dump({**index, "chromosomes": None if index["chromosomes"] is None else
+                       {str(chromosome): runs for chromosome, runs in index["chromosomes"].items()}}, file)
+    except OSError:
+        pass
+    return index
+
+
+def _chromosome_runs(summary_path, chromosome_column, block_size, max_runs):
+    """The (start, end) decompressed offsets of each run of rows of each chromosome, or None if there are too many"""
+    runs, starts, current = [], [], None
+
+    zipped = Path(summary_path).suffix == ".gz"
+    with open_summary(summary_path) as file:
+        header = file.readline()
+        column_count = len(header.split())
+
+        offset = len(header)
+        with closing(iter_summary_reads(file, block_size, zipped)) as reads:
+            for block_offset, block in iter_row_blocks(reads, block_size):
+                chromosomes = np.array(block.split()[chromosome_column::column_count], dtype=np.int8)
+
+                # The start of each non empty row within the block
+                line_ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+                line_starts = np.concatenate(([0], line_ends + 1))[:len(line_ends) + 1]
+                line_lengths = np.append(line_ends, len(block)) - line_starts
+                row_starts = line_starts[line_lengths > 0][:len(chromosomes)] + offset + block_offset
+
+                # Record a run wherever the chromosome changes
+                changes = np.flatnonzero(np.diff(chromosomes)) + 1
+                if len(chromosomes) and chromosomes[0] != current:
+                    changes = np.concatenate(([0], changes))
+                runs.extend(chromosomes[changes].tolist())
+                starts.extend(row_starts[changes].tolist())
+                current = chromosomes[-1] if len(chromosomes) else current
+
+                if len(runs) > max_runs:
+                    return None
+
+        end = offset + (block_offset + len(block) if len(starts) else 0)
+
+    chromosome_runs = {}
+    for chromosome, start, run_end in zip(runs, starts, starts[1:] + [end]):
+        chromosome_runs.setdefault(chromosome, []).append((start, run_end))
+    return chromosome_runs
+
+
+def _virtual_offset(compressed, uncompressed, offset):
+    """Convert an offset into the decompressed stream of a bgzf file to a virtual offset"""
+    block = bisect_right(uncompressed, offset) - 1
+    return (compressed[block] << 16) | (offset - uncompressed[block])
+
+
+def load_summary_index(summary_path, chromosome_column, index_path=None):
+    """
+    Load the index of a summary file, if one exists that was built for this chromosome column and the file has not
+    changed in size or modification time since
+
+    :param summary_path: Path to the summary file
+    :type summary_path: str | Path
+
+    :param chromosome_column: Index of the chromosome column
+    :type chromosome_column: int
+
+    :param index_path: Path of the index, defaults to summary_index_path
+    :type index_path: str | Path | None
+
+    :return: The index, or None if there is no valid index
+    :rtype: dict | None
+    """
+    index_path = Path(index_path) if index_path else summary_index_path(summary_path)
+    if not index_path.exists():
+        return None
+
+    try:
+        index = json.loads(index_path.read_text())
+    except ValueError:
+        return None
+
+    if index.get("source") != _source_stamp(summary_path) or index.get("chromosome_column") != chromosome_column:
+        return None
+
+    if index["chromosomes"] is not None:
+        index["chromosomes"] = {int(chromosome): [tuple(run) for run in runs]
+                                for chromosome, runs in index["chromosomes"].items()}
+    return index
+
+
+def summary_index(summary_path, chromosome_column, index_path=None, block_size=SUMMARY_BLOCK_SIZE):
+    """
+    Load the index of a summary file, building it if it does not exist or the file has changed since it was built
+
+    :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+    :type summary_path: str | Path
+
+    :param chromosome_column: Index of the chromosome column
+    :type chromosome_column: int
+
+    :param index_path: Path of the index, defaults to summary_index_path
+    :type index_path: str | Path | None
+
+    :param block_size: Bytes to read per block if the index is built, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :return: The index
+    :rtype: dict
+    """
+    index = load_summary_index(summary_path, chromosome_column, index_path)
+    if index is None:
+        index = build_summary_index(summary_path, chromosome_column, index_path, block_size)
+    return index
@@ -0,0 +1,450 @@
+from pyBlendFigures.Supports.bgzf import is_bgzf, bgzf_spans, read_bgzf_span
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, nullcontext
+from collections import deque
+from pathlib import Path
+import numpy as np
+import threading
+import queue
+import gzip
+import io
+import os
+
+# Bytes of the summary file parsed at a time, so memory is bounded by the block rather than the file
+SUMMARY_BLOCK_SIZE = 1 << 20
+
+# Processes that decompress and parse bgzip files, or None for one per core
+_summary_processes = None
+
+# Reads of a gzipped file held ahead of the parser by the thread decompressing it
+_PIPELINE_DEPTH = 4
+
+
+def open_summary(summary_path):
+    """Open the summary file as bytes, decompressing it if it is gzipped"""
+    summary_path = Path(summary_path)
+    return gzip.open(summary_path, "rb") if summary_path.suffix == ".gz" else open(summary_path, "rb")
+
+
+def summary_headers(summary_path):
+    """
+    The headers of a whitespace delimited summary file
+
+    :param summary_path: Path to the summary file, which may be gzipped
+    :type summary_path: str | Path
+
+    :return: The headers of the file
+    :rtype: list[str]
+    """
+    with open_summary(summary_path) as file:
+        return file.readline().decode("utf-8").split()
+
+
+def summary_column_indexes(summary_path, headers):
+    """
+    Validate that each header is within the summary file, returning the index of each in the order submitted
+
+    :param summary_path: Path to the summary file, which may be gzipped
+    :type summary_path: str | Path
+
+    :param headers: The headers to isolate
+    :type headers: list[str]
+
+    :return: The index of each header
+    :rtype: list[int]
+
+    :raises KeyError: If a header provided was not found in the decoded headers
+    """
+    decoded_headers = summary_headers(summary_path)
+
+    header_indexes = []
+    for header in headers:
+        if header in decoded_headers:
+            header_indexes.append(decoded_headers.index(header))
+        else:
+            raise KeyError(f"{header} was not found in {decoded_headers}")
+    return header_indexes
+
+
+def iter_row_blocks(chunks, block_size=SUMMARY_BLOCK_SIZE):
+    """
+    Gather chunks of bytes into blocks of at least block_size bytes that are cut at the last complete row, so rows never
+    span two blocks. Any partial row at the end of the chunks is returned as the final block.
+
+    :param chunks: The chunks of bytes, such as successive reads of a file
+    :type chunks: collections.Iterable[bytes]
+
+    :param block_size: Bytes to gather per block, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :return: Yields the offset of each block relative to the first chunk, and the block
+    :rtype: collections.Iterable[(int, bytes)]
+    """
+    buffer, buffered, offset = [], 0, 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered < block_size:
+            continue
+
+        # Carry any partial row over to the next block
+        block = b"".join(buffer)
+        cut = block.rfind(b"\n") + 1
+        if cut:
+            yield offset, block[:cut]
+            offset += cut
+        buffer, buffered = [block[cut:]], len(block) - cut
+
+    if buffered:
+        yield offset, b"".join(buffer)
+
+
+def _iter_range_chunks(summary_path, ranges, block_size):
+    """Read the bytes within each (start, end) range of the summary file, merging ranges that are contiguous"""
+    # Offsets are into the decompressed stream, gzip files seek forward by decompressing up to start
+    with open_summary(summary_path) as file:
+        for start, end in _merge_ranges(ranges):
+            file.seek(start)
+            remaining, chunks = end - start, []
+            while remaining > 0:
+                chunk = file.read(min(block_size, remaining))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            yield chunks
+
+
+def _merge_ranges(ranges):
+    """Sort the (start, end) ranges, merging those that are contiguous"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and merged[-1][1] == start:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def iter_summary_reads(file, block_size=SUMMARY_BLOCK_SIZE, pipelined=False):
+    """
+    Read a file in chunks of block_size bytes. If pipelined, the file is read on a background thread that keeps a few
+    reads ahead of the caller, so decompressing a gzipped file overlaps with parsing the chunks already read, as zlib
+    releases the GIL whilst it decompresses. Close the generator before the file if it is not exhausted.
+
+    :param file: The open file, such as from open_summary
+    :type file: io.BufferedIOBase
+
+    :param block_size: Bytes to read per chunk, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :param pipelined: If the file should be read on a background thread, defaults to False
+    :type pipelined: bool
+
+    :return: Yields each chunk of the file
+    :rtype: collections.Iterable[bytes]
+    """
+    if not pipelined:
+        yield from iter(lambda: file.read(block_size), b"")
+        return
+
+    reads = queue.Queue(_PIPELINE_DEPTH)
+    stop = threading.Event()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                reads.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read():
+        try:
+            for chunk in iter(lambda: file.read(block_size), b""):
+                if not _put(chunk):
+                    return
+            _put(b"")
+        except BaseException as e:
+            _put(e)
+
+    reader = threading.Thread(target=_read, name="summary_reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            chunk = reads.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        stop.set()
+        reader.join()
+
+
+def iter_summary_blocks(summary_path, columns, dtypes, block_size=SUMMARY_BLOCK_SIZE, ranges=None, processes=None):
+    """
+    Stream the summary file in blocks of block_size bytes, parsing only the requested columns of each block into typed
+    arrays. Blocks are cut at the last complete row, so rows never span two blocks.
+
+    Bgzip files are split on their block boundaries, with each span of blocks decompressed and parsed within a process
+    pool and the rows that straddle two spans stitched back together, so the columns are returned in the order of the
+    file. Gzip files are decompressed on a background thread, so decompression overlaps with parsing.
+
+    :param summary_path: Path to the summary file, which may be gzipped or bgzipped
+    :type summary_path: str | Path
+
+    :param columns: The index of each column to parse
+    :type columns: list[int]
+
+    :param dtypes: The numpy dtype of each column, such as np.int8 for chromosomes or np.float64 for p values
+    :type dtypes: list
+
+    :param block_size: Bytes to read per block, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :param ranges: If set, only the rows within these (start, end) offsets of a summary index are read, rather than the
+        whole file, defaults to None
+    :type ranges: list[(int, int)] | None
+
+    :param processes: Processes to decompress and parse bgzip files with, defaults to the setting of
+        set_summary_processes
+    :type processes: int | None
+
+    :return: Yields a tuple of arrays, one per column, for each block
+    :rtype: collections.Iterable[tuple[numpy.ndarray]]
+
+    :raises ValueError: If a row does not hold the same number of columns as the headers
+    """
+    column_count = len(summary_headers(summary_path))
+    zipped = Path(summary_path).suffix == ".gz"
+
+    if zipped and is_bgzf(summary_path):
+        yield from _iter_bgzf_summary_blocks(summary_path, column_count, columns, dtypes, block_size, ranges,
+                                             processes)
+
+    elif ranges is None:
+        with open_summary(summary_path) as file, closing(iter_summary_reads(file, block_size, zipped)) as reads:
+            file.readline()
+            for _, block in iter_row_blocks(reads, block_size):
+                yield _parse_block(block, column_count, columns, dtypes, summary_path)
+
+    else:
+        for range_chunks in _iter_range_chunks(summary_path, ranges, block_size):
+            for _, block in iter_row_blocks(range_chunks, block_size):
+                yield _parse_block(block, column_count, columns, dtypes, summary_path)
+
+
+def _iter_bgzf_summary_blocks(summary_path, column_count, columns, dtypes, block_size, ranges, processes):
+    """
+    Parse the spans of blocks of a bgzip file, within a process pool if there is more than one span to parse. Each span
+    returns the partial rows at either end of it alongside the columns of its complete rows, and as spans are returned
+    in order the partial rows are joined to the next span's to parse the rows that straddle them.
+    """
+    # The ranges of a summary index start and end on complete rows, whilst the whole file starts with the headers
+    range_spans = bgzf_spans(summary_path, None if ranges is None else _merge_ranges(ranges), block_size)
+    tasks = [(span, index == len(spans) - 1) for spans in range_spans for index, span in enumerate(spans)]
+    skip_header = ranges is None
+
+    processes = _summary_processes if processes is None else processes
+    processes = min(os.cpu_count() if processes is None else processes, len(tasks))
+    with ProcessPoolExecutor(processes) if processes > 1 else nullcontext() as pool:
+        pending = []
+        for (head, values, tail), range_end in _iter_span_results(
+                pool, processes, tasks, summary_path, column_count, columns, dtypes):
+
+            # A span without a newline lies entirely within a single row
+            if head is not None:
+                row = b"".join(pending) + head
+                if skip_header:
+                    skip_header = False
+                elif row.strip():
+                    yield _parse_block(row, column_count, columns, dtypes, summary_path)
+                if len(values[0]):
+                    yield values
+                pending = []
+            pending.append(tail)
+
+            if range_end:
+                row = b"".join(pending)
+                if row.strip():
+                    yield _parse_block(row, column_count, columns, dtypes, summary_path)
+                pending = []
+
+
+def _iter_span_results(pool, processes, tasks, summary_path, column_count, columns, dtypes):
+    """
+    Parse each span, within the pool if one is given, returning the results in order. Only a few spans are parsed ahead
+    of the caller, so memory is bounded by the processes of the pool rather than the size of the file.
+    """
+    if pool is None:
+        for span, range_end in tasks:
+            yield _parse_bgzf_span(summary_path, span, column_count, columns, dtypes), range_end
+        return
+
+    window = deque()
+    for span, range_end in tasks:
+        window.append((pool.submit(_parse_bgzf_span, summary_path, span, column_count, columns, dtypes), range_end))
+        if len(window) > 2 * processes:
+            future, range_end = window.popleft()
+            yield future.result(), range_end
+
+    while window:
+        future, range_end = window.popleft()
+        yield future.result(), range_end
+
+
+def _parse_bgzf_span(summary_path, span, column_count, columns, dtypes):
+    """
+    Decompress a span of blocks of a bgzip file and parse its complete rows, returning the partial rows before the first
+    and after the last newline. If the span holds no newline, head is None and tail holds the whole span.
+    """
+    data = read_bgzf_span(summary_path, *span)
+    first, last = data.find(b"\n"), data.rfind(b"\n")
+    if first < 0:
+        return None, None, data
+
+    values = _parse_block(data[first + 1:last + 1], column_count, columns, dtypes, summary_path)
+    return data[:first + 1], values, data[last + 1:]
+
+
+def set_summary_processes(processes):
+    """
+    Set the number of processes bgzip summary files are decompressed and parsed with
+
+    :param processes: The number of processes, where 1 parses within the calling process, or None for one per core
+    :type processes: int | None
+
+    :return: The previous setting
+    :rtype: int | None
+    """
+    global _summary_processes
+    previous, _summary_processes = _summary_processes, processes
+    return previous
+
+
+def _parse_block(block, column_count, columns, dtypes, summary_path):
+    """
+    Parse the requested columns of a block of complete rows straight into arrays of their dtype via the C reader of
+    np.loadtxt, so the block is never split into a python object per token
+    """
+    if not block.strip():
+        return tuple(np.empty(0, dtype) for dtype in dtypes)
+
+    if _count_tokens(block) % column_count != 0:
+        raise ValueError(f"{summary_path} holds a row without {column_count} columns")
+
+    rows = np.loadtxt(io.BytesIO(block), dtype=[(str(i), dtype) for i, dtype in enumerate(dtypes)], comments=None,
+                      usecols=columns, ndmin=1)
+    return tuple(np.ascontiguousarray(rows[str(i)]) for i in range(len(dtypes)))
+
+
+def _count_tokens(block):
+    """
+    The number of whitespace delimited tokens within a block, as len(block.split()) would be, counted as the non
+    whitespace bytes that follow whitespace, where control bytes are taken as whitespace
+    """
+    space = np.frombuffer(block, dtype=np.uint8) <= ord(" ")
+    return int(np.count_nonzero(space[:-1] > space[1:])) + (not space[0])
+
+
+def partition_summary_columns(summary_path, chromosome_column, columns, dtypes, chromosomes,
+                              block_size=SUMMARY_BLOCK_SIZE, index=None):
+    """
+    Read the summary file once, partitioning the requested columns by chromosome. Rows keep their order within each
+    chromosome, and the file does not need to be sorted by chromosome.
+
+    :param summary_path: Path to the summary file, which may be gzipped
+    :type summary_path: str | Path
+
+    :param chromosome_column: Index of the chromosome column
+    :type chromosome_column: int
+
+    :param columns: The index of each column to partition
+    :type columns: list[int]
+
+    :param dtypes: The numpy dtype of each column
+    :type dtypes: list
+
+    :param chromosomes: The chromosomes to isolate, rows of all other chromosomes are skipped
+    :type chromosomes: set[int]
+
+    :param block_size: Bytes to read per block, defaults to SUMMARY_BLOCK_SIZE
+    :type block_size: int
+
+    :param index: A summary index of the file, via summary_index, so only the rows of the requested chromosomes are read
+        rather than the whole file, defaults to None
+    :type index: dict | None
+
+    :return: A dict of chromosome: tuple of arrays, one per column, for each requested chromosome
+    :rtype: dict[int, tuple[numpy.ndarray]]
+    """
+    ranges = None
+    if index and index["chromosomes"] is not None:
+        ranges = [span for chromosome in chromosomes for span in index["chromosomes"].get(chromosome, [])]
+
+    blocks = {chromosome: [] for chromosome in chromosomes}
+    for chromosome_values, *values in iter_summary_blocks(
+            summary_path, [chromosome_column] + list(columns), [np.int8] + list(dtypes), block_size, ranges):
+
+        for chromosome, chromosome_block in partition_by_chromosome(chromosome_values, values, chromosomes).items():
+            blocks[chromosome].append(chromosome_block)
+
+    return {chromosome: tuple(np.concatenate([block[i] for block in chromosome_blocks]) if chromosome_blocks else
+                              np.empty(0, dtype) for i, dtype in enumerate(dtypes))
+            for chromosome, chromosome_blocks in blocks.items()}
+
+
+def partition_by_chromosome(chromosome_values, values, chromosomes):
+    """
+    Partition parsed columns by chromosome, such as the memory mapped columns of a SummaryCache
+
+    :param chromosome_values: The chromosome of each row
+    :type chromosome_values: numpy.ndarray
+
+    :param values: The columns to partition, each of the same length as chromosome_values
+    :type values: list[numpy.ndarray]
+
+    :param chromosomes: The chromosomes to isolate, rows of all other chromosomes are skipped
+    :type chromosomes: set[int]
+
+    :return: A dict of chromosome: tuple of arrays, one per column, for each requested chromosome present in the rows
+    :rtype: dict[int, tuple[numpy.ndarray]]
+    """
+    partitions = {}
+    for chromosome in chromosomes:
+        rows = chromosome_values == chromosome
+        if rows.any():
+            partitions[chromosome] = tuple(value[rows] for value in values)
+    return partitions
+
+
+def negative_log10(p_values):
+    """
+    The -log10 of each p value
+
+    :param p_values: The p values
+    :type p_values: numpy.ndarray
+
+    :return: The -log10 of each p value
+    :rtype: numpy.ndarray
+    """
+    return -np.log10(np.asarray(p_values, dtype=np.float64))
+
+
+def normalise_min_max(values):
+    """
+    Normalise values to be between 0 and 1
+
+    :param values: A column of numeric values
+    :type values: numpy.ndarray
+
+    :return: The values bound between 0 and 1
+    :rtype: numpy.ndarray
+    """
+    values = np.asarray(values, dtype=np.float64)
+    value_min = values.min()
+    return (values - value_min) / (values.max() - value_min)
@@ -1 +1,17 @@
-from .Controller import BlendFigure
+import importlib
+
+# The controller, and what it depends on, is only imported once it is used. This keeps the import of pyBlendFigures
+# itself cheap, which matters within blender where every BlendFiles script imports pyBlendFigures.Supports
+_LAZY = {"BlendFigure": "pyBlendFigures.Controller"}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -18,7 +18,11 @@ VERSION = "0.05.3"
 PYTHON_REQUIRES = ">=3.7"
 
 INSTALL_REQUIRES = [
-    'miscSupports', 'csvObject', 'numpy', 'imageObjects', "shapeObject", 'blendSupports', 'shapely', 'seaborn']
+    'miscSupports', 'csvObject', 'numpy', 'imageObjects', 'blendSupports']
+
+# Only the map figures, PolyMap and IntensityMap, need shapefile support
+EXTRAS_REQUIRE = {
+    'maps': ['shapeObject', 'shapely']}
 
 CLASSIFIERS = [
     'Programming Language :: Python :: 3.7',
@@ -48,6 +52,7 @@ if __name__ == "__main__":
         download_url=DOWNLOAD_URL,
         python_requires=PYTHON_REQUIRES,
         install_requires=INSTALL_REQUIRES,
+        extras_require=EXTRAS_REQUIRE,
         include_package_data=True,
         packages=find_packages(),
         classifiers=CLASSIFIERS